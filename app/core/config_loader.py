@@ -3,6 +3,7 @@
 from typing import Any, Callable, Dict, List, Optional, Tuple
 import json
 import os
+import tempfile
 from pathlib import Path
 from datetime import datetime
 
@@ -30,11 +31,24 @@ MAX_PREVIEW_ROWS: int = 1000
 # Performance Settings
 CACHE_TTL_SECONDS: int = 3600  # Cache time-to-live in seconds
 LAZY_LOAD_THRESHOLD: int = 1000  # Number of rows before lazy loading kicks in
+# Validation results shared across sessions and worker processes ("" keeps them in memory only)
+RESULT_CACHE_DIR: str = os.getenv("RESULT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "mapper_result_cache"))
+RESULT_CACHE_MAX_MB: int = int(os.getenv("RESULT_CACHE_MAX_MB", "256"))
+RESULT_CACHE_MEMORY_MB: int = int(os.getenv("RESULT_CACHE_MEMORY_MB", "64"))  # In-process results (failure bitmaps included)
+
+# Reference Data Settings
+CODE_SET_DIR: str = os.getenv("CODE_SET_DIR", "")  # <system>_<YYYY-MM-DD> code tables; "" uses data/code_sets
+NPPES_REGISTRY_PATH: str = os.getenv("NPPES_REGISTRY_PATH", "")  # NPI registry (.npy) built by NPIRegistry.build; "" skips membership checks
+# {internal_field: {"path": reference CSV, "column": key column}} for referential integrity checks
+REFERENCE_TABLES: Dict[str, Dict[str, str]] = json.loads(os.getenv("REFERENCE_TABLES", "{}"))
+REFERENCE_INDEX_DIR: str = os.getenv("REFERENCE_INDEX_DIR", "")  # Saved reference indexes; "" uses the system temp dir
 
 # Data Quality Settings
 DATA_QUALITY_THRESHOLD: float = 80.0  # Minimum acceptable data quality score
 NULL_RATE_THRESHOLD: float = 15.0  # Default null rate threshold for mandatory fields
 COMPLETENESS_THRESHOLD: float = 85.0  # Completeness threshold percentage
+# Row fingerprints held in memory by duplicate detection before spilling to disk partitions
+DUPLICATE_MEMORY_BUDGET_MB: int = int(os.getenv("DUPLICATE_MEMORY_BUDGET_MB", "256"))
 
 # Session Settings
 SESSION_TIMEOUT_MINUTES: int = 30  # Session timeout in minutes
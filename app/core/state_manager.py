@@ -1,7 +1,7 @@
 # --- state_manager.py ---
 """Session state management with typed getters and setters."""
 import streamlit as st
-from typing import Any, Dict, List, Optional, TypedDict, cast
+from typing import Any, Dict, FrozenSet, List, Optional, TypedDict, cast
 from datetime import datetime
 
 st: Any = st
@@ -12,6 +12,8 @@ class SessionStateSchema(TypedDict, total=False):
     # File data
     claims_df: Any
     layout_df: Any
+    claims_df_version: str
+    layout_df_version: str
     claims_file_obj: Any
     layout_file_obj: Any
     lookup_file_obj: Any
@@ -24,13 +26,15 @@ class SessionStateSchema(TypedDict, total=False):
     
     # Processing data
     transformed_df: Any
+    incremental_transformer: Any
+    preview_transformer: Any
     anonymized_df: Any
     mapping_table: Any
     validation_results: List[Dict[str, Any]]
     
     # Lookup data
-    msk_codes: set
-    bar_codes: set
+    msk_codes: FrozenSet[str]
+    bar_codes: FrozenSet[str]
     
     # UI state
     dark_mode: bool
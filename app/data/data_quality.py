@@ -17,6 +17,7 @@ from core.config_loader import (
     DATA_QUALITY_THRESHOLD,
     COMPLETENESS_THRESHOLD
 )
+from data.duplicate_engine import find_duplicates
 
 
 @dataclass
@@ -161,7 +162,7 @@ def calculate_data_quality_score(df: pd.DataFrame, required_fields: Optional[Lis
         weights["required_completeness"] = 0.3
     
     # Uniqueness (15% weight)
-    duplicate_rows = df.duplicated().sum()
+    duplicate_rows = find_duplicates(df).duplicate_count
     uniqueness = ((len(df) - duplicate_rows) / len(df) * 100) if len(df) > 0 else 0
     scores["uniqueness"] = uniqueness
     weights["uniqueness"] = 0.15
@@ -224,7 +225,8 @@ def detect_duplicates(df: pd.DataFrame, columns: Optional[List[str]] = None,
         method: Matching method ('exact', 'fuzzy', 'key_based')
         
     Returns:
-        DataFrame with duplicate records marked
+        DataFrame with duplicate records marked; `duplicate_group` numbers
+        groups in order of first occurrence (see `data.duplicate_engine`)
     """
     if df is None or df.empty:
         return pd.DataFrame()
@@ -234,21 +236,16 @@ def detect_duplicates(df: pd.DataFrame, columns: Optional[List[str]] = None,
     
     columns = [c for c in columns if c in df.columns]
     
-    if method == "exact":
-        duplicates = df[df.duplicated(subset=columns, keep=False)].copy()
-        duplicates["duplicate_group"] = duplicates.groupby(columns).ngroup()
-    elif method == "key_based":
+    if method == "key_based":
         # Use first column as key
-        if columns:
-            key_col = columns[0]
-            duplicates = df[df.duplicated(subset=[key_col], keep=False)].copy()
-            duplicates["duplicate_group"] = duplicates.groupby([key_col]).ngroup()
-        else:
-            duplicates = pd.DataFrame()
-    else:  # fuzzy
-        # For now, fall back to exact matching
-        duplicates = df[df.duplicated(subset=columns, keep=False)].copy()
-        duplicates["duplicate_group"] = duplicates.groupby(columns).ngroup()
+        columns = columns[:1]
+    # "fuzzy" falls back to exact matching for now
+    if not columns:
+        return pd.DataFrame()
+    
+    groups = find_duplicates(df, columns)
+    duplicates = df.iloc[groups.rows].copy()
+    duplicates["duplicate_group"] = groups.groups
     
     return duplicates
 
@@ -0,0 +1,255 @@
+# pyright: reportUnknownMemberType=false, reportMissingTypeStubs=false, reportUnknownVariableType=false, reportUnknownArgumentType=false
+"""Date normalization engine shared by transformation, validation and upload.
+
+Claims date columns hold few distinct values relative to their row count, so
+every column is factorized first. One format is inferred per column from a
+sample of the distinct values and applied to all of them, and the parsed
+values are broadcast back to the rows through the factor codes. Values the
+format does not parse are invalid (NaT); a column never mixes formats.
+"""
+import warnings
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple, cast
+
+import numpy as np  # type: ignore[import-not-found]
+import pandas as pd  # type: ignore[import-not-found]
+
+pd = cast(Any, pd)
+np = cast(Any, np)
+
+# PySpark-style date formats (as used in onboarding read_kwargs) -> strptime.
+# Order matters: when several formats parse the same values, the first wins.
+PYSPARK_TO_PANDAS_DATE_FORMAT: Dict[str, str] = {
+    "yyyyMMdd": "%Y%m%d",
+    "yyyy-MM-dd": "%Y-%m-%d",
+    "yyyy/MM/dd": "%Y/%m/%d",
+    "MMddyyyy": "%m%d%Y",
+    "MM/dd/yyyy": "%m/%d/%Y",
+    "MM-dd-yyyy": "%m-%d-%Y",
+    "MMddyy": "%m%d%y",
+    "MM/dd/yy": "%m/%d/%y",
+    "yyMMdd": "%y%m%d",
+    "dd-MM-yyyy": "%d-%m-%Y",
+    "dd/MM/yyyy": "%d/%m/%Y",
+    "ddMMyyyy": "%d%m%Y",
+    "ddMMyy": "%d%m%y",
+    "dd/MM/yy": "%d/%m/%y",
+    "yyyyMM": "%Y%m",
+    "MM-yyyy": "%m-%Y",
+    "MM/yyyy": "%m/%Y",
+    "yyyy-MM-dd HH:mm:ss": "%Y-%m-%d %H:%M:%S",
+    "yyyyMd": "%Y%m%d",
+}
+
+# Labels for values not parsed with a PySpark-style format
+FORMAT_EXCEL_SERIAL = "excel_serial"
+FORMAT_DATETIME = "datetime"
+FORMAT_INFERRED = "inferred"
+NON_PYSPARK_FORMATS = (FORMAT_EXCEL_SERIAL, FORMAT_DATETIME, FORMAT_INFERRED)
+
+# Column-name keywords that suggest a date column in raw source files
+# ("claim" or "service" alone names IDs and codes as often as dates)
+DATE_COLUMN_KEYWORDS = ["date", "dob", "birth", "admit", "discharge", "effective"]
+
+# Distinct values examined to infer a column's format
+FORMAT_SAMPLE_SIZE = 200
+
+EXCEL_EPOCH = pd.Timestamp("1899-12-30")
+
+# Candidate strptime formats, deduplicated, with the label reported for each
+_CANDIDATE_FORMATS: List[Tuple[str, str]] = []
+for _label, _fmt in PYSPARK_TO_PANDAS_DATE_FORMAT.items():
+    if _fmt not in {fmt for _, fmt in _CANDIDATE_FORMATS}:
+        _CANDIDATE_FORMATS.append((_label, _fmt))
+
+
+@dataclass(frozen=True)
+class ParsedDates:
+    """Result of parsing one column.
+
+    Attributes:
+        values: ``datetime64[ns]`` Series aligned to the input (NaT = invalid).
+        format: Format applied to the column ("" if nothing parsed).
+        format_counts: Rows parsed per format label.
+        unique_count: Number of distinct non-null input values.
+        format_order: The applied format as a one-element tuple. Passing it
+            back to `parse_dates` pins the same format for later chunks of
+            the same column.
+    """
+
+    values: Any
+    format: str = ""
+    format_counts: Dict[str, int] = field(default_factory=dict)
+    unique_count: int = 0
+    format_order: Tuple[str, ...] = ()
+
+    def to_object(self) -> Any:
+        """Return the values as an object Series of Timestamps with None for NaT."""
+        result = self.values.astype(object)
+        return result.where(self.values.notna(), None)  # type: ignore[no-untyped-call]
+
+
+def _sample(values: Any, size: int) -> Any:
+    """Up to `size` values spread evenly over `values`."""
+    if len(values) <= size:
+        return values
+    return values[np.linspace(0, len(values) - 1, size).astype(np.int64)]
+
+
+def _excel_serial_mask(numeric: Any, text: Any) -> Any:
+    """Values that read as Excel serial day numbers (1..100000, not 8 digits)."""
+    eight_digits = ((text.str.len() == 8) & text.str.isdigit()).to_numpy()  # type: ignore[no-untyped-call]
+    return (numeric.notna() & (numeric >= 1) & (numeric <= 100000)).to_numpy() & ~eight_digits
+
+
+def infer_format(uniques: Any, sample_size: int = FORMAT_SAMPLE_SIZE) -> Tuple[str, float]:
+    """Infer one date format for a column from a sample of its distinct values.
+
+    Every exact format in `PYSPARK_TO_PANDAS_DATE_FORMAT` is tried on the
+    sample, then Excel serials, then pandas inference. The format parsing the
+    most sample values wins; ties go to the earlier format, so ambiguous
+    values such as ``01/02/2023`` read as ``MM/dd/yyyy`` unless the column
+    also holds values only ``dd/MM/yyyy`` can parse.
+
+    Args:
+        uniques: Distinct non-null values of the column.
+        sample_size: Distinct values examined.
+
+    Returns:
+        (format label, fraction of the sample it parses); ("", 0.0) when
+        nothing parses.
+    """
+    sample = pd.Series(_sample(np.asarray(uniques, dtype=object), sample_size), dtype=object)
+    if not len(sample):
+        return "", 0.0
+    if pd.api.types.infer_dtype(sample, skipna=True) in ("datetime", "datetime64", "date"):
+        return FORMAT_DATETIME, 1.0
+
+    text = sample.astype(str).str.strip()  # type: ignore[no-untyped-call]
+    best, best_hits = "", 0
+    for label, fmt in _CANDIDATE_FORMATS:
+        hits = int(pd.to_datetime(text, format=fmt, errors="coerce").notna().sum())  # type: ignore[no-untyped-call]
+        if hits > best_hits:
+            best, best_hits = label, hits
+            if hits == len(sample):
+                break
+    if best_hits < len(sample):
+        numeric = pd.to_numeric(sample, errors="coerce")  # type: ignore[no-untyped-call]
+        hits = int(_excel_serial_mask(numeric, text).sum())
+        if hits > best_hits:
+            best, best_hits = FORMAT_EXCEL_SERIAL, hits
+    if not best_hits:
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", category=UserWarning, message=".*Could not infer format.*")
+            hits = int(pd.to_datetime(text, errors="coerce").notna().sum())  # type: ignore[no-untyped-call]
+        if hits:
+            best, best_hits = FORMAT_INFERRED, hits
+    return best, best_hits / len(sample)
+
+
+def _apply_format(uniques: Any, label: str) -> Any:
+    """Parse all distinct values with one format (NaT where it does not apply)."""
+    u = pd.Series(uniques, dtype=object)
+    if label == FORMAT_DATETIME:
+        return pd.to_datetime(u, errors="coerce").to_numpy(dtype="datetime64[ns]")  # type: ignore[no-untyped-call]
+    text = u.astype(str).str.strip()  # type: ignore[no-untyped-call]
+    if label == FORMAT_EXCEL_SERIAL:
+        numeric = pd.to_numeric(u, errors="coerce")  # type: ignore[no-untyped-call]
+        mask = _excel_serial_mask(numeric, text)
+        parsed = np.full(len(u), np.datetime64("NaT"), dtype="datetime64[ns]")
+        parsed[mask] = (EXCEL_EPOCH + pd.to_timedelta(numeric[mask].astype(int), unit="D")).to_numpy()  # type: ignore[no-untyped-call]
+        return parsed
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning, message=".*Could not infer format.*")
+        fmt = PYSPARK_TO_PANDAS_DATE_FORMAT.get(label)
+        return pd.to_datetime(text, format=fmt, errors="coerce").to_numpy(dtype="datetime64[ns]")  # type: ignore[no-untyped-call]
+
+
+def parse_dates(series: Any, format_order: Tuple[str, ...] = ()) -> ParsedDates:
+    """Parse a column of date-like values through its distinct values.
+
+    The format (one of `PYSPARK_TO_PANDAS_DATE_FORMAT`, Excel serials or
+    pandas inference) is chosen by `infer_format` and applied to every value.
+
+    Args:
+        series: Series of raw or already-parsed date values.
+        format_order: Pinned format (see `ParsedDates.format_order`); used to
+            keep chunked parsing consistent with the first chunk.
+
+    Returns:
+        ParsedDates with the parsed values and detected format.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = pd.to_datetime(series)  # type: ignore[no-untyped-call]
+        count = int(values.notna().sum())
+        return ParsedDates(values, FORMAT_DATETIME if count else "", {FORMAT_DATETIME: count} if count else {}, int(values.nunique()), tuple(format_order))
+
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)  # type: ignore[no-untyped-call]
+    uniques = np.asarray(uniques, dtype=object)
+    label = format_order[0] if format_order else infer_format(uniques)[0]
+    if not label:
+        values = pd.Series(np.full(len(series), np.datetime64("NaT"), dtype="datetime64[ns]"), index=series.index, name=series.name)
+        return ParsedDates(values, "", {}, len(uniques), ())
+    parsed_uniques = _apply_format(uniques, label)
+
+    # Broadcast through the codes; -1 (missing) picks the trailing NaT
+    lookup = np.append(parsed_uniques, np.datetime64("NaT", "ns"))
+    values = pd.Series(lookup[codes], index=series.index, name=series.name)
+    count = int(values.notna().sum())
+    return ParsedDates(values, label if count else "", {label: count} if count else {}, len(uniques), (label,))
+
+
+def to_datetime_values(series: Any) -> Any:
+    """Shortcut for ``parse_dates(series).values`` (datetime64, NaT = invalid)."""
+    return parse_dates(series).values
+
+
+def _sample_uniques(series: Any) -> Any:
+    """Distinct non-null values among an evenly spread sample of rows."""
+    values = series.dropna().to_numpy(dtype=object)
+    return pd.unique(_sample(values, FORMAT_SAMPLE_SIZE * 50))
+
+
+def detect_date_format(series: Any) -> str:
+    """Return the date format of a column ("" if none detected)."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return FORMAT_DATETIME if series.notna().any() else ""
+    return infer_format(_sample_uniques(series))[0]
+
+
+def detect_column_date_formats(
+    df: Any,
+    columns: Optional[Iterable[str]] = None,
+    min_parsed_pct: float = 50.0,
+) -> Dict[str, str]:
+    """Detect the date format of each date-like column.
+
+    Only a sample of each column is examined, so columns that are not dates
+    are rejected without parsing them.
+
+    Args:
+        df: DataFrame to analyze.
+        columns: Columns to check. Defaults to columns whose names contain a
+            `DATE_COLUMN_KEYWORDS` keyword.
+        min_parsed_pct: Minimum percentage of sampled distinct values that
+            must parse for a column to be reported.
+
+    Returns:
+        Mapping of column name -> format label, for columns that look like dates.
+    """
+    if df is None or df.empty:
+        return {}
+    if columns is None:
+        columns = [c for c in df.columns if any(k in str(c).lower() for k in DATE_COLUMN_KEYWORDS)]
+
+    formats: Dict[str, str] = {}
+    for col in columns:
+        if col not in df.columns:
+            continue
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            label, parsed_share = detect_date_format(df[col]), 1.0
+        else:
+            label, parsed_share = infer_format(_sample_uniques(df[col]))
+        if label and parsed_share * 100.0 >= min_parsed_pct:
+            formats[col] = label
+    return formats
@@ -13,15 +13,15 @@ pd: Any = pd  # type: ignore[assignment]
 import io
 
 
-@st.cache_data(show_spinner=False)
-def _load_msk_bar_lookups_cached(content: bytes, file_ext: str) -> Tuple[Set[str], Set[str]]:
+def parse_msk_bar_lookups(content: bytes, file_ext: str) -> Tuple[Set[str], Set[str]]:
     """Parse MSK and BAR diagnosis codes from a file buffer.
 
     Supports all file formats (CSV, TXT, TSV, XLSX, XLS, JSON, PARQUET).
     For Excel files, uses sheets ("MSK" and "BAR"). For other formats,
     expects columns named "MSK" and "BAR" or first two columns.
 
-    This function is cached via Streamlit to avoid repeated parsing.
+    Uncached; use `load_msk_bar_lookups` or the shared registry in
+    `utils.cache_manager` to avoid repeated parsing.
 
     Args:
         content: Raw bytes of the uploaded file.
@@ -114,6 +114,12 @@ def _load_msk_bar_lookups_cached(content: bytes, file_ext: str) -> Tuple[Set[str
             raise
         raise ValueError(f"Unable to read Lookup file: {e}") from e
 
+@st.cache_data(show_spinner=False)
+def _load_msk_bar_lookups_cached(content: bytes, file_ext: str) -> Tuple[Set[str], Set[str]]:
+    """Cached wrapper around `parse_msk_bar_lookups`."""
+    return parse_msk_bar_lookups(content, file_ext)
+
+
 def load_msk_bar_lookups(file: Any) -> Tuple[Set[str], Set[str]]:
     """Load the Lookup file and extract MSK/BAR code sets.
 
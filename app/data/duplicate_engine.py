@@ -0,0 +1,353 @@
+# pyright: reportUnknownMemberType=false, reportMissingTypeStubs=false, reportUnknownVariableType=false, reportUnknownArgumentType=false
+"""Exact duplicate detection over frames or chunked files larger than memory.
+
+Each row is reduced to a 64-bit fingerprint of its key columns in one
+vectorized pass. (fingerprint, row id) pairs are buffered up to a memory
+budget, then spilled into hash partitions on disk; equal fingerprints always
+land in the same partition, so duplicate groups are resolved one partition at
+a time by sorting.
+
+Rows sharing a fingerprint are then compared on their actual key values:
+each group's first row is the representative, and rows that differ from it
+(a fingerprint collision) are regrouped by value. Only rows in candidate
+groups are ever re-read.
+"""
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, List, Optional, cast
+
+import numpy as np  # type: ignore[import-not-found]
+import pandas as pd  # type: ignore[import-not-found]
+
+pd = cast(Any, pd)
+np = cast(Any, np)
+
+DEFAULT_PARTITIONS = 64
+DEFAULT_CHUNK_ROWS = 500_000
+
+# (fingerprint, row id) pair as buffered and spilled
+PAIR_DTYPE = np.dtype([("fingerprint", np.uint64), ("row", np.int64)])
+
+
+def row_fingerprints(df: Any, columns: Optional[List[str]] = None) -> Any:
+    """64-bit fingerprints of the key columns of each row (uint64 array)."""
+    frame = df if columns is None else df[columns]
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy(dtype=np.uint64)
+
+
+@dataclass
+class DuplicateGroups:
+    """Exact duplicate groups of a frame or file.
+
+    Attributes:
+        rows: Row positions of every duplicated row, ascending.
+        groups: Group ID of each entry of `rows`; groups are numbered by
+            first occurrence.
+        counts: Rows in each group (all at least 2).
+        total_rows: Rows examined.
+    """
+
+    rows: Any
+    groups: Any
+    counts: Any
+    total_rows: int
+
+    @property
+    def group_count(self) -> int:
+        """Number of duplicate groups."""
+        return len(self.counts)
+
+    @property
+    def duplicate_count(self) -> int:
+        """Rows repeating an earlier row (as ``df.duplicated().sum()``)."""
+        return int(self.counts.sum() - len(self.counts))
+
+    def mask(self) -> Any:
+        """Boolean mask of duplicated rows (as ``df.duplicated(keep=False)``)."""
+        mask = np.zeros(self.total_rows, dtype=bool)
+        mask[self.rows] = True
+        return mask
+
+
+class DuplicateEngine:
+    """Accumulates row fingerprints chunk by chunk and resolves duplicate groups.
+
+    Usage: `add` every chunk in order, then `resolve` with a way to re-read
+    the chunks for verification. Prefer `find_duplicates` and
+    `find_duplicates_in_chunks`.
+
+    Attributes:
+        columns: Key columns (None for all columns).
+        memory_budget: Bytes of buffered pairs before spilling to disk.
+        partitions: Number of on-disk hash partitions.
+        rows_seen: Rows added so far.
+        spilled: Whether any pairs were written to disk.
+    """
+
+    def __init__(
+        self,
+        columns: Optional[List[str]] = None,
+        memory_budget_mb: Optional[int] = None,
+        partitions: int = DEFAULT_PARTITIONS,
+        spill_dir: Optional[str] = None
+    ):
+        if memory_budget_mb is None:
+            from core.config_loader import DUPLICATE_MEMORY_BUDGET_MB
+            memory_budget_mb = DUPLICATE_MEMORY_BUDGET_MB
+        self.columns = columns
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.partitions = partitions
+        self.rows_seen = 0
+        self.spilled = False
+        self._spill_root = spill_dir
+        self._spill_dir: Optional[str] = None
+        self._buffer: List[Any] = []
+        self._buffered_bytes = 0
+
+    def add(self, chunk: Any) -> None:
+        """Fingerprint the next chunk of rows (row ids continue from the last chunk)."""
+        pairs = np.empty(len(chunk), dtype=PAIR_DTYPE)
+        pairs["fingerprint"] = row_fingerprints(chunk, self.columns)
+        pairs["row"] = np.arange(self.rows_seen, self.rows_seen + len(chunk), dtype=np.int64)
+        self.rows_seen += len(chunk)
+        self._buffer.append(pairs)
+        self._buffered_bytes += pairs.nbytes
+        if self._buffered_bytes > self.memory_budget:
+            self._spill()
+
+    def _partition_of(self, fingerprints: Any) -> Any:
+        # High bits pick the partition; sorting within a partition uses all 64
+        return ((fingerprints >> np.uint64(32)) % np.uint64(self.partitions)).astype(np.int64)
+
+    def _partition_path(self, partition: int) -> str:
+        assert self._spill_dir is not None
+        return os.path.join(self._spill_dir, f"part_{partition:04d}.bin")
+
+    def _spill(self) -> None:
+        if not self._buffer:
+            return
+        if self._spill_dir is None:
+            if self._spill_root:
+                os.makedirs(self._spill_root, exist_ok=True)
+            self._spill_dir = tempfile.mkdtemp(prefix="mapper_duplicates_", dir=self._spill_root)
+        pairs = np.concatenate(self._buffer)
+        self._buffer = []
+        self._buffered_bytes = 0
+        parts = self._partition_of(pairs["fingerprint"])
+        order = np.argsort(parts, kind="stable")
+        bounds = np.searchsorted(parts[order], np.arange(self.partitions + 1))
+        for partition in range(self.partitions):
+            start, end = bounds[partition], bounds[partition + 1]
+            if end > start:
+                with open(self._partition_path(partition), "ab") as handle:
+                    pairs[order[start:end]].tofile(handle)
+        self.spilled = True
+
+    def _candidate_partitions(self) -> Iterator[Any]:
+        if not self.spilled:
+            if self._buffer:
+                yield np.concatenate(self._buffer)
+            return
+        self._spill()
+        for partition in range(self.partitions):
+            path = self._partition_path(partition)
+            if os.path.exists(path):
+                yield np.fromfile(path, dtype=PAIR_DTYPE)
+
+    def candidates(self) -> DuplicateGroups:
+        """Groups of rows with equal fingerprints (not yet verified)."""
+        rows_parts: List[Any] = []
+        first_parts: List[Any] = []
+        counts_parts: List[Any] = []
+        for pairs in self._candidate_partitions():
+            # Pairs are stored in row order, so a stable sort keeps rows ascending within a group
+            order = np.argsort(np.ascontiguousarray(pairs["fingerprint"]), kind="stable")
+            fingerprints = pairs["fingerprint"][order]
+            rows = pairs["row"][order]
+            starts = np.flatnonzero(np.r_[True, fingerprints[1:] != fingerprints[:-1]]) if len(rows) else np.empty(0, dtype=np.int64)
+            counts = np.diff(np.r_[starts, len(rows)])
+            keep = counts > 1
+            if not keep.any():
+                continue
+            in_group = np.repeat(keep, counts)
+            rows_parts.append(rows[in_group])
+            first_parts.append(rows[starts[keep]])
+            counts_parts.append(counts[keep])
+        if not rows_parts:
+            return _empty_groups(self.rows_seen)
+        counts = np.concatenate(counts_parts)
+        firsts = np.concatenate(first_parts)
+        rows = np.concatenate(rows_parts)
+        # Number groups by first occurrence
+        rank = np.empty(len(firsts), dtype=np.int64)
+        rank[np.argsort(firsts, kind="stable")] = np.arange(len(firsts))
+        groups = np.repeat(rank, counts)
+        order = np.argsort(rows, kind="stable")
+        return DuplicateGroups(rows[order], groups[order], counts[np.argsort(rank)], self.rows_seen)
+
+    def resolve(self, chunks: Iterable[Any]) -> DuplicateGroups:
+        """Verify candidate groups against the key values and return exact groups.
+
+        Args:
+            chunks: The same rows as were added, in the same chunking order or
+                any other (row ids are counted from 0).
+        """
+        try:
+            return verify_groups(self.candidates(), chunks, self.columns)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Remove spill files."""
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+        self._buffer = []
+        self._buffered_bytes = 0
+
+
+def _empty_groups(total_rows: int) -> DuplicateGroups:
+    return DuplicateGroups(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), total_rows)
+
+
+def _same_values(left: List[Any], right: List[Any]) -> Any:
+    """Row-wise equality of two lists of key value arrays (missing equals missing)."""
+    same = np.ones(len(left[0]), dtype=bool)
+    for a, b in zip(left, right):
+        equal = np.asarray(a == b, dtype=bool)
+        # NaN != NaN: only unequal pairs need the (slower) missing-value check
+        unequal = np.flatnonzero(~equal)
+        if len(unequal):
+            equal[unequal] = pd.isna(a[unequal]) & pd.isna(b[unequal])
+        same &= equal
+    return same
+
+
+def verify_groups(candidates: DuplicateGroups, chunks: Iterable[Any], columns: Optional[List[str]] = None) -> DuplicateGroups:
+    """Split fingerprint groups whose rows do not share the same key values.
+
+    Each row is compared with its group's first row, which is read before
+    it. Rows that differ are regrouped among themselves by value; groups left
+    with a single row are dropped.
+
+    Args:
+        candidates: Groups from `DuplicateEngine.candidates`
+        chunks: The fingerprinted rows, in order
+        columns: Key columns (None for all columns)
+
+    Returns:
+        Exact duplicate groups
+    """
+    if not candidates.group_count:
+        return candidates
+    first_rows = np.full(candidates.group_count, -1, dtype=np.int64)
+    # Key values of each group's first row, one object array per key column
+    representatives: Optional[List[Any]] = None
+    key_names: List[Any] = []
+    mismatched: List[Any] = []
+    offset = 0
+    for chunk in chunks:
+        lo, hi = np.searchsorted(candidates.rows, [offset, offset + len(chunk)])
+        rows = candidates.rows[lo:hi]
+        groups = candidates.groups[lo:hi]
+        local = rows - offset
+        offset += len(chunk)
+        if not len(rows):
+            continue
+        if representatives is None:
+            key_names = list(chunk.columns) if columns is None else list(columns)
+            representatives = [np.empty(candidates.group_count, dtype=object) for _ in key_names]
+        key_positions = chunk.columns.get_indexer(key_names)
+
+        def key_values(positions: Any) -> List[Any]:
+            return [chunk.iloc[positions, column].to_numpy(dtype=object) for column in key_positions]
+
+        # Rows ascend, so a group's first row is seen before the rest
+        unseen = first_rows[groups] < 0
+        new_groups, first_index = np.unique(groups[unseen], return_index=True)
+        if len(new_groups):
+            first_rows[new_groups] = rows[unseen][first_index]
+            for stored, values in zip(representatives, key_values(local[unseen][first_index])):
+                stored[new_groups] = values
+        others = rows != first_rows[groups]
+        if not others.any():
+            continue
+        values = key_values(local[others])
+        differ = ~_same_values(values, [stored[groups[others]] for stored in representatives])
+        if differ.any():
+            frame = pd.DataFrame({name: column[differ] for name, column in zip(key_names, values)})
+            mismatched.append(frame.assign(_row=rows[others][differ], _group=groups[others][differ]))
+    if not mismatched:
+        return candidates
+    return _regroup(candidates, pd.concat(mismatched, ignore_index=True))
+
+
+def _regroup(candidates: DuplicateGroups, mismatched: Any) -> DuplicateGroups:
+    """Give fingerprint-collision rows groups of their own, then renumber."""
+    groups = candidates.groups.copy()
+    keys = [c for c in mismatched.columns if c not in ("_row", "_group")]
+    split = mismatched.groupby(["_group", *keys], dropna=False, sort=False).ngroup().to_numpy()
+    positions = np.searchsorted(candidates.rows, mismatched["_row"].to_numpy())
+    groups[positions] = candidates.group_count + split
+    # Rows ascend, so factorizing numbers groups by first occurrence
+    codes = pd.factorize(groups)[0]
+    keep = np.bincount(codes)[codes] > 1
+    codes = pd.factorize(codes[keep])[0].astype(np.int64)
+    return DuplicateGroups(candidates.rows[keep], codes, np.bincount(codes), candidates.total_rows)
+
+
+def find_duplicates(
+    df: Any,
+    columns: Optional[List[str]] = None,
+    memory_budget_mb: Optional[int] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> DuplicateGroups:
+    """Exact duplicate groups of an in-memory frame.
+
+    Args:
+        df: DataFrame
+        columns: Key columns (None for all columns)
+        memory_budget_mb: Fingerprint memory before spilling (default:
+            `DUPLICATE_MEMORY_BUDGET_MB`)
+        chunk_rows: Rows fingerprinted at a time
+
+    Returns:
+        DuplicateGroups over the rows of `df`
+    """
+    def chunks() -> Iterator[Any]:
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+
+    return find_duplicates_in_chunks(chunks, columns, memory_budget_mb)
+
+
+def find_duplicates_in_chunks(
+    chunks: Callable[[], Iterable[Any]],
+    columns: Optional[List[str]] = None,
+    memory_budget_mb: Optional[int] = None,
+    spill_dir: Optional[str] = None
+) -> DuplicateGroups:
+    """Exact duplicate groups of a chunked source, e.g. a file too large to load.
+
+    Args:
+        chunks: Returns a fresh iterable of the source chunks each call (the
+            source is read twice), e.g.
+            ``lambda: iter_source_chunks(path)``
+        columns: Key columns (None for all columns)
+        memory_budget_mb: Fingerprint memory before spilling (default:
+            `DUPLICATE_MEMORY_BUDGET_MB`)
+        spill_dir: Parent folder for spill partitions (default: system temp)
+
+    Returns:
+        DuplicateGroups, row positions counted across chunks
+    """
+    engine = DuplicateEngine(columns, memory_budget_mb, spill_dir=spill_dir)
+    try:
+        for chunk in chunks():
+            engine.add(chunk)
+    except BaseException:
+        engine.close()
+        raise
+    return engine.resolve(chunks())
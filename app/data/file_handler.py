@@ -5,7 +5,7 @@ import csv
 import json
 import os
 import io
-from typing import Tuple, List, Any, Optional, IO, cast, Dict
+from typing import Tuple, List, Any, Optional, IO, Iterator, cast, Dict
 import streamlit as st  # type: ignore[import-not-found]
 
 st = cast(Any, st)
@@ -503,6 +503,11 @@ def infer_fixed_width_positions(file_obj: IO[bytes], num_bytes: int = 2048, num_
 
 @st.cache_data(show_spinner=False)
 def _load_claims_df_cached(ext: str, content: bytes, delimiter: Optional[str], has_hdr: Optional[bool]) -> Tuple[Any, bool]:
+    """Cached wrapper around `parse_source_bytes`."""
+    return parse_source_bytes(ext, content, delimiter, has_hdr)
+
+
+def parse_source_bytes(ext: str, content: bytes, delimiter: Optional[str], has_hdr: Optional[bool]) -> Tuple[Any, bool]:
     """Load a claims file buffer into a DataFrame with format-aware parsing.
 
     Supports CSV/TSV/TXT, Excel, JSON, and Parquet. Returns the DataFrame and
@@ -604,6 +609,77 @@ def load_source_file(file: Any) -> Tuple[Any, bool]:
     return _load_claims_df_cached(ext, content, delimiter, has_hdr)
 
 
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def iter_source_chunks(
+    source: Any,
+    chunksize: int = DEFAULT_CHUNK_SIZE,
+    delimiter: Optional[str] = None,
+    has_hdr: Optional[bool] = None,
+    encoding: Optional[str] = None
+) -> Iterator[Any]:
+    """Yield a source file as DataFrame chunks without loading it whole.
+
+    Delimited text is read with the same options as `_load_claims_df_cached`
+    (all columns as strings, bad lines skipped) and Parquet is read one
+    record batch at a time. Excel and JSON cannot be streamed, so they are
+    loaded once and sliced.
+
+    Args:
+        source: File path or uploaded file-like object (needs a ``name``).
+        chunksize: Rows per chunk.
+        delimiter: Delimiter for text formats; detected when None.
+        has_hdr: Whether text sources have a header row; detected when None.
+        encoding: Text encoding; detected from the first bytes when None.
+
+    Yields:
+        DataFrame chunks with a continuous RangeIndex.
+
+    Raises:
+        ValueError: If the file type is unsupported.
+    """
+    name = source if isinstance(source, str) else getattr(source, "name", "")
+    ext = os.path.splitext(str(name))[-1].lower()
+    if ext not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported file type: {ext}. Supported: {', '.join(SUPPORTED_FORMATS)}")
+
+    handle = open(source, "rb") if isinstance(source, str) else source
+    try:
+        handle.seek(0)
+        if ext in ['.csv', '.tsv', '.txt']:
+            sample = handle.read(10000)
+            handle.seek(0)
+            if delimiter is None:
+                delimiter = detect_delimiter(handle)
+                handle.seek(0)
+            if has_hdr is None:
+                has_hdr = has_header(handle, delimiter)
+                handle.seek(0)
+            reader = pd.read_csv(  # type: ignore[no-untyped-call]
+                handle, delimiter=delimiter or ',', header=0 if has_hdr else None, dtype=str,
+                encoding=encoding or detect_encoding(sample), on_bad_lines="skip", chunksize=chunksize
+            )
+            with reader:
+                yield from reader
+        elif ext == '.parquet':
+            import pyarrow.parquet as pq  # type: ignore[import-not-found]
+
+            start = 0
+            for batch in pq.ParquetFile(handle).iter_batches(batch_size=chunksize):
+                chunk = batch.to_pandas()
+                chunk.index = pd.RangeIndex(start, start + len(chunk))
+                start += len(chunk)
+                yield chunk
+        else:
+            df, _ = _load_claims_df_cached(ext, handle.read(), None, None)
+            for start in range(0, len(df), chunksize):
+                yield df.iloc[start:start + chunksize]
+    finally:
+        if isinstance(source, str):
+            handle.close()
+
+
 def load_claims_file(file: Any) -> Tuple[Any, bool]:
     """Load an uploaded claims file and return parsed data plus header flag.
     
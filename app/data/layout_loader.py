@@ -1,15 +1,169 @@
 # pyright: reportUnknownMemberType=false, reportMissingTypeStubs=false, reportUnknownVariableType=false, reportUnknownArgumentType=false
 import pandas as pd  # type: ignore[import-not-found]
-from typing import List, Any, cast, Optional
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Any, Mapping, Tuple, cast, Optional
 import streamlit as st  # type: ignore[import-not-found]
 from typing import Any as _Any
 
+from utils.cache_manager import FrameRegistry
+
 st = cast(_Any, st)
 pd = cast(_Any, pd)
 
 # Default required columns (for backward compatibility)
 DEFAULT_REQUIRED_COLUMNS = ["Data Field", "Usage", "Category"]
 
+# (field, usage, category, data type, examples) - one per layout row, in order
+LayoutRecord = Tuple[str, str, str, str, Tuple[str, ...]]
+
+
+@dataclass(frozen=True)
+class LayoutIndex:
+    """Immutable, precompiled view of a cleaned internal layout.
+
+    Built once per layout so that per-rerun lookups (usage, category, required
+    and optional sets, category groupings) are dictionary or set lookups
+    instead of DataFrame filters. Field-keyed maps keep the first occurrence of
+    a duplicated field, matching how the mapping UI deduplicates groups.
+
+    Attributes:
+        records: One ``(field, usage, category, data_type, examples)`` tuple
+            per layout row, in layout order (duplicates preserved).
+        fields: Distinct internal field names in layout order.
+        required_fields: Distinct mandatory fields in layout order.
+        optional_fields: Distinct optional fields that are not also mandatory.
+        required_set: Frozen set of ``required_fields``.
+        optional_set: Frozen set of ``optional_fields``.
+        categories: Sorted, non-empty category names.
+        usage: Field -> normalized usage.
+        category: Field -> category.
+        data_type: Field -> declared data type ("" when the layout has none).
+        examples: Field -> example values.
+        required_groups: Category -> mandatory fields, sorted by category.
+        optional_groups: Category -> optional fields, sorted by category.
+    """
+
+    records: Tuple[LayoutRecord, ...]
+    fields: Tuple[str, ...] = field(init=False)
+    required_fields: Tuple[str, ...] = field(init=False)
+    optional_fields: Tuple[str, ...] = field(init=False)
+    required_set: FrozenSet[str] = field(init=False)
+    optional_set: FrozenSet[str] = field(init=False)
+    categories: Tuple[str, ...] = field(init=False)
+    usage: Mapping[str, str] = field(init=False)
+    category: Mapping[str, str] = field(init=False)
+    data_type: Mapping[str, str] = field(init=False)
+    examples: Mapping[str, Tuple[str, ...]] = field(init=False)
+    required_groups: Mapping[str, Tuple[str, ...]] = field(init=False)
+    optional_groups: Mapping[str, Tuple[str, ...]] = field(init=False)
+
+    def __post_init__(self) -> None:
+        first: Dict[str, LayoutRecord] = {}
+        for record in self.records:
+            first.setdefault(record[0], record)
+
+        fields = tuple(first)
+        required = tuple(f for f in fields if first[f][1].lower() == "mandatory")
+        required_set = frozenset(required)
+        optional = tuple(
+            f for f in fields
+            if first[f][1].lower() == "optional" and f not in required_set
+        )
+
+        def _group(names: Tuple[str, ...]) -> Mapping[str, Tuple[str, ...]]:
+            groups: Dict[str, List[str]] = {}
+            for name in names:
+                cat = first[name][2]
+                if cat:
+                    groups.setdefault(cat, []).append(name)
+            return MappingProxyType({cat: tuple(groups[cat]) for cat in sorted(groups)})
+
+        values = {
+            "fields": fields,
+            "required_fields": required,
+            "optional_fields": optional,
+            "required_set": required_set,
+            "optional_set": frozenset(optional),
+            "categories": tuple(sorted({r[2] for r in self.records if r[2]})),
+            "usage": MappingProxyType({f: r[1] for f, r in first.items()}),
+            "category": MappingProxyType({f: r[2] for f, r in first.items()}),
+            "data_type": MappingProxyType({f: r[3] for f, r in first.items()}),
+            "examples": MappingProxyType({f: r[4] for f, r in first.items()}),
+            "required_groups": _group(required),
+            "optional_groups": _group(optional),
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __reduce__(self) -> Any:
+        # Mapping proxies are not picklable; rebuild from the records instead
+        return (LayoutIndex, (self.records,))
+
+    def is_required(self, field_name: str) -> bool:
+        """Return True if ``field_name`` is a mandatory layout field."""
+        return field_name in self.required_set
+
+    @classmethod
+    def from_layout_df(cls, layout_df: Any, config: Optional[Any] = None) -> "LayoutIndex":
+        """Compile a LayoutIndex from a cleaned layout DataFrame.
+
+        Args:
+            layout_df: Cleaned internal layout DataFrame-like object.
+            config: DomainConfig instance. If None, uses default.
+
+        Returns:
+            LayoutIndex for the layout.
+        """
+        if config is None:
+            from core.domain_config import get_domain_config
+            config = get_domain_config()
+
+        n_rows = len(layout_df)
+
+        def _column(name: str) -> List[str]:
+            if name not in layout_df.columns:
+                return [""] * n_rows
+            return layout_df[name].fillna("").astype(str).str.strip().tolist()  # type: ignore[no-untyped-call]
+
+        example_cols = [c for c in layout_df.columns if str(c).startswith("Example")]
+        example_values = list(zip(*[_column(c) for c in example_cols])) if example_cols else [()] * n_rows
+
+        records: List[LayoutRecord] = []
+        for field_name, usage, category, data_type, examples in zip(
+            _column(config.internal_field_name),
+            _column(config.internal_usage_name),
+            _column(config.internal_category_name),
+            _column(config.layout_columns.get("data_type", "Data Type")),
+            example_values,
+        ):
+            if not field_name or field_name.lower() == "nan":
+                continue
+            records.append((field_name, usage, category, data_type, tuple(e for e in examples if e and e.lower() != "nan")))
+        return cls(tuple(records))
+
+
+_layout_indexes = FrameRegistry()
+
+
+def get_layout_index(layout_df: Any, config: Optional[Any] = None) -> LayoutIndex:
+    """Return the LayoutIndex for a layout DataFrame, compiling it on first use.
+
+    Layouts produced by `load_internal_layout` are indexed at load time, so
+    this is normally an O(1) registry lookup.
+
+    Args:
+        layout_df: Cleaned internal layout DataFrame-like object.
+        config: DomainConfig instance. If None, uses default.
+
+    Returns:
+        LayoutIndex for ``layout_df``.
+    """
+    index = _layout_indexes.get(layout_df)
+    if index is None:
+        index = _layout_indexes.set(layout_df, LayoutIndex.from_layout_df(layout_df, config))
+    return index
+
 def load_internal_layout(file: Any, config: Optional[Any] = None) -> Any:
     """Load and normalize the internal layout file.
 
@@ -60,8 +214,8 @@ def load_internal_layout(file: Any, config: Optional[Any] = None) -> Any:
     if missing:
         raise ValueError(f"Layout file missing required column(s): {', '.join(missing)}")
 
-    # --- Normalize all values ---
-    df = df.applymap(lambda x: str(x).strip() if pd.notnull(x) else "")  # type: ignore[no-untyped-call]
+    # --- Normalize all values (every column is str after astype above) ---
+    df = df.apply(lambda col: col.str.strip())  # type: ignore[no-untyped-call]
 
     # --- Rename for internal consistency using config ---
     rename_map = {
@@ -75,11 +229,9 @@ def load_internal_layout(file: Any, config: Optional[Any] = None) -> Any:
     usage_col = config.internal_usage_name
     df[usage_col] = df[usage_col].astype(str).str.strip()  # type: ignore[no-untyped-call]
     
-    # Normalize using domain config mappings
-    for idx, row in df.iterrows():
-        usage_value = str(row[usage_col]).strip()
-        normalized = config.normalize_usage_value(usage_value)
-        df.at[idx, usage_col] = normalized  # type: ignore[no-untyped-call]
+    # Normalize using domain config mappings (once per distinct value)
+    usage_map = {value: config.normalize_usage_value(value) for value in df[usage_col].unique()}
+    df[usage_col] = df[usage_col].map(usage_map)  # type: ignore[no-untyped-call]
 
     # --- Normalize Other Fields ---
     field_col = config.internal_field_name
@@ -97,11 +249,15 @@ def load_internal_layout(file: Any, config: Optional[Any] = None) -> Any:
     if df.empty:
         raise ValueError("Layout file appears empty after cleaning. Please check the file contents.")
 
+    _layout_indexes.set(df, LayoutIndex.from_layout_df(df, config))
     return df
 
 def get_required_fields(layout_df: Any, config: Optional[Any] = None) -> Any:
     """Return a filtered view with only mandatory fields.
 
+    Prefer `get_layout_index(layout_df).required_fields` when only the field
+    names are needed; this builds a new DataFrame on every call.
+
     Args:
         layout_df: Cleaned internal layout DataFrame-like object.
         config: DomainConfig instance. If None, uses default.
@@ -120,6 +276,9 @@ def get_required_fields(layout_df: Any, config: Optional[Any] = None) -> Any:
 def get_optional_fields(layout_df: Any, config: Optional[Any] = None) -> Any:
     """Return a filtered view with only optional fields.
 
+    Prefer `get_layout_index(layout_df).optional_fields` when only the field
+    names are needed; this builds a new DataFrame on every call.
+
     Args:
         layout_df: Cleaned internal layout DataFrame-like object.
         config: DomainConfig instance. If None, uses default.
@@ -160,9 +319,10 @@ def render_layout_summary_section() -> None:
     if layout_df is not None:
         st.markdown("#### Internal Layout Summary")
 
+        layout_index = get_layout_index(layout_df)
         total_fields = len(layout_df)
-        required_fields = layout_df[layout_df["Usage"].str.lower() == "mandatory"].shape[0]
-        optional_fields = layout_df[layout_df["Usage"].str.lower() == "optional"].shape[0]
+        required_fields = len(layout_index.required_fields)
+        optional_fields = len(layout_index.optional_fields)
         category_counts = layout_df["Category"].value_counts().to_dict()
 
         st.markdown(f"**Total Fields:** {total_fields}", unsafe_allow_html=True)
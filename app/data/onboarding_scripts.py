@@ -708,19 +708,11 @@ def generate_onboarding_sql_script(
             # Check layout_df to determine which columns are required
             if layout_df is not None and not layout_df.empty and final_mapping:
                 try:
-                    from core.domain_config import get_domain_config
-                    config = get_domain_config()
-                    internal_field_col = config.internal_field_name
-                    usage_col = config.internal_usage_name
+                    from data.layout_loader import get_layout_index
                     
                     # Build reverse mapping: source_col -> internal_field -> usage
-                    for idx, row in layout_df.iterrows():
-                        internal_field = str(row.get(internal_field_col, '')).strip()
-                        if not internal_field or internal_field.lower() == 'nan':
-                            continue
-                        
-                        usage = str(row.get(usage_col, '')).strip().lower()
-                        is_mandatory = usage == 'mandatory'
+                    for internal_field, usage, _category, _data_type, _examples in get_layout_index(layout_df).records:
+                        is_mandatory = usage.lower() == 'mandatory'
                         
                         # Find the source column mapped to this internal field
                         if internal_field in final_mapping:
@@ -910,10 +902,8 @@ def generate_onboarding_sql_script(
             
             # Generate mappings for all prep columns from layout_df (should be ~38 based on actual layout)
             try:
-                for idx, row in layout_df.iterrows():
-                    internal_field = str(row.get(internal_field_col, '')).strip()
-                    if not internal_field or internal_field.lower() == 'nan':
-                        continue
+                from data.layout_loader import get_layout_index
+                for internal_field, _usage, _category, _data_type, _examples in get_layout_index(layout_df).records:
                     
                     prep_col = None
                     formatted_internal = format_column_name(internal_field, client_name)
@@ -0,0 +1,224 @@
+# pyright: reportUnknownMemberType=false, reportMissingTypeStubs=false, reportUnknownVariableType=false, reportUnknownArgumentType=false
+"""Chunk-at-a-time output writers used by the streaming transform.
+
+Each sink accepts DataFrame chunks with identical columns and appends them to
+a path or binary file-like target, so output size never bounds memory use.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Type, cast
+
+import pandas as pd  # type: ignore[import-not-found]
+
+from core.exceptions import FileError
+
+pd = cast(Any, pd)
+
+# Supported output formats -> default file extension
+SINK_FORMATS: Dict[str, str] = {
+    "csv": ".csv",
+    "tsv": ".tsv",
+    "parquet": ".parquet",
+    "fixed_width": ".txt",
+}
+
+FIXED_WIDTH_MIN_WIDTH = 10
+
+
+class OutputSink(ABC):
+    """Base class for streaming output writers.
+
+    Use as a context manager, or call `close()` explicitly once all chunks
+    have been written.
+
+    Attributes:
+        target: File path or binary file-like object receiving the output.
+        rows_written: Rows written so far.
+        chunks_written: Chunks written so far.
+    """
+
+    def __init__(self, target: Any) -> None:
+        self.target = target
+        self.rows_written = 0
+        self.chunks_written = 0
+        self._handle: Optional[Any] = None
+        self._owns_handle = False
+        self._closed = False
+
+    def _open(self) -> Any:
+        """Return the binary handle, opening the target path on first use."""
+        if self._handle is None:
+            if isinstance(self.target, (str, bytes)) or hasattr(self.target, "__fspath__"):
+                self._handle = open(self.target, "wb")
+                self._owns_handle = True
+            else:
+                self._handle = self.target
+        return self._handle
+
+    def write(self, chunk: Any) -> None:
+        """Append one chunk to the output.
+
+        Args:
+            chunk: DataFrame with the same columns as previous chunks.
+
+        Raises:
+            FileError: If the sink is already closed.
+        """
+        if self._closed:
+            raise FileError("Cannot write to a closed output sink")
+        self._write_chunk(chunk)
+        self.rows_written += len(chunk)
+        self.chunks_written += 1
+
+    @abstractmethod
+    def _write_chunk(self, chunk: Any) -> None:
+        """Serialize one chunk."""
+
+    def close(self) -> None:
+        """Flush the output and release the target if the sink opened it."""
+        if self._closed:
+            return
+        self._closed = True
+        self._finish()
+        if self._handle is not None:
+            self._handle.flush()
+            if self._owns_handle:
+                self._handle.close()
+
+    def _finish(self) -> None:
+        """Hook for sinks that must write a footer or close a writer."""
+
+    def __enter__(self) -> "OutputSink":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class DelimitedSink(OutputSink):
+    """CSV/TSV writer; the header is written with the first chunk only."""
+
+    def __init__(self, target: Any, sep: str = ",", header: bool = True, encoding: str = "utf-8") -> None:
+        super().__init__(target)
+        self.sep = sep
+        self.header = header
+        self.encoding = encoding
+
+    def _write_chunk(self, chunk: Any) -> None:
+        text = chunk.to_csv(index=False, sep=self.sep, header=self.header and self.chunks_written == 0)
+        self._open().write(text.encode(self.encoding))
+
+
+class ParquetSink(OutputSink):
+    """Parquet writer emitting one row group per chunk.
+
+    The schema is fixed by the first chunk; all-null columns are typed as
+    strings so later chunks with values can be cast to it.
+    """
+
+    def __init__(self, target: Any, compression: str = "snappy") -> None:
+        super().__init__(target)
+        self.compression = compression
+        self._writer: Optional[Any] = None
+        self._schema: Optional[Any] = None
+
+    def _write_chunk(self, chunk: Any) -> None:
+        import pyarrow as pa  # type: ignore[import-not-found]
+        import pyarrow.parquet as pq  # type: ignore[import-not-found]
+
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._writer is None:
+            fields = [
+                pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f
+                for f in table.schema
+            ]
+            self._schema = pa.schema(fields)
+            self._writer = pq.ParquetWriter(self._open(), self._schema, compression=self.compression)
+        self._writer.write_table(table.cast(self._schema))
+
+    def _finish(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+class FixedWidthSink(OutputSink):
+    """Fixed-width text writer.
+
+    Unlike `_convert_to_fixed_width`, which sizes columns from the whole
+    frame, widths must be known before the first row is written: they are
+    taken from `widths` or sized from the first chunk (at least the header
+    length and `FIXED_WIDTH_MIN_WIDTH`). A later value longer than its
+    column raises `FileError` rather than being truncated; pass `widths`
+    (e.g. from a fixed-width spec) when later chunks may hold longer values.
+    """
+
+    def __init__(self, target: Any, widths: Optional[Dict[str, int]] = None, header: bool = True, encoding: str = "utf-8") -> None:
+        super().__init__(target)
+        self.widths: Dict[str, int] = dict(widths or {})
+        self.header = header
+        self.encoding = encoding
+        self._columns: List[str] = []
+
+    def _write_chunk(self, chunk: Any) -> None:
+        handle = self._open()
+        if self.chunks_written == 0:
+            self._columns = [str(col) for col in chunk.columns]
+            for col in chunk.columns:
+                if str(col) not in self.widths:
+                    values = chunk[col].dropna().astype(str)  # type: ignore[no-untyped-call]
+                    longest = int(values.str.len().max()) if len(values) else 0
+                    self.widths[str(col)] = max(longest, len(str(col)), FIXED_WIDTH_MIN_WIDTH)
+            if self.header:
+                handle.write("".join(col.ljust(self.widths[col]) for col in self._columns).encode(self.encoding))
+        if chunk.empty:
+            return
+
+        padded = []
+        for col in chunk.columns:
+            width = self.widths[str(col)]
+            values = chunk[col].astype(object).where(chunk[col].notna(), "").astype(str)  # type: ignore[no-untyped-call]
+            lengths = values.str.len()
+            if int(lengths.max()) > width:
+                row = int(lengths.to_numpy().argmax())
+                raise FileError(
+                    f"Value in column '{col}' is {int(lengths.max())} characters, wider than its "
+                    f"fixed width of {width} (row {self.rows_written + row + 1})"
+                )
+            padded.append(values.str.ljust(width))
+        lines = padded[0].str.cat(padded[1:]) if len(padded) > 1 else padded[0]
+        # Records are newline-separated without a trailing newline, as in
+        # `_convert_to_fixed_width`
+        prefix = "\n" if (self.header or self.rows_written) else ""
+        handle.write((prefix + "\n".join(lines.tolist())).encode(self.encoding))
+
+
+_SINK_CLASSES: Dict[str, Type[OutputSink]] = {
+    "csv": DelimitedSink,
+    "tsv": DelimitedSink,
+    "parquet": ParquetSink,
+    "fixed_width": FixedWidthSink,
+}
+
+
+def create_sink(fmt: str, target: Any, **kwargs: Any) -> OutputSink:
+    """Create an output sink for a format.
+
+    Args:
+        fmt: One of `SINK_FORMATS` ("csv", "tsv", "parquet", "fixed_width";
+            "fixed-width" is accepted too).
+        target: File path or binary file-like object.
+        **kwargs: Sink-specific options (e.g. `header`, `widths`, `compression`).
+
+    Returns:
+        An OutputSink for the format.
+
+    Raises:
+        FileError: If the format is not supported.
+    """
+    key = fmt.lower().replace("-", "_")
+    sink_cls = _SINK_CLASSES.get(key)
+    if sink_cls is None:
+        raise FileError(f"Unsupported output format: {fmt}. Supported: {', '.join(SINK_FORMATS)}")
+    if key == "tsv":
+        kwargs.setdefault("sep", "\t")
+    return sink_cls(target, **kwargs)
+
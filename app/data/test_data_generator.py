@@ -4,6 +4,8 @@ from typing import Any, Dict, List, Optional
 import pandas as pd  # type: ignore[import-not-found]
 import random
 import io
+
+from data.date_parsing import PYSPARK_TO_PANDAS_DATE_FORMAT
 from datetime import datetime, timedelta
 
 try:
@@ -69,10 +71,8 @@ def generate_test_data_with_scenarios(
     
     # Get internal fields and their data types
     from core.domain_config import get_domain_config
+    from data.layout_loader import get_layout_index
     config = get_domain_config()
-    internal_field_col = config.internal_field_name
-    data_type_col = config.layout_columns.get("data_type", "Data Type")
-    usage_col = config.internal_usage_name
     
     internal_fields = []
     field_types = {}
@@ -80,14 +80,10 @@ def generate_test_data_with_scenarios(
     required_fields = []
     
     try:
-        for idx, row in layout_df.iterrows():
-            field = str(row.get(internal_field_col, '')).strip()
-            if not field or field.lower() == 'nan':
-                continue
+        layout_index = get_layout_index(layout_df, config)
+        for field, usage, _category, data_type, _examples in layout_index.records:
             internal_fields.append(field)
-            data_type = str(row.get(data_type_col, 'string')).lower()
-            field_types[field] = data_type
-            usage = str(row.get(usage_col, '')).strip()
+            field_types[field] = (data_type or 'string').lower()
             field_usage[field] = usage
             if usage.lower() == 'mandatory':
                 required_fields.append(field)
@@ -152,25 +148,6 @@ def generate_test_data_with_scenarios(
     if file_date_format is None:
         file_date_format = "yyyyMMdd"
     
-    # Date format mapping
-    PYSPARK_TO_PANDAS_DATE_FORMAT = {
-        "yyyyMMdd": "%Y%m%d",
-        "yyyy-MM-dd": "%Y-%m-%d",
-        "yyyy/MM/dd": "%Y/%m/%d",
-        "MMddyyyy": "%m%d%Y",
-        "MM/dd/yyyy": "%m/%d/%Y",
-        "MMddyy": "%m%d%y",
-        "MM/dd/yy": "%m/%d/%y",
-        "dd-MM-yyyy": "%d-%m-%Y",
-        "dd/MM/yyyy": "%d/%m/%Y",
-        "ddMMyyyy": "%d%m%Y",
-        "ddMMyy": "%d%m%y",
-        "dd/MM/yy": "%d/%m/%y",
-        "yyyyMM": "%Y%m",
-        "MM-yyyy": "%m-%Y",
-        "MM/yyyy": "%m/%Y",
-        "yyyyMd": "%Y%m%d",
-    }
     
     pandas_date_format = PYSPARK_TO_PANDAS_DATE_FORMAT.get(file_date_format, "%Y%m%d")
     
@@ -1,37 +1,346 @@
 # pyright: reportUnknownMemberType=false, reportMissingTypeStubs=false, reportUnknownVariableType=false, reportUnknownArgumentType=false
 import pandas as pd  # type: ignore[import-not-found]
-from typing import Any, cast, Dict, Optional
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, cast, Dict, Iterable, List, Optional, Tuple
 import streamlit as st  # type: ignore[import-not-found]
 import hashlib
 import json
+import time
+
+from data.date_parsing import parse_dates
 
 pd = cast(Any, pd)
 st = cast(Any, st)
 
+# --- Transformation Plan ---
+
+# Cleaning kernels, applied in this order
+KERNEL_TRIM = "trim"
+KERNEL_DATE = "date"
+KERNEL_ID = "id_normalize"
+
+# Target-name keywords that select a kernel
+DATE_FIELD_KEYWORDS = ("date",)
+ID_FIELD_KEYWORDS = ("ssn", "npi", "zip", "cpt", "hcpcs")
+
+_PLAN_CACHE_MAX_SIZE = 32
+
+
+@dataclass(frozen=True)
+class ColumnPlan:
+    """Compiled transformation for a single target column.
+
+    Attributes:
+        target: Target (internal layout) field name.
+        source: Mapped source column, or None when unmapped.
+        kernels: Cleaning kernels applied in order. ``trim`` only touches
+            object-dtype input, matching the in-memory cleaning rules.
+        output_dtype: Logical output type: "string", "datetime" or "id".
+        layout_type: Data type declared in the layout ("" if none).
+    """
+
+    target: str
+    source: Optional[str]
+    kernels: Tuple[str, ...]
+    output_dtype: str
+    layout_type: str = ""
+
+
+@dataclass(frozen=True)
+class TransformPlan:
+    """Columnar transformation plan compiled from a mapping and layout.
+
+    Attributes:
+        version: Hash of the mapping (in target order) and layout types.
+        columns: One ColumnPlan per target, in mapping order.
+    """
+
+    version: str
+    columns: Tuple[ColumnPlan, ...]
+
+    @property
+    def targets(self) -> List[str]:
+        """Target field names in output order."""
+        return [col.target for col in self.columns]
+
+    def to_frame(self) -> Any:
+        """Return the plan as a DataFrame for display or debugging."""
+        return pd.DataFrame([
+            {
+                "Target": col.target,
+                "Source": col.source or "",
+                "Kernels": ", ".join(col.kernels),
+                "Output Type": col.output_dtype,
+                "Layout Type": col.layout_type,
+            }
+            for col in self.columns
+        ])
+
+
+_plan_cache: "OrderedDict[str, TransformPlan]" = OrderedDict()
+
+
+def _compile_column_plan(target: str, source: Optional[str], layout_type: str) -> ColumnPlan:
+    """Choose kernels and output type for one target column."""
+    name = target.lower()
+    kernels: List[str] = [KERNEL_TRIM]
+    output_dtype = "string"
+    # Kernels follow the target name only, as in the row-wise transform; the
+    # layout's declared type is recorded for display but does not add kernels
+    if any(key in name for key in DATE_FIELD_KEYWORDS):
+        kernels.append(KERNEL_DATE)
+        output_dtype = "datetime"
+    if any(key in name for key in ID_FIELD_KEYWORDS):
+        kernels.append(KERNEL_ID)
+        output_dtype = "id"
+    return ColumnPlan(target, source or None, tuple(kernels), output_dtype, layout_type)
+
+
+def get_transform_plan(
+    final_mapping: Dict[str, Dict[str, Any]],
+    layout_df: Optional[Any] = None
+) -> TransformPlan:
+    """Compile (or fetch) the transformation plan for a mapping version.
+
+    Plans depend only on the mapping and layout metadata, never on the data,
+    so they are compiled once per mapping version and reused across reruns.
+
+    Args:
+        final_mapping: Mapping dict `{target_field: {"value": source_col}}`.
+        layout_df: Optional internal layout; declared data types are
+            recorded on the plan (see `TransformPlan.to_frame`).
+
+    Returns:
+        TransformPlan for the mapping.
+    """
+    layout_types: Dict[str, str] = {}
+    if layout_df is not None:
+        from data.layout_loader import get_layout_index
+        layout_types = dict(get_layout_index(layout_df).data_type)
+
+    entries = [
+        (target, (mapping or {}).get("value") or None, layout_types.get(target, ""))
+        for target, mapping in final_mapping.items()
+    ]
+    version = hashlib.md5(json.dumps(entries, default=str).encode()).hexdigest()
+
+    plan = _plan_cache.get(version)
+    if plan is None:
+        plan = TransformPlan(version, tuple(_compile_column_plan(*entry) for entry in entries))
+        _plan_cache[version] = plan
+        if len(_plan_cache) > _PLAN_CACHE_MAX_SIZE:
+            _plan_cache.popitem(last=False)
+    else:
+        _plan_cache.move_to_end(version)
+    return plan
+
+
+def execute_transform_plan(
+    plan: TransformPlan,
+    source_df: Any,
+    date_formats: Optional[Dict[str, Tuple[str, ...]]] = None
+) -> Any:
+    """Run a compiled plan against a source frame.
+
+    Each target column is produced independently and the result is built
+    with a single DataFrame construction; untouched source columns are
+    passed through without copying.
+
+    Args:
+        plan: Plan from `get_transform_plan`.
+        source_df: Source DataFrame-like.
+        date_formats: Optional `{target: format_order}` for date columns.
+            Missing targets are filled in with the formats chosen for this
+            frame, so passing the same dict across chunks keeps date parsing
+            consistent with the first chunk.
+
+    Returns:
+        Transformed DataFrame-like aligned to the plan's targets.
+    """
+    columns = {col.target: _execute_column_plan(col, source_df, date_formats) for col in plan.columns}
+    return pd.DataFrame(columns, index=source_df.index, copy=False)
+
+
+def _execute_column_plan(
+    col: ColumnPlan,
+    source_df: Any,
+    date_formats: Optional[Dict[str, Tuple[str, ...]]] = None
+) -> Any:
+    """Produce one transformed column."""
+    if col.source is not None and col.source in source_df.columns:
+        series = source_df[col.source]
+    else:
+        series = pd.Series([None] * len(source_df.index), index=source_df.index, dtype=object)
+    for kernel in col.kernels:
+        if kernel == KERNEL_DATE and date_formats is not None:
+            parsed = parse_dates(series, date_formats.get(col.target, ()))
+            if parsed.format_order and not date_formats.get(col.target):
+                date_formats[col.target] = parsed.format_order
+            series = parsed.to_object()
+        else:
+            series = _KERNELS[kernel](series)
+    return series.rename(col.target)
+
+
+def _trim_kernel(series: Any) -> Any:
+    """Trim object columns (other dtypes pass through untouched)."""
+    if series.dtype == object:
+        return series.astype(str).str.strip()  # type: ignore[no-untyped-call]
+    return series
+
+
+def _date_kernel(series: Any) -> Any:
+    """Parse YYYYMMDD, Excel serial and formatted dates; NaT becomes None."""
+    return parse_dates(series).to_object()
+
+
+def _id_kernel(series: Any) -> Any:
+    """Strip non-alphanumeric characters from identifiers; empty becomes None."""
+    cleaned = series.astype(str).str.replace(r'[^0-9A-Za-z]', '', regex=True)  # type: ignore[no-untyped-call]
+    cleaned = cleaned.replace('', pd.NA)  # type: ignore[no-untyped-call]
+    cleaned_obj = cleaned.astype('object')  # type: ignore[no-untyped-call]
+    cleaned_obj[pd.isna(cleaned_obj)] = None  # type: ignore[no-untyped-call]
+    return cleaned_obj
+
+
+_KERNELS: Dict[str, Callable[[Any], Any]] = {
+    KERNEL_TRIM: _trim_kernel,
+    KERNEL_DATE: _date_kernel,
+    KERNEL_ID: _id_kernel,
+}
+
+
+# --- Incremental Transformation ---
+
+INCREMENTAL_TRANSFORMER_KEY = "incremental_transformer"
+PREVIEW_TRANSFORMER_KEY = "preview_transformer"
+
+ColumnKey = Tuple[str, str, Tuple[str, ...], str]
+
+
+class IncrementalTransformer:
+    """Per-target-column transformation cache.
+
+    Each transformed column is cached under (source dataset version, source
+    column, kernels, target). After a mapping edit only the targets whose key
+    changed are recomputed; the frame is reassembled from the cached Series
+    without copying them.
+    """
+
+    def __init__(self) -> None:
+        self._columns: Dict[ColumnKey, Any] = {}
+        self._keys: Dict[str, ColumnKey] = {}
+
+    def transform(
+        self,
+        source_df: Any,
+        final_mapping: Dict[str, Dict[str, Any]],
+        layout_df: Optional[Any] = None
+    ) -> Any:
+        """Transform `source_df`, recomputing only columns whose inputs changed.
+
+        Args:
+            source_df: Source DataFrame-like.
+            final_mapping: Mapping dict `{target_field: {"value": source_col}}`.
+            layout_df: Optional internal layout (declared types are recorded on the plan).
+
+        Returns:
+            Transformed DataFrame-like aligned to the mapping's targets.
+        """
+        from utils.cache_manager import get_dataset_version, register_column_fingerprints
+
+        plan = get_transform_plan(final_mapping, layout_df)
+        version = get_dataset_version(source_df)
+        columns: Dict[str, Any] = {}
+        keys: Dict[str, ColumnKey] = {}
+        for col in plan.columns:
+            key: ColumnKey = (version, col.source or "", col.kernels, col.target)
+            series = self._columns.get(key)
+            if series is None:
+                series = _execute_column_plan(col, source_df)
+            columns[col.target] = series
+            keys[col.target] = key
+
+        # Keep only the columns of the current mapping
+        self._columns = {keys[target]: columns[target] for target in keys}
+        self._keys = keys
+        frame = pd.DataFrame(columns, index=source_df.index, copy=False)
+        # A column's cache key determines its content, so it doubles as the
+        # column fingerprint and spares validation from rehashing the data
+        register_column_fingerprints(frame, {
+            target: hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+            for target, key in keys.items()
+        })
+        return frame
+
+    def clear(self) -> None:
+        """Drop all cached columns."""
+        self._columns.clear()
+        self._keys.clear()
+
+
+def get_incremental_transformer(key: str = INCREMENTAL_TRANSFORMER_KEY) -> IncrementalTransformer:
+    """Return the session's incremental transformer stored under `key`."""
+    transformer = st.session_state.get(key)
+    if not isinstance(transformer, IncrementalTransformer):
+        transformer = IncrementalTransformer()
+        st.session_state[key] = transformer
+    return transformer
+
+
+def transform_claims_data_incremental(
+    claims_df: Any,
+    final_mapping: Dict[str, Dict[str, Any]],
+    layout_df: Optional[Any] = None,
+    key: str = INCREMENTAL_TRANSFORMER_KEY
+) -> Any:
+    """Transform claims data through the session's incremental transformer.
+
+    Same output as `transform_claims_data`, but after a mapping edit only the
+    edited target columns are recomputed.
+
+    Args:
+        claims_df: Source claims DataFrame-like.
+        final_mapping: Mapping dict `{internal_field: {"value": source_col}}`.
+        layout_df: Optional internal layout (declared types are recorded on the plan).
+        key: Session state key of the transformer (separate keys keep, for
+            example, the preview from evicting the full-data columns).
+
+    Returns:
+        Transformed DataFrame-like aligned to internal fields.
+    """
+    return get_incremental_transformer(key).transform(claims_df, final_mapping, layout_df)
+
+
 @st.cache_data(show_spinner=False)
 def transform_source_data(
     source_df: Any, 
-    final_mapping: Dict[str, Dict[str, Any]]
+    final_mapping: Dict[str, Dict[str, Any]],
+    layout_df: Optional[Any] = None
 ) -> Any:
     """Transform source data into target layout columns using mappings.
 
     Copies mapped columns, fills missing columns with `None`, and applies
     simple cleaning rules: trim strings, standardize date-like columns,
-    and normalize ID-like fields.
+    and normalize ID-like fields. See `get_transform_plan` for the
+    compiled per-column plan.
 
     Args:
         source_df: Source DataFrame-like.
         final_mapping: Mapping dict `{target_field: {"value": source_col}}`.
+        layout_df: Optional internal layout (declared types are recorded on the plan).
 
     Returns:
         Transformed DataFrame-like aligned to target fields.
     """
-    return _transform_source_data_internal(source_df, final_mapping)
+    return _transform_source_data_internal(source_df, final_mapping, layout_df)
 
 
 def transform_claims_data(
     claims_df: Any, 
-    final_mapping: Dict[str, Dict[str, Any]]
+    final_mapping: Dict[str, Dict[str, Any]],
+    layout_df: Optional[Any] = None
 ) -> Any:
     """Transform claims data into internal layout columns using mappings.
     
@@ -40,102 +349,67 @@ def transform_claims_data(
     Args:
         claims_df: Source claims DataFrame-like.
         final_mapping: Mapping dict `{internal_field: {"value": source_col}}`.
+        layout_df: Optional internal layout (declared types are recorded on the plan).
 
     Returns:
         Transformed DataFrame-like aligned to internal fields.
     """
-    return transform_source_data(claims_df, final_mapping)
+    return transform_source_data(claims_df, final_mapping, layout_df)
 
 
-def _transform_source_data_internal(source_df: Any, final_mapping: Dict[str, Dict[str, Any]]) -> Any:
+def _transform_source_data_internal(
+    source_df: Any,
+    final_mapping: Dict[str, Dict[str, Any]],
+    layout_df: Optional[Any] = None
+) -> Any:
     """Internal transformation function (without pipeline)."""
-    transformed: Any = pd.DataFrame()
+    return execute_transform_plan(get_transform_plan(final_mapping, layout_df), source_df)
+
+def stream_transform(
+    chunks: Iterable[Any],
+    final_mapping: Dict[str, Dict[str, Any]],
+    sink: Any,
+    layout_df: Optional[Any] = None,
+    progress_callback: Optional[Callable[[int, int], None]] = None
+) -> Dict[str, Any]:
+    """Transform source chunks and write them straight to an output sink.
+
+    Uses the same compiled plan and cleaning kernels as
+    `transform_source_data`, one chunk at a time, so memory stays bounded by
+    the chunk size. Date formats chosen for the first chunk are reused for
+    later chunks. The sink is closed when the stream ends.
+
+    Args:
+        chunks: Iterable of source DataFrame chunks (e.g. from
+            `data.file_handler.iter_source_chunks`).
+        final_mapping: Mapping dict `{target_field: {"value": source_col}}`.
+        sink: An `data.output_sinks.OutputSink`.
+        layout_df: Optional internal layout (declared types are recorded on the plan).
+        progress_callback: Optional callback(chunks_done, rows_done).
+
+    Returns:
+        Dict with `rows`, `chunks`, `seconds` and `rows_per_second`.
+    """
+    plan = get_transform_plan(final_mapping, layout_df)
+    date_formats: Dict[str, Tuple[str, ...]] = {}
+    rows = 0
+    chunk_count = 0
+    start = time.perf_counter()
+    with sink:
+        for chunk in chunks:
+            sink.write(execute_transform_plan(plan, chunk, date_formats))
+            rows += len(chunk)
+            chunk_count += 1
+            if progress_callback:
+                progress_callback(chunk_count, rows)
+    seconds = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "chunks": chunk_count,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows / seconds, 1) if seconds > 0 else float(rows),
+    }
 
-    for target_field, mapping in final_mapping.items():
-        source_column = mapping.get("value")
-        if source_column and source_column in source_df.columns:
-            transformed[target_field] = source_df[source_column]
-        else:
-            transformed[target_field] = None
-
-    # --- Basic Cleaning Rules ---
-    for col in transformed.columns:
-        if transformed[col].dtype == object:
-            transformed[col] = transformed[col].astype(str).str.strip()  # type: ignore[no-untyped-call]
-
-        if "date" in col.lower():
-            s = transformed[col]
-            # Convert to string first to handle various input types
-            s_str = s.astype(str).str.strip()  # type: ignore[no-untyped-call]
-            
-            # Try to detect Excel serial dates vs other formats
-            numeric = pd.to_numeric(s, errors='coerce')  # type: ignore[no-untyped-call]
-            
-            # Excel serial dates: typically between 1 and 100000 (covers dates from 1900 to ~2174)
-            # Values like 20250916 are YYYYMMDD format (8 digits), not Excel serial dates
-            # Check if value looks like YYYYMMDD using vectorized operations
-            # Must be exactly 8 digits, all numeric
-            is_8_digits = (s_str.str.len() == 8) & (s_str.str.isdigit())  # type: ignore[no-untyped-call]
-            # Extract year (first 4 digits) and check if in reasonable range (1900-2100)
-            year_str = s_str.str[:4]  # type: ignore[no-untyped-call]
-            year_numeric = pd.to_numeric(year_str, errors='coerce')  # type: ignore[no-untyped-call]
-            valid_year = (year_numeric >= 1900) & (year_numeric <= 2100)  # type: ignore[operator]
-            # Extract month and day for basic validation
-            month_str = s_str.str[4:6]  # type: ignore[no-untyped-call]
-            day_str = s_str.str[6:8]  # type: ignore[no-untyped-call]
-            month_numeric = pd.to_numeric(month_str, errors='coerce')  # type: ignore[no-untyped-call]
-            day_numeric = pd.to_numeric(day_str, errors='coerce')  # type: ignore[no-untyped-call]
-            valid_month = (month_numeric >= 1) & (month_numeric <= 12)  # type: ignore[operator]
-            valid_day = (day_numeric >= 1) & (day_numeric <= 31)  # type: ignore[operator]
-            
-            # Identify YYYYMMDD format values
-            mask_yyyymmdd = is_8_digits & valid_year & valid_month & valid_day  # type: ignore[operator]
-            
-            # Excel serial dates: between 1 and 100000, and not YYYYMMDD format
-            mask_excel = numeric.notna() & (numeric >= 1) & (numeric <= 100000) & ~mask_yyyymmdd  # type: ignore[operator]
-            
-            result = pd.Series(index=s.index, dtype='object')
-            
-            # Process YYYYMMDD format first
-            if mask_yyyymmdd.any():
-                yyyymmdd_values = s_str.loc[mask_yyyymmdd]
-                # Parse YYYYMMDD format
-                parsed = pd.to_datetime(yyyymmdd_values, format='%Y%m%d', errors='coerce')  # type: ignore[no-untyped-call]
-                result.loc[mask_yyyymmdd] = parsed
-            
-            # Process Excel serial dates
-            if mask_excel.any():
-                try:
-                    excel_dates = pd.to_datetime('1899-12-30') + pd.to_timedelta(numeric.loc[mask_excel].astype(int), unit='D')  # type: ignore[no-untyped-call]
-                    result.loc[mask_excel] = excel_dates
-                except (OverflowError, ValueError, pd.errors.OutOfBoundsTimedelta):
-                    # If Excel conversion fails (overflow), treat as regular date string
-                    # Fall back to string parsing
-                    result.loc[mask_excel] = pd.to_datetime(s_str.loc[mask_excel], errors='coerce')  # type: ignore[no-untyped-call]
-            
-            # Process other values as regular date strings
-            mask_other = ~mask_excel & ~mask_yyyymmdd
-            if mask_other.any():
-                # Try parsing as various date formats
-                # Suppress the format inference warning since we're handling multiple formats explicitly
-                import warnings
-                with warnings.catch_warnings():
-                    warnings.filterwarnings('ignore', category=UserWarning, message='.*Could not infer format.*')
-                    result.loc[mask_other] = pd.to_datetime(s_str.loc[mask_other], errors='coerce')  # type: ignore[no-untyped-call]
-            
-            # Convert NaT to None
-            result = result.where(pd.notna(result), None)  # type: ignore[no-untyped-call]
-            transformed[col] = result
-
-        if any(key in col.lower() for key in ["ssn", "npi", "zip", "cpt", "hcpcs"]):
-            series = transformed[col].astype(str)  # type: ignore[no-untyped-call]
-            cleaned = series.str.replace(r'[^0-9A-Za-z]', '', regex=True)  # type: ignore[no-untyped-call]
-            cleaned = cleaned.replace('', pd.NA)  # type: ignore[no-untyped-call]
-            cleaned_obj = cleaned.astype('object')  # type: ignore[no-untyped-call]
-            cleaned_obj[pd.isna(cleaned_obj)] = None  # type: ignore[no-untyped-call]
-            transformed[col] = cleaned_obj
-
-    return transformed
 
 def standardize_date(val: Any) -> Optional[Any]:
     """Standardize a date value from diverse inputs.
@@ -47,6 +47,26 @@ def capture_claims_file_metadata(file: Any, has_header: bool) -> None:
         "dateFormat": "yyyyMd"  # can enhance later
     }
 
+def record_claims_date_formats(claims_df: Any) -> None:
+    """Store detected date formats for the loaded claims data in its metadata.
+
+    Adds `dateFormats` (column -> format) to `claims_file_metadata` and, when
+    any PySpark-style format was detected, replaces the default `dateFormat`
+    with the comma-joined detected formats used by the onboarding outputs.
+
+    Args:
+        claims_df: Loaded claims DataFrame-like.
+    """
+    from data.date_parsing import detect_column_date_formats, NON_PYSPARK_FORMATS
+
+    metadata = st.session_state.setdefault("claims_file_metadata", {})
+    column_formats = detect_column_date_formats(claims_df)
+    metadata["dateFormats"] = column_formats
+    spark_formats = sorted({fmt for fmt in column_formats.values() if fmt not in NON_PYSPARK_FORMATS})
+    if spark_formats:
+        metadata["dateFormat"] = ",".join(spark_formats)
+
+
 def render_file_upload_section() -> None:
     """Render the upload UI and manage file-related session state.
 
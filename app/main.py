@@ -46,6 +46,10 @@ from utils.improvements_utils import (  # type: ignore[import-untyped]
 # --- State Management ---
 from core.state_manager import SessionStateManager  # type: ignore[import-untyped]
 
+# --- Shared Reference Data (parsed once per server process) ---
+from utils.cache_manager import start_default_artifact_preload  # type: ignore[import-untyped]
+start_default_artifact_preload()
+
 # --- Audit Log Helper Function (using State Manager) ---
 def log_event(event_type: str, message: str) -> None:
     """Log an event to the in-memory audit log.
@@ -3,6 +3,8 @@ from typing import Any, Dict, List, Optional
 import json
 import pandas as pd
 
+from data.layout_loader import get_layout_index
+
 
 def generate_batch_payload(
     layout_df: Any,
@@ -29,10 +31,11 @@ def generate_batch_payload(
     except Exception:
         usage_col = "Usage"
     
+    layout_index = get_layout_index(layout_df)
+
     # Filter to only mandatory fields
     if usage_col in layout_df.columns:
-        mandatory_df = layout_df[layout_df[usage_col].astype(str).str.strip().str.lower() == "mandatory"]
-        internal_fields: List[str] = [str(x) for x in mandatory_df["Internal Field"].dropna().tolist()]
+        internal_fields: List[str] = list(layout_index.required_fields)
     else:
         # If no Usage column, include all fields
         internal_fields: List[str] = [str(x) for x in layout_df["Internal Field"].dropna().tolist()]
@@ -79,11 +82,7 @@ def generate_batch_payload(
     # Get field groups - create a mapping of field name to category
     field_groups_dict = {}
     if "Category" in layout_df.columns and "Internal Field" in layout_df.columns:
-        for idx, row in layout_df.iterrows():
-            field_name = str(row["Internal Field"] if "Internal Field" in row.index else "").strip()
-            category = str(row["Category"] if "Category" in row.index else "").strip()
-            if field_name:
-                field_groups_dict[field_name] = category
+        field_groups_dict = dict(layout_index.category)
     
     # Build payload matching agent's expected format
     payload = {
@@ -106,12 +105,7 @@ def generate_batch_payload(
     # Create a mapping of field name to usage (already have usage_col from above)
     field_usage_map = {}
     if usage_col in layout_df.columns:
-        for idx, row in layout_df.iterrows():
-            # row is a pandas Series, access columns directly
-            field_name = str(row["Internal Field"] if "Internal Field" in row.index else "").strip()
-            usage_value = str(row[usage_col] if usage_col in row.index else "Optional").strip()
-            if field_name:
-                field_usage_map[field_name] = usage_value
+        field_usage_map = dict(layout_index.usage)
     
     # Add each internal field
     for internal in internal_fields:
@@ -5,6 +5,8 @@ from typing import Dict, List, Any, cast
 import streamlit as st  # type: ignore[import-not-found]
 import re
 
+from utils.cache_manager import get_dataset_version
+
 st = cast(Any, st)
 pd = cast(Any, pd)
 
@@ -66,7 +68,6 @@ def match_known_patterns(values: List[str]) -> str:
             return "zip"
     return "unknown"
 
-@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: lambda x: hash(str(x.values.tobytes())) if hasattr(x.values, 'tobytes') else id(x)})  # type: ignore[arg-type]
 def get_enhanced_automap(layout_df: Any, claims_df: Any, threshold: float = 0.6) -> Dict[str, Dict[str, Any]]:
     """
     Suggests best source column for each internal field using enhanced heuristics:
@@ -74,6 +75,9 @@ def get_enhanced_automap(layout_df: Any, claims_df: Any, threshold: float = 0.6)
     
     This is the original, simpler mapping logic from the reference project.
     
+    Results are memoized on the dataset versions of both frames (registered
+    once at ingest) plus the threshold, so cache hits never rehash the data.
+    
     Args:
         layout_df: Internal layout DataFrame-like, including "Internal Field".
         claims_df: Source claims DataFrame-like.
@@ -82,6 +86,29 @@ def get_enhanced_automap(layout_df: Any, claims_df: Any, threshold: float = 0.6)
     Returns:
         Mapping suggestions as a dict: {internal_field: {"value": col, "score": float}}.
     """
+    return _get_enhanced_automap_cached(
+        get_dataset_version(layout_df),
+        get_dataset_version(claims_df),
+        float(threshold),
+        layout_df,
+        claims_df,
+    )
+
+
+@st.cache_data(show_spinner=False)
+def _get_enhanced_automap_cached(
+    layout_version: str,
+    dataset_version: str,
+    threshold: float,
+    _layout_df: Any,
+    _claims_df: Any,
+) -> Dict[str, Dict[str, Any]]:
+    """Compute automap suggestions keyed only on versions and threshold.
+
+    The underscore-prefixed frames are excluded from Streamlit's hashing.
+    """
+    layout_df = _layout_df
+    claims_df = _claims_df
     suggestions: Dict[str, Dict[str, Any]] = {}
     internal_fields = layout_df["Internal Field"].dropna().unique().tolist()  # type: ignore[no-untyped-call]
     examples = dict(zip(layout_df["Internal Field"], layout_df.get("Example Value", "")))  # type: ignore[no-untyped-call]
@@ -12,6 +12,7 @@ from ui.ui_components import render_sortable_table, show_toast, show_confirmatio
 from core.error_handling import get_user_friendly_error
 from data.output_generator import generate_mapping_table
 from data.anonymizer import anonymize_claims_data
+from data.layout_loader import get_layout_index
 from utils.batch_processor import process_multiple_claims_files
 from ui.ui_components import _notify
 from utils.audit_logger import log_event
@@ -579,10 +580,10 @@ def render_downloads_tab() -> None:
                     elif layout_df is not None:
                         # Fallback: Look for fields with "ID", "Key", "Number" in internal field name
                         primary_key_candidates = []
-                        for _, row in layout_df.iterrows():
-                            internal_field = str(row.get("Internal Field", "")).lower()
+                        for layout_field in get_layout_index(layout_df).fields:
+                            internal_field = layout_field.lower()
                             if any(keyword in internal_field for keyword in ["id", "key", "number", "claim_id", "member_id"]):
-                                mapped_value = final_mapping.get(row.get("Internal Field", ""), {}).get("value", "")
+                                mapped_value = final_mapping.get(layout_field, {}).get("value", "")
                                 if mapped_value:
                                     primary_key_candidates.append(mapped_value)
                         if primary_key_candidates:
@@ -779,8 +780,8 @@ def render_downloads_tab() -> None:
                     
                     # Regenerate transformed data
                     if claims_df is not None:
-                        from data.transformer import transform_claims_data
-                        st.session_state.transformed_df = transform_claims_data(claims_df, final_mapping, layout_df)
+                        from data.transformer import transform_claims_data_incremental
+                        st.session_state.transformed_df = transform_claims_data_incremental(claims_df, final_mapping, layout_df)
                     progress_bar.progress(0.8)
                     
                     # Regenerate anonymized file output
@@ -25,7 +25,7 @@ from mapping.mapping_enhancements import (
     import_mapping_template_from_shareable
 )
 from advanced_features import save_mapping_template, load_mapping_template, list_saved_templates
-from data.layout_loader import get_required_fields
+from data.layout_loader import get_layout_index
 from utils.audit_logger import log_event
 
 st: Any = st
@@ -53,17 +53,8 @@ def render_mapping_tab() -> None:
         st.stop()
     
     # --- Sticky Mapping Progress Bar ---
-    # Cache required fields calculation to avoid recomputing on every rerun
-    if layout_df is not None:
-        cache_key = f"required_fields_{id(layout_df)}"
-        if cache_key not in st.session_state:
-            usage_normalized = layout_df["Usage"].astype(str).str.strip().str.lower()
-            required_fields = layout_df[usage_normalized == "mandatory"]["Internal Field"].tolist()
-            st.session_state[cache_key] = required_fields
-        else:
-            required_fields = st.session_state[cache_key]
-    else:
-        required_fields = []
+    # Required fields come from the precompiled layout index (O(1) per rerun)
+    required_fields = get_layout_index(layout_df).required_fields if layout_df is not None else ()
     
     total_required = len(required_fields) if required_fields else 0
     mapped_required: List[str] = [str(f) for f in required_fields if f in final_mapping and final_mapping[f].get("value")]
@@ -3,7 +3,9 @@
 import streamlit as st
 from typing import Any, List, Dict
 import hashlib
+import os
 import time
+import zipfile
 import statistics
 import pandas as pd
 from core.state_manager import SessionStateManager
@@ -19,9 +21,15 @@ from ui.ui_components import (
     render_filterable_table
 )
 from core.error_handling import get_user_friendly_error
-from validation.validation_engine import run_validations, dynamic_run_validations
-from data.layout_loader import get_required_fields
+from validation.validation_engine import (
+    EXECUTION_THREADS, run_validations, dynamic_run_validations, failing_rows, resolve_validation_inputs
+)
+from data.transformer import transform_claims_data_incremental
+from utils.cache_manager import get_column_fingerprints
+from data.layout_loader import get_layout_index
 from validation.advanced_validation import track_validation_performance
+from validation.result_cache import get_result_cache
+from validation.failure_export import ExportSpool, export_failing_rows, failure_selections
 try:
     from utils.performance_utils import paginate_dataframe, render_lazy_dataframe
 except (ImportError, KeyError, ModuleNotFoundError):
@@ -42,6 +50,15 @@ from utils.audit_logger import log_event
 st: Any = st
 
 
+def _export_spool() -> ExportSpool:
+    """This session's failing-rows export directory (removed with the session)."""
+    spool = SessionStateManager.get("failing_rows_export_spool")
+    if not isinstance(spool, ExportSpool):
+        spool = ExportSpool()
+        SessionStateManager.set("failing_rows_export_spool", spool)
+    return spool
+
+
 def render_validation_tab() -> None:
     """Render the Preview & Validate tab content with clean, organized layout."""
     # Inject tight spacing CSS (uses shared design system)
@@ -79,8 +96,7 @@ def render_validation_tab() -> None:
     transformed_df = SessionStateManager.get_transformed_df()
     if transformed_df is None:
         # Auto-generate transformed_df from mappings
-        from data.transformer import transform_claims_data
-        transformed_df = transform_claims_data(claims_df, final_mapping)
+        transformed_df = transform_claims_data_incremental(claims_df, final_mapping, layout_df)
         if transformed_df is not None:
             SessionStateManager.set_transformed_df(transformed_df)
         else:
@@ -94,39 +110,65 @@ def render_validation_tab() -> None:
             st.stop()
     
     # --- Auto-run validation (cached to avoid re-running on every rerun) ---
+    # Keyed by column content, the claim key, the reference data and the MSK/BAR
+    # lookups, so edits that leave all of them unchanged skip the run
+    validation_inputs = resolve_validation_inputs(
+        transformed_df.columns,
+        final_mapping,
+        SessionStateManager.get("onboarding_primary_key"),
+        SessionStateManager.get("onboarding_prep_primary_key"),
+        SessionStateManager.get("msk_codes"),
+        SessionStateManager.get("bar_codes")
+    )
+    column_fingerprints = get_column_fingerprints(transformed_df)
     data_hash = hashlib.md5(
-        (str(final_mapping) + str(transformed_df.shape) + str(transformed_df.columns.tolist())).encode()
+        (str(final_mapping) + "|".join(f"{col}={fp}" for col, fp in column_fingerprints.items())
+         + "|" + validation_inputs.fingerprint).encode()
     ).hexdigest()
     cached_hash = st.session_state.get("validation_data_hash")
     validation_results_cached: List[Dict[str, Any]] = st.session_state.get("validation_results", [])
     
     if cached_hash != data_hash or not validation_results_cached:
+        # An export of the previous data must not outlive it
+        previous_export = SessionStateManager.get("failing_rows_export_spool")
+        if isinstance(previous_export, ExportSpool):
+            previous_export.discard()
         render_loading_skeleton(rows=3, cols=4)
         with st.spinner("Running validation checks..."):
             if layout_df is not None:
-                required_fields_df = get_required_fields(layout_df)
-                required_fields: List[str] = required_fields_df["Internal Field"].tolist() if isinstance(required_fields_df, pd.DataFrame) else []
+                required_fields: List[str] = list(get_layout_index(layout_df).required_fields)
             else:
                 required_fields = list(final_mapping.keys())
             all_mapped_internal_fields = [field for field in final_mapping.keys() if final_mapping[field].get("value")]
             start_time = time.time()
+            # Rules whose input columns and configuration are unchanged are
+            # served from the result cache; only the rest are re-evaluated
+            result_cache = get_result_cache()
+            rule_timings: List[Dict[str, Any]] = []
             try:
                 with st.spinner("Running field-level validations..."):
-                    field_level_results = run_validations(transformed_df, required_fields, all_mapped_internal_fields)
+                    field_level_results = run_validations(
+                        transformed_df, required_fields, all_mapped_internal_fields,
+                        execution=EXECUTION_THREADS, timings=rule_timings, result_cache=result_cache,
+                        inputs=validation_inputs
+                    )
             except Exception as e:
                 error_msg = get_user_friendly_error(e)
                 st.error(f"Error during field-level validation: {error_msg}")
                 field_level_results = []
             try:
                 with st.spinner("Running file-level validations..."):
-                    file_level_results = dynamic_run_validations(transformed_df, final_mapping)
+                    file_level_results = dynamic_run_validations(
+                        transformed_df, final_mapping, execution=EXECUTION_THREADS, timings=rule_timings,
+                        result_cache=result_cache, inputs=validation_inputs
+                    )
             except Exception as e:
                 error_msg = get_user_friendly_error(e)
                 st.error(f"Error during file-level validation: {error_msg}")
                 file_level_results = []
             validation_results_new: List[Dict[str, Any]] = field_level_results + file_level_results
             execution_time = time.time() - start_time
-            track_validation_performance("full_validation", execution_time, len(transformed_df), len(validation_results_new))
+            track_validation_performance("full_validation", execution_time, len(transformed_df), len(validation_results_new), rule_timings)
             st.session_state.validation_results = validation_results_new
             st.session_state.validation_data_hash = data_hash
             fail_count = len([r for r in validation_results_new if r.get("status") == "Fail"])
@@ -148,8 +190,7 @@ def render_validation_tab() -> None:
     # Get mandatory fields
     mandatory_fields: List[str] = []
     if layout_df is not None:
-        required_fields_df = get_required_fields(layout_df)
-        mandatory_fields = required_fields_df["Internal Field"].tolist() if isinstance(required_fields_df, pd.DataFrame) else []
+        mandatory_fields = list(get_layout_index(layout_df).required_fields)
     
     # Calculate file status
     fails: List[Dict[str, Any]] = [r for r in validation_results_summary if r.get("status") == "Fail"]
@@ -159,9 +200,7 @@ def render_validation_tab() -> None:
     # Check for unmapped required fields
     unmapped_required_fields: List[str] = []
     if layout_df is not None:
-        usage_normalized = layout_df["Usage"].astype(str).str.strip().str.lower()
-        required_fields_list = layout_df[usage_normalized == "mandatory"]["Internal Field"].tolist()
-        for field in required_fields_list:
+        for field in get_layout_index(layout_df).required_fields:
             mapping = final_mapping.get(field)
             if not mapping or not mapping.get("value") or str(mapping.get("value")).strip() == "":
                 if field not in unmapped_required_fields:
@@ -178,6 +217,65 @@ def render_validation_tab() -> None:
     if validation_results_summary:
         st.dataframe(pd.DataFrame(validation_results_summary))
     
+    # --- Failing rows, materialized one page at a time from failure bitmaps ---
+    failing_checks = sorted({
+        (r["check"], r["field"]) for r in validation_results_summary
+        if r.get("field") and float(r.get("fail_count", 0) or 0) > 0
+    })
+    if failing_checks:
+        with st.expander("🔍 Inspect Failing Rows", expanded=False):
+            export_spool = _export_spool()
+            check, field = st.selectbox(
+                "Check",
+                failing_checks,
+                format_func=lambda item: f"{item[0]} - {item[1]}",
+                key="failing_rows_check"
+            )
+            inspect_required = list(get_layout_index(layout_df).required_fields) if layout_df is not None else list(final_mapping.keys())
+            inspect_mapped = [f for f in final_mapping if final_mapping[f].get("value")]
+            bitmap = failing_rows(
+                transformed_df, inspect_required, inspect_mapped, checks=[check], fields={field}, inputs=validation_inputs
+            )
+            page_size = 100
+            pages = max(1, -(-bitmap.count // page_size))
+            page = st.number_input("Page", min_value=1, max_value=pages, value=1, key="failing_rows_page")
+            st.dataframe(bitmap.rows(transformed_df, (int(page) - 1) * page_size, page_size), use_container_width=True)
+            st.caption(f"{bitmap.count:,} failing rows - page {int(page)} of {pages}")
+            
+            # Streamed to a zip on disk chunk by chunk; only the finished file is offered for download
+            export_checks = st.multiselect(
+                "Export failing rows for",
+                failing_checks,
+                default=[(check, field)],
+                format_func=lambda item: f"{item[0]} - {item[1]}",
+                key="failing_rows_export_checks"
+            )
+            export_format = st.radio("Format", ["csv", "parquet"], horizontal=True, key="failing_rows_export_format")
+            if export_checks and st.button("Export Failing Rows", key="failing_rows_export"):
+                selections = failure_selections(transformed_df, inspect_required, inspect_mapped, export_checks, validation_inputs)
+                # Replaces (deletes) this session's previous export
+                export_path = export_spool.new_path("failing_rows.zip")
+                try:
+                    with zipfile.ZipFile(export_path, "w", zipfile.ZIP_DEFLATED) as archive:
+                        summary = export_failing_rows(
+                            transformed_df, selections, archive, export_format,
+                            first_line=SessionStateManager.get("claims_first_line", 2)
+                        )
+                except Exception:
+                    export_spool.discard()
+                    raise
+                show_toast(f"Exported {summary['rows']:,} failing rows", "✅")
+            export_path = export_spool.path
+            if export_path and os.path.exists(export_path):
+                with open(export_path, "rb") as export_handle:
+                    st.download_button(
+                        "Download Failing Rows",
+                        data=export_handle,
+                        file_name="failing_rows.zip",
+                        mime="application/zip",
+                        key="failing_rows_download"
+                    )
+    
     # ============================================
     # FILE STATUS SECTION
     # ============================================
@@ -346,10 +444,8 @@ def render_validation_tab() -> None:
         if claims_df is not None and not claims_df.empty:
             # Data Quality Score
             required_fields_quality = []
-            if layout_df is not None and "Usage" in layout_df.columns:
-                required_fields_quality = layout_df[
-                    layout_df["Usage"].astype(str).str.lower() == "mandatory"
-                ]["Internal Field"].tolist()
+            if layout_df is not None:
+                required_fields_quality = list(get_layout_index(layout_df).required_fields)
             
             try:
                 with st.spinner("Calculating data quality score..."):
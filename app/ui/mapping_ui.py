@@ -10,9 +10,9 @@ import unicodedata
 st: Any = st  # type: ignore[assignment]
 pd: Any = pd  # type: ignore[assignment]
 
-from data.layout_loader import get_field_groups, get_required_fields, get_optional_fields
+from data.layout_loader import get_layout_index
 from mapping.mapping_engine import get_enhanced_automap
-from data.transformer import transform_claims_data
+from data.transformer import PREVIEW_TRANSFORMER_KEY, transform_claims_data_incremental
 from core.state_manager import initialize_undo_redo
 from data.anonymizer import anonymize_claims_data
 from utils.improvements_utils import DEBOUNCE_DELAY_SECONDS
@@ -185,10 +185,8 @@ def generate_mapping_table(layout_df: Any, final_mapping: Dict[str, Dict[str, An
     records: List[Dict[str, Any]] = []
 
     # --- 1. Internal Layout Side ---
-    for _, row in layout_df.iterrows():
-        internal_field = row["Internal Field"]
-        usage = row["Usage"].strip().lower()
-        required_status = "Required" if usage == "mandatory" else "Optional"
+    for internal_field, usage, _category, _data_type, _examples in get_layout_index(layout_df).records:
+        required_status = "Required" if usage.lower() == "mandatory" else "Optional"
 
         mapped_column = final_mapping.get(internal_field, {}).get("value", "")
         data_type = ""
@@ -225,7 +223,7 @@ def generate_mapping_table(layout_df: Any, final_mapping: Dict[str, Dict[str, An
 
 def calculate_mapping_progress(layout_df: Any, final_mapping: Dict[str, Dict[str, Any]]) -> Tuple[int, int, int]:
     """Calculates progress stats for required fields mapping."""
-    required_fields = get_required_fields(layout_df)["Internal Field"].tolist()
+    required_fields = get_layout_index(layout_df).required_fields
     mapped_fields = [field for field in required_fields if field in final_mapping and final_mapping[field]["value"]]
     total_required = len(required_fields)
     mapped_required = len(mapped_fields)
@@ -262,7 +260,7 @@ def render_field_mapping_tab():
             # First anonymize the original claims data, then transform it
             claims_preview = claims_df.head(4)
             anonymized_preview = anonymize_claims_data(claims_preview, final_mapping)
-            preview_mapped = transform_claims_data(anonymized_preview, final_mapping)
+            preview_mapped = transform_claims_data_incremental(anonymized_preview, final_mapping, key=PREVIEW_TRANSFORMER_KEY)
             if preview_mapped is not None and not preview_mapped.empty:
                 st.dataframe(preview_mapped, use_container_width=True)  # type: ignore[no-untyped-call]
                 st.caption(f"Showing first 4 rows of anonymized mapped data ({len(preview_mapped.columns)} mapped fields)")
@@ -274,14 +272,8 @@ def render_field_mapping_tab():
         # Show placeholder when no mappings yet
         st.info("Map fields below to see a real-time preview of your transformed data.")
 
-    required_fields = get_required_fields(layout_df)
-
-    # --- Safety Check ---
-    if not isinstance(required_fields, pd.DataFrame):  # type: ignore[redundant-cast,type-py]
-        st.error("Error: Required fields extraction failed. Please check layout file format.")
-        st.stop()
-
-    field_groups = get_field_groups(required_fields)
+    layout_index = get_layout_index(layout_df)
+    required_fields = layout_index.required_fields
 
     if "final_mapping" not in st.session_state:
         st.session_state.final_mapping = {}
@@ -375,20 +367,13 @@ def render_field_mapping_tab():
     # Get search query from session state
     search_query = st.session_state.get("field_search_input", "")
     
-    for group in field_groups:
-        group_fields = required_fields[required_fields["Category"] == group]
-        
-        # Deduplicate fields within the group - keep first occurrence of each field
-        group_fields = group_fields.drop_duplicates(subset=["Internal Field"], keep="first")  # type: ignore[no-untyped-call]
-
+    for group, group_fields in layout_index.required_groups.items():
         # Apply search filter
         if search_query and search_query.strip():
             search_lower = search_query.lower()
-            group_fields = group_fields[
-                group_fields["Internal Field"].str.lower().str.contains(search_lower, na=False)  # type: ignore[no-untyped-call]
-            ]
+            group_fields = tuple(f for f in group_fields if search_lower in f.lower())
 
-        group_field_names = group_fields["Internal Field"].tolist()
+        group_field_names = list(group_fields)
         
         # Apply status filter
         if filter_status == "Mapped":
@@ -411,8 +396,7 @@ def render_field_mapping_tab():
 
         # Keep expander open if it has mapped fields to prevent collapse when selecting dropdown
         with st.expander(group_label, expanded=(mapped_count > 0)):
-            for _, (_, row) in enumerate(group_fields.iterrows()):
-                field_name = row["Internal Field"]
+            for field_name in group_fields:
                 raw_columns = claims_df.columns.tolist()
                 
                 # Clean and filter column names - remove empty, blank, or whitespace-only columns
@@ -715,7 +699,7 @@ def render_field_mapping_tab():
 
     # --- Show Unmapped Required Fields ---
     unmapped = [
-        field for field in required_fields["Internal Field"].tolist()
+        field for field in required_fields
         if field not in final_mapping or not final_mapping[field]["value"]
     ]
 
@@ -737,31 +721,9 @@ def render_field_mapping_tab():
     # --- Optional Fields Mapping ---
     st.markdown("### Optional Fields Mapping")
 
-    optional_fields = get_optional_fields(layout_df)
-
-    # --- Safety Check ---
-    if not isinstance(optional_fields, pd.DataFrame):  # type: ignore[redundant-cast,type-py]
-        st.error("Error: Optional fields extraction failed. Please check layout file format.")
-        st.stop()
-
-    if "Internal Field" not in optional_fields.columns or "Category" not in optional_fields.columns:
-        st.error("Error: Layout file must contain 'Internal Field' and 'Category' columns.")
-        st.stop()
-
-    optional_fields = optional_fields[optional_fields["Internal Field"].notnull()]
-    optional_fields = optional_fields[optional_fields["Category"].notnull()]
-    optional_fields = optional_fields[~optional_fields["Internal Field"].isin(required_fields["Internal Field"].tolist())]  # type: ignore[no-untyped-call]
-
-    if not optional_fields.empty:
-        optional_field_groups = get_field_groups(optional_fields)
-
-        for group in optional_field_groups:
-            group_fields = optional_fields[optional_fields["Category"] == group]
-            
-            # Deduplicate fields within the group - keep first occurrence of each field
-            group_fields = group_fields.drop_duplicates(subset=["Internal Field"], keep="first")  # type: ignore[no-untyped-call]
-
-            group_field_names = group_fields["Internal Field"].tolist()
+    if layout_index.optional_groups:
+        for group, group_fields in layout_index.optional_groups.items():
+            group_field_names = list(group_fields)
             mapped_count = sum(
                 1 for f in group_field_names
                 if f in final_mapping and final_mapping[f].get("value")
@@ -771,8 +733,7 @@ def render_field_mapping_tab():
 
             # Keep expander open if it has mapped fields to prevent collapse when selecting dropdown
             with st.expander(group_label, expanded=(mapped_count > 0)):
-                for _, (_, row) in enumerate(group_fields.iterrows()):
-                    field_name = row["Internal Field"]
+                for field_name in group_fields:
                     raw_columns = claims_df.columns.tolist()
                     
                     # Clean and filter column names - remove empty, blank, or whitespace-only columns
@@ -1060,7 +1021,7 @@ def render_field_mapping_tab():
 
     if claims_df is not None and final_mapping:
         try:
-            st.session_state.transformed_df = transform_claims_data(claims_df, final_mapping, layout_df)
+            st.session_state.transformed_df = transform_claims_data_incremental(claims_df, final_mapping, layout_df)
         except Exception:
             pass  # Don't fail if transformation fails
 
@@ -10,7 +10,7 @@ from typing import Any, List, Dict, Set, Union, cast, Tuple
 st: Any = st  # type: ignore[assignment]
 pd: Any = pd  # type: ignore[assignment]
 
-from utils.cache_manager import load_layout_cached, load_lookups_cached
+from utils.cache_manager import load_layout_cached, load_lookups_cached, register_dataset_version, get_dataset_version
 from data.file_handler import (
     read_claims_with_header_option,
     detect_delimiter,
@@ -19,7 +19,8 @@ from data.file_handler import (
     infer_fixed_width_positions,
     parse_header_specification_file,
 )
-from data.upload_handlers import capture_claims_file_metadata
+from data.upload_handlers import capture_claims_file_metadata, record_claims_date_formats
+from data.layout_loader import get_layout_index
 
 # Import improvement utilities
 try:
@@ -63,10 +64,10 @@ def render_lookup_summary_section():
     # Dynamically find all code categories in session_state (anything ending with "_codes")
     code_categories: Dict[str, Union[Set[str], List[str]]] = {}
     for key in st.session_state.keys():
-        if key.endswith("_codes") and isinstance(st.session_state[key], (set, list)):
+        if key.endswith("_codes") and isinstance(st.session_state[key], (set, frozenset, list)):
             category_name = key.replace("_codes", "").upper()
             codes_value = st.session_state[key]
-            if isinstance(codes_value, (set, list)):
+            if isinstance(codes_value, (set, frozenset, list)):
                 code_categories[category_name] = codes_value  # type: ignore[assignment]
     
     if code_categories:
@@ -84,7 +85,7 @@ def render_lookup_summary_section():
         # Create expanders for each category dynamically
         for category_name, codes in sorted(code_categories.items()):
             with st.expander(f"View Sample {category_name} Codes", expanded=False):
-                code_list = list(codes) if isinstance(codes, set) else codes
+                code_list = list(codes) if isinstance(codes, (set, frozenset)) else codes
                 st.write(code_list[:10])  # type: ignore[no-untyped-call]
     elif st.session_state.get("lookup_upload_attempted", False):
         # Only show info if user has attempted to upload a file
@@ -152,6 +153,7 @@ def render_upload_and_claims_preview():
                     with st.spinner("Loading layout file..."):
                         layout_df = load_layout_cached(layout_file)
                         st.session_state.layout_df = layout_df
+                        st.session_state.layout_df_version = get_dataset_version(layout_df)
                     st.success("✅ **Layout file loaded successfully!**")
                     # Track upload order if this is a new file
                     if "layout_file_obj" not in st.session_state or st.session_state.layout_file_obj.name != layout_file.name:
@@ -207,8 +209,8 @@ def render_upload_and_claims_preview():
                 except Exception as e:
                     error_msg = get_user_friendly_error(e)
                     st.error(f"Error loading lookup file: {error_msg}")
-                    st.session_state.msk_codes = set()
-                    st.session_state.bar_codes = set()
+                    st.session_state.msk_codes = frozenset()
+                    st.session_state.bar_codes = frozenset()
         elif lookup_file is None and "lookup_upload_attempted" not in st.session_state:
             # Track that user has interacted with uploader (even if no file selected)
             pass
@@ -567,9 +569,10 @@ def render_upload_and_claims_preview():
                         if skiprows_value == 0:
                             skiprows_value = None
                         
+                        headerless = use_header_file or (detected_has_header is False) or use_header_spec
                         claims_df = read_claims_with_header_option(
                             claims_file,
-                            headerless=(use_header_file or (detected_has_header is False) or use_header_spec),
+                            headerless=headerless,
                             header_file=header_file if (use_header_file and not use_header_spec) else None,
                             delimiter=delimiter,
                             colspecs=colspecs if is_fw else None,
@@ -584,12 +587,19 @@ def render_upload_and_claims_preview():
                         # Compress dataframe to save memory
                         claims_df = compress_dataframe(claims_df)
 
-                        # Save to session
+                        # Save to session; fingerprint once so downstream caches key on the version
                         st.session_state.claims_df = claims_df
+                        st.session_state.claims_df_version = register_dataset_version(claims_df)
                         st.session_state.last_loaded_file = claims_file.name
+                        # Line of the first record, so failing-row exports can point back into the file
+                        if ext.endswith((".csv", ".txt", ".tsv", ".xlsx", ".xls")):
+                            st.session_state.claims_first_line = 1 + (skiprows_value or 0) + (0 if headerless else 1)
+                        else:
+                            st.session_state.claims_first_line = 1
                         # Use detected header status if available, otherwise fallback to logic
                         final_has_header = detected_has_header if detected_has_header is not None else (header_file is None)  # type: ignore[comparison-overlap]
                         capture_claims_file_metadata(claims_file, has_header=bool(final_has_header))
+                        record_claims_date_formats(claims_df)
 
                     progress.update(90, "Finalizing...")
                     progress.complete(f"File loaded successfully! {len(claims_df):,} rows, {len(claims_df.columns)} columns")
@@ -817,6 +827,7 @@ def render_claims_file_deep_dive():
 
     deep_dive_rows: List[Dict[str, Any]] = []
 
+    layout_index = get_layout_index(layout_df)
     internal_fields = layout_df["Internal Field"].tolist()
 
     for internal_field in internal_fields:
@@ -838,8 +849,7 @@ def render_claims_file_deep_dive():
             status_icon = "❌ Fail"
 
         # Check if field is required
-        usage = layout_df[layout_df["Internal Field"] == internal_field]["Usage"].values
-        is_required = usage[0].lower() == "required" if len(usage) > 0 else False
+        is_required = layout_index.is_required(internal_field)
 
         deep_dive_rows.append({
             "Internal Field": internal_field,
@@ -2,15 +2,19 @@
 """Batch processing utilities for multiple files."""
 import streamlit as st
 import pandas as pd
-from typing import Any, List, Dict, Optional, Callable
+from typing import Any, List, Dict, Optional, Callable, Sequence, Tuple
 from pathlib import Path
 import zipfile
 import io
+import os
+import gzip
+import bz2
+import lzma
 
 # Import enhanced parallel processing
-from utils.parallel_processing import ParallelProcessor, process_files_parallel_enhanced
-from data.file_handler import load_claims_file
-from data.transformer import transform_claims_data
+from utils.parallel_processing import ParallelProcessor
+from utils.pipeline_tasks import BatchSpool, DEFAULT_TASKS, run_file_tasks_item
+from utils.staged_pipeline import DEFAULT_QUEUE_SIZE, PipelineStage, StagedPipeline, StageFailure
 from core.exceptions import FileError
 
 st: Any = st
@@ -24,10 +28,15 @@ def process_multiple_claims_files(
     lookup_df: Any = None,
     use_parallel: bool = True,
     max_workers: Optional[int] = None,
-    progress_callback: Optional[Callable[[int, int], None]] = None
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    tasks: Sequence[str] = DEFAULT_TASKS,
+    task_options: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     """Process multiple claims files with the same mapping.
     
+    Uploads are spooled to disk and the mapping is stored under an ID, so
+    each file runs as a picklable `run_file_tasks` call in a process pool.
+    
     Args:
         files: List of uploaded file objects
         layout_df: Layout DataFrame
@@ -36,60 +45,218 @@ def process_multiple_claims_files(
         use_parallel: Whether to use parallel processing
         max_workers: Maximum number of parallel workers
         progress_callback: Optional progress callback (completed, total)
+        tasks: Pipeline task names to run per file (see `PIPELINE_TASKS`)
+        task_options: Task options, e.g. `export_format` and `output_dir`
         
     Returns:
         Dictionary with results for each file
     """
-    def process_single_file(file_obj: Any) -> Dict[str, Any]:
-        """Process a single file."""
-        try:
-            file_name = file_obj.name
-            
-            # Load file
-            claims_df, _ = load_claims_file(file_obj)
-            
-            # Transform using mapping
-            transformed_df = transform_claims_data(
-                claims_df,
-                final_mapping
+    with BatchSpool() as spool:
+        mapping_id = spool.store_mapping(final_mapping, layout_df)
+        items = [
+            (spool.spool_file(f), tuple(tasks), spool.spool_dir, mapping_id, task_options)
+            for f in files
+        ]
+        
+        # Process files
+        if use_parallel and len(files) > 1:
+            results_list = ParallelProcessor(max_workers=max_workers).process_batch(
+                items,
+                run_file_tasks_item,
+                progress_callback=progress_callback
             )
-            
-            return {
-                "status": "processed",
-                "rows": len(transformed_df),
-                "errors": [],
-                "file_name": file_name
-            }
-        except Exception as e:
-            return {
-                "status": "error",
-                "error": str(e),
-                "file_name": file_obj.name if hasattr(file_obj, 'name') else "unknown"
-            }
-    
-    # Process files
-    if use_parallel and len(files) > 1:
-        results_list = process_files_parallel_enhanced(
-            files,
-            process_single_file,
-            max_workers=max_workers,
-            progress_callback=progress_callback
-        )
-    else:
-        results_list = [process_single_file(f) for f in files]
-        if progress_callback:
-            for i, _ in enumerate(results_list, 1):
-                progress_callback(i, len(results_list))
+        else:
+            results_list = [run_file_tasks_item(item) for item in items]
+            if progress_callback:
+                for i, _ in enumerate(results_list, 1):
+                    progress_callback(i, len(results_list))
     
-    # Convert to dictionary
+    # Convert to dictionary, keyed by the uploaded file names
     results = {}
-    for result in results_list:
-        file_name = result.get("file_name", "unknown")
+    for file_obj, result in zip(files, results_list):
+        file_name = getattr(file_obj, "name", result.get("file_name", "unknown"))
+        result["file_name"] = file_name
         results[file_name] = result
     
     return results
 
 
+# --- Pipelined batch processing ---
+
+# Compressed-file extension -> decompressor for whole-file payloads
+_DECOMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    ".gz": gzip.decompress,
+    ".bz2": bz2.decompress,
+    ".xz": lzma.decompress,
+}
+
+
+def _read_stage(item: Dict[str, Any]) -> Dict[str, Any]:
+    """I/O: read the raw bytes of a path or uploaded file."""
+    source = item["source"]
+    if isinstance(source, (str, Path)):
+        item["content"] = Path(source).read_bytes()
+    else:
+        source.seek(0)
+        item["content"] = source.read()
+        source.seek(0)
+    return item
+
+
+def _decompress_stage(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Decompress .gz/.bz2/.xz/.zip payloads and strip the extension."""
+    stem, ext = os.path.splitext(item["file_name"])
+    ext = ext.lower()
+    if ext in _DECOMPRESSORS:
+        item["content"] = _DECOMPRESSORS[ext](item["content"])
+        item["inner_name"] = stem
+    elif ext == ".zip":
+        with zipfile.ZipFile(io.BytesIO(item["content"])) as archive:
+            members = [m for m in archive.namelist() if not m.endswith("/")]
+            if len(members) != 1:
+                raise FileError(f"Expected one file in {item['file_name']}, found {len(members)}")
+            item["content"] = archive.read(members[0])
+            item["inner_name"] = os.path.basename(members[0])
+    else:
+        item["inner_name"] = item["file_name"]
+    return item
+
+
+def _parse_stage(item: Dict[str, Any]) -> Dict[str, Any]:
+    """CPU: parse bytes into a DataFrame (uncached, see `parse_source_bytes`)."""
+    from data.file_handler import SUPPORTED_FORMATS, detect_delimiter, has_header, parse_source_bytes
+
+    ext = os.path.splitext(item["inner_name"])[-1].lower()
+    if ext not in SUPPORTED_FORMATS:
+        raise FileError(f"Unsupported file type: {ext}. Supported: {', '.join(SUPPORTED_FORMATS)}")
+    content = item.pop("content")
+    delimiter = None
+    has_hdr = None
+    if ext in ['.csv', '.tsv', '.txt']:
+        content_io = io.BytesIO(content)
+        delimiter = detect_delimiter(content_io)
+        content_io.seek(0)
+        has_hdr = has_header(content_io, delimiter)
+    item["frame"], _ = parse_source_bytes(ext, content, delimiter, has_hdr)
+    return item
+
+
+def _make_transform_stage(
+    final_mapping: Dict[str, Dict[str, Any]],
+    layout_df: Any,
+    validate: bool
+) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """CPU: apply the compiled plan and optionally run field validations."""
+    from data.transformer import execute_transform_plan, get_transform_plan
+
+    plan = get_transform_plan(final_mapping, layout_df)
+    mapped = [field for field, info in final_mapping.items() if info.get("value")]
+    if layout_df is not None:
+        from data.layout_loader import get_layout_index
+        required = list(get_layout_index(layout_df).required_fields)
+    else:
+        required = list(final_mapping.keys())
+
+    def transform_stage(item: Dict[str, Any]) -> Dict[str, Any]:
+        frame = item.pop("frame")
+        item["rows"] = len(frame)
+        item["transformed"] = execute_transform_plan(plan, frame)
+        if validate:
+            from validation.validation_engine import run_validations
+            item["validation"] = run_validations(item["transformed"], required, mapped)
+        return item
+
+    return transform_stage
+
+
+def _make_write_stage(output_dir: Optional[str], export_format: str) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """I/O: serialize to `output_dir`, or to bytes when no directory is given."""
+    from data.output_sinks import SINK_FORMATS, create_sink
+
+    def write_stage(item: Dict[str, Any]) -> Dict[str, Any]:
+        transformed = item.pop("transformed")
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+            stem = os.path.splitext(item["inner_name"])[0]
+            target: Any = os.path.join(output_dir, f"{stem}_transformed{SINK_FORMATS.get(export_format, '.csv')}")
+            item["output_path"] = target
+        else:
+            target = io.BytesIO()
+        with create_sink(export_format, target) as sink:
+            sink.write(transformed)
+        if not output_dir:
+            item["data"] = target.getvalue()
+        return item
+
+    return write_stage
+
+
+def process_claims_files_pipelined(
+    files: List[Any],
+    layout_df: Any,
+    final_mapping: Dict[str, Dict[str, Any]],
+    output_dir: Optional[str] = None,
+    export_format: str = "csv",
+    validate: bool = False,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    parse_workers: Optional[int] = None,
+    progress_callback: Optional[Callable[[int, int], None]] = None
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Process many claims files with overlapping stages.
+
+    Runs read -> decompress -> parse -> transform/validate -> write as a
+    `StagedPipeline`, so one file's disk I/O overlaps another's parsing.
+    Bounded queues keep at most `queue_size` files waiting between stages.
+
+    Args:
+        files: Uploaded file objects or file paths (optionally .gz/.bz2/.xz/.zip)
+        layout_df: Layout DataFrame
+        final_mapping: Field mapping dictionary
+        output_dir: Directory for outputs; when None, outputs are returned as bytes
+        export_format: Output format (see `data.output_sinks.SINK_FORMATS`)
+        validate: Whether to run field-level validations per file
+        queue_size: Capacity of each inter-stage queue
+        parse_workers: Threads for the parse and transform stages (default: 2)
+        progress_callback: Optional progress callback (completed, total)
+
+    Returns:
+        (results per file name, pipeline stats with per-stage utilization
+        and queue depth)
+    """
+    workers = parse_workers or 2
+    pipeline = StagedPipeline([
+        PipelineStage("read", _read_stage),
+        PipelineStage("decompress", _decompress_stage),
+        PipelineStage("parse", _parse_stage, workers),
+        PipelineStage("transform", _make_transform_stage(final_mapping, layout_df, validate), workers),
+        PipelineStage("write", _make_write_stage(output_dir, export_format)),
+    ], queue_size=queue_size)
+
+    items = [
+        {"source": f, "file_name": os.path.basename(str(f)) if isinstance(f, (str, Path)) else getattr(f, "name", "unknown")}
+        for f in files
+    ]
+    total = len(items)
+    callback = (lambda done: progress_callback(done, total)) if progress_callback else None
+    outputs, stats = pipeline.run(items, callback)
+
+    results: Dict[str, Any] = {}
+    for item, output in zip(items, outputs):
+        if isinstance(output, StageFailure):
+            results[item["file_name"]] = {
+                "status": "error",
+                "error": f"{output.stage}: {output.error}",
+                "file_name": item["file_name"],
+            }
+            continue
+        result = {"status": "processed", "rows": output.get("rows", 0), "errors": [], "file_name": item["file_name"]}
+        for key in ("validation", "output_path", "data"):
+            if key in output:
+                result[key] = output[key]
+        results[item["file_name"]] = result
+    return results, stats
+
+
 def compare_mappings(mapping1: Dict[str, Dict[str, Any]], mapping2: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
     """Compare two mapping configurations and return differences.
     
@@ -1,13 +1,20 @@
 # --- cache_manager.py ---
 """Unified cache manager with consistent API, invalidation, and metrics."""
 import streamlit as st
+import pandas as pd
 import hashlib
+import io
 import json
-from typing import Any, Dict, Optional, Callable, TypeVar, Hashable
+import threading
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Callable, TypeVar, Hashable, Tuple
 from datetime import datetime, timedelta
 from functools import wraps
 
 st: Any = st
+pd: Any = pd
 
 T = TypeVar('T')
 
@@ -201,16 +208,406 @@ def invalidate_cache_pattern(pattern: str) -> None:
 
 # --- Caching Utilities (migrated from cache_utils.py) ---
 
-@st.cache_data(show_spinner=False)
-def load_layout_cached(file: Any) -> Any:
-    """Load layout file with caching."""
+# Default reference files shipped with the app, preloaded at server start
+DEFAULT_DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+DEFAULT_LAYOUT_FILE = "internal_layout.xlsx"
+DEFAULT_LOOKUP_FILE = "Diagnosis_lookup.xlsx"
+
+# Uploaded artifacts kept per kind in the shared registry (preloaded defaults are extra)
+SHARED_ARTIFACT_MAX_PER_KIND = 8
+# Kinds whose artifacts are superseded rather than alternated (a code-set folder
+# gets a new stamp whenever a table changes) keep fewer
+SHARED_ARTIFACT_KIND_LIMITS: Dict[str, int] = {"code_sets": 2}
+
+
+class SharedArtifactRegistry:
+    """Process-wide store of parsed reference artifacts keyed by content hash.
+
+    Layouts and lookup sets are parsed once per distinct file content and then
+    shared by every session. Stored artifacts are treated as read-only:
+    lookup sets are frozensets, layouts carry a frozen `LayoutIndex`, and no
+    caller mutates a shared layout frame in place.
+
+    Each kind keeps its most recently used artifacts up to a per-kind limit;
+    pinned artifacts (the preloaded defaults) are kept regardless and do not
+    count toward it.
+    """
+
+    def __init__(
+        self,
+        max_per_kind: int = SHARED_ARTIFACT_MAX_PER_KIND,
+        kind_limits: Optional[Dict[str, int]] = None
+    ):
+        """Initialize an empty registry.
+
+        Args:
+            max_per_kind: Unpinned artifacts kept per kind before the least
+                recently used one is dropped.
+            kind_limits: Per-kind overrides of `max_per_kind` (default:
+                `SHARED_ARTIFACT_KIND_LIMITS`).
+        """
+        self._items: Dict[str, "OrderedDict[str, Any]"] = {}
+        self._pinned: Dict[Tuple[str, str], Any] = {}
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._max_per_kind = max(1, max_per_kind)
+        self._kind_limits = dict(SHARED_ARTIFACT_KIND_LIMITS if kind_limits is None else kind_limits)
+
+    @staticmethod
+    def content_hash(content: bytes, file_name: str = "") -> str:
+        """Hash file bytes (plus extension, which selects the parser)."""
+        digest = hashlib.sha256(content)
+        digest.update(Path(file_name).suffix.lower().encode())
+        return digest.hexdigest()
+
+    def get_or_load(self, kind: str, content_hash: str, loader: Callable[[], T], pin: bool = False) -> T:
+        """Return the artifact for ``(kind, content_hash)``, parsing it at most once.
+
+        Concurrent callers for the same key wait for the first parse instead
+        of repeating it (e.g. a session racing the warm-start thread). The
+        per-key lock is dropped once the parse finishes.
+
+        Args:
+            kind: Artifact kind ("layout", "lookups", ...).
+            content_hash: Hash from `content_hash`.
+            loader: Zero-argument callable that parses the artifact.
+            pin: Keep the artifact for the life of the process.
+
+        Returns:
+            The shared artifact.
+        """
+        key = (kind, content_hash)
+        with self._lock:
+            item = self._lookup(key, pin)
+            if item is not None:
+                return item
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                item = self._lookup(key, pin)
+            if item is None:
+                try:
+                    item = loader()
+                    with self._lock:
+                        self._store(key, item, pin)
+                finally:
+                    with self._lock:
+                        if self._key_locks.get(key) is key_lock:
+                            del self._key_locks[key]
+        return item
+
+    def _lookup(self, key: Tuple[str, str], pin: bool) -> Any:
+        """Return the stored artifact for ``key`` (or None) and mark it used; needs ``_lock``."""
+        item = self._pinned.get(key)
+        if item is not None:
+            return item
+        kind, content_hash = key
+        entries = self._items.get(kind)
+        if entries is None or content_hash not in entries:
+            return None
+        if pin:
+            item = entries.pop(content_hash)
+            self._pinned[key] = item
+            return item
+        entries.move_to_end(content_hash)
+        return entries[content_hash]
+
+    def _store(self, key: Tuple[str, str], item: Any, pin: bool) -> None:
+        """Store ``item`` under ``key``, evicting the kind's least recently used; needs ``_lock``."""
+        if pin:
+            self._pinned[key] = item
+            return
+        kind, content_hash = key
+        entries = self._items.setdefault(kind, OrderedDict())
+        entries[content_hash] = item
+        limit = max(1, self._kind_limits.get(kind, self._max_per_kind))
+        while len(entries) > limit:
+            entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry counts per artifact kind."""
+        with self._lock:
+            counts: Dict[str, int] = {kind: len(entries) for kind, entries in self._items.items()}
+            for kind, _ in self._pinned:
+                counts[kind] = counts.get(kind, 0) + 1
+            pinned = len(self._pinned)
+        return {"entries": sum(counts.values()), "pinned": pinned, "by_kind": counts}
+
+
+@st.cache_resource(show_spinner=False)
+def get_shared_registry() -> SharedArtifactRegistry:
+    """Return the process-wide artifact registry."""
+    return SharedArtifactRegistry()
+
+
+class _NamedBytesIO(io.BytesIO):
+    """BytesIO carrying a ``name`` so loaders can dispatch on the extension."""
+
+    def __init__(self, content: bytes, name: str):
+        super().__init__(content)
+        self.name = name
+
+
+def _read_upload(file: Any) -> Tuple[bytes, str]:
+    """Return the bytes and name of an uploaded file without moving its cursor."""
+    file.seek(0)
+    content = file.read()
+    file.seek(0)
+    return content, getattr(file, "name", "")
+
+
+def _parse_layout(content: bytes, file_name: str) -> Any:
+    """Parse and normalize a layout file (index is compiled by the loader)."""
     from data.layout_loader import load_internal_layout
-    return load_internal_layout(file)
+    return load_internal_layout(_NamedBytesIO(content, file_name))
+
+
+def _parse_lookups(content: bytes, file_name: str) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """Parse MSK/BAR lookup sets into immutable frozensets."""
+    from data.diagnosis_loader import parse_msk_bar_lookups
+    msk_codes, bar_codes = parse_msk_bar_lookups(content, Path(file_name).suffix.lower())
+    return frozenset(msk_codes), frozenset(bar_codes)
+
+
+def load_layout_cached(file: Any) -> Any:
+    """Load layout file through the shared registry.
+
+    Returns the same normalized frame for every session that uploads
+    identical content; callers must not modify it in place.
+    """
+    content, file_name = _read_upload(file)
+    registry = get_shared_registry()
+    content_hash = registry.content_hash(content, file_name)
+    return registry.get_or_load("layout", content_hash, lambda: _parse_layout(content, file_name))
 
 
-@st.cache_data(show_spinner=False)
 def load_lookups_cached(file: Any) -> Any:
-    """Load lookup file with caching."""
-    from data.diagnosis_loader import load_msk_bar_lookups
-    return load_msk_bar_lookups(file)
+    """Load lookup file through the shared registry.
+
+    Returns ``(msk_codes, bar_codes)`` as frozensets shared across sessions.
+    """
+    content, file_name = _read_upload(file)
+    registry = get_shared_registry()
+    content_hash = registry.content_hash(content, file_name)
+    return registry.get_or_load("lookups", content_hash, lambda: _parse_lookups(content, file_name))
+
+
+_DEFAULT_ARTIFACT_PARSERS: Dict[str, Tuple[str, Callable[[bytes, str], Any]]] = {
+    DEFAULT_LAYOUT_FILE: ("layout", _parse_layout),
+    DEFAULT_LOOKUP_FILE: ("lookups", _parse_lookups),
+}
 
+
+def _preload_default_artifacts(registry: SharedArtifactRegistry, data_dir: Path) -> None:
+    """Parse the default files under ``data_dir`` into ``registry``."""
+    for file_name, (kind, parser) in _DEFAULT_ARTIFACT_PARSERS.items():
+        path = data_dir / file_name
+        if not path.is_file():
+            continue
+        try:
+            content = path.read_bytes()
+            content_hash = registry.content_hash(content, file_name)
+            registry.get_or_load(kind, content_hash, lambda: parser(content, file_name), pin=True)
+        except Exception as e:
+            # Warm start is best effort; uploads still parse on demand
+            import sys
+            print(f"Failed to preload {path}: {e}", file=sys.stderr)
+
+
+@st.cache_resource(show_spinner=False)
+def start_default_artifact_preload() -> threading.Thread:
+    """Preload default layout and lookup files once per server process.
+
+    Parsing runs in a daemon thread so the first page render is not blocked.
+    The app has no implicit defaults; this only helps uploads whose bytes
+    match a shipped file, which are then served from the registry without
+    parsing.
+
+    Returns:
+        The (possibly still running) preload thread.
+    """
+    thread = threading.Thread(
+        target=_preload_default_artifacts,
+        args=(get_shared_registry(), DEFAULT_DATA_DIR),
+        name="default-artifact-preload",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+# --- Dataset Versioning ---
+
+class FrameRegistry:
+    """Process-wide side table attaching derived values to live DataFrames.
+
+    Entries are keyed by ``id(df)`` and hold a weak reference to the frame,
+    which guards against id reuse and drops the entry once the frame is
+    garbage collected. Lookups are O(1) and never touch the frame's data.
+
+    Weakref callbacks can run inside any allocation, including one made by
+    `set` on the same thread, so they never wait for the lock: collected
+    entries are queued and dropped by whichever call holds it next.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._entries: Dict[int, Tuple[Any, Any]] = {}
+        self._dead: List[Tuple[int, Any]] = []
+        self._lock = threading.Lock()
+
+    def get(self, df: Any, default: Any = None) -> Any:
+        """Return the value registered for ``df``, or ``default``."""
+        entry = self._entries.get(id(df))
+        if entry is not None and entry[0]() is df:
+            return entry[1]
+        return default
+
+    def set(self, df: Any, value: Any) -> Any:
+        """Register ``value`` for ``df`` and return it."""
+        key = id(df)
+        ref = weakref.ref(df, lambda _ref, key=key: self._forget(key, _ref))
+        entry = (ref, value)
+        with self._lock:
+            self._drop_dead()
+            self._entries[key] = entry
+        return value
+
+    def _forget(self, key: int, ref: Any) -> None:
+        """Queue an entry for removal once its DataFrame has been collected."""
+        self._dead.append((key, ref))
+        # Non-blocking: the lock may be held by this very thread (see class docstring)
+        if self._lock.acquire(blocking=False):
+            try:
+                self._drop_dead()
+            finally:
+                self._lock.release()
+
+    def _drop_dead(self) -> None:
+        """Remove queued entries whose weak reference is still the registered one."""
+        while self._dead:
+            key, ref = self._dead.pop()
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is ref:
+                del self._entries[key]
+
+
+_dataset_versions = FrameRegistry()
+
+
+def compute_dataset_version(df: Any) -> str:
+    """Compute a schema plus content fingerprint for a DataFrame.
+
+    Row hashes come from ``pd.util.hash_pandas_object``, which hashes cell
+    values (including object columns) in vectorized code, so two frames with
+    equal columns, dtypes and values always share a version.
+
+    Args:
+        df: DataFrame to fingerprint.
+
+    Returns:
+        Hex digest identifying the frame's schema and content.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    schema = [[str(col), str(dtype)] for col, dtype in df.dtypes.items()]
+    digest.update(json.dumps(schema).encode())
+    digest.update(str(len(df)).encode())
+    if len(df) and len(df.columns):
+        try:
+            row_hashes = pd.util.hash_pandas_object(df, index=False)
+        except TypeError:
+            # Unhashable cell values (lists, dicts) - hash their text form instead
+            row_hashes = pd.util.hash_pandas_object(df.astype(str), index=False)
+        digest.update(row_hashes.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+_column_fingerprints = FrameRegistry()
+
+
+def compute_column_fingerprint(series: Any) -> str:
+    """Compute a content fingerprint for one column.
+
+    Uses the same vectorized value hashing as `compute_dataset_version`; the
+    column name is not part of the fingerprint.
+
+    Args:
+        series: Column to fingerprint.
+
+    Returns:
+        Hex digest identifying the column's dtype and values.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{series.dtype}|{len(series)}".encode())
+    if len(series):
+        try:
+            hashes = pd.util.hash_pandas_object(series, index=False)
+        except TypeError:
+            hashes = pd.util.hash_pandas_object(series.astype(str), index=False)
+        digest.update(hashes.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def register_column_fingerprints(df: Any, fingerprints: Dict[str, str]) -> None:
+    """Record known column fingerprints for a frame (e.g. from a producer's cache keys).
+
+    Args:
+        df: DataFrame the fingerprints describe.
+        fingerprints: Column name -> fingerprint.
+    """
+    known = _column_fingerprints.get(df)
+    if known is None:
+        known = _column_fingerprints.set(df, {})
+    known.update(fingerprints)
+
+
+def get_column_fingerprints(df: Any, columns: Optional[List[str]] = None) -> Dict[str, str]:
+    """Return per-column content fingerprints, hashing each column at most once per frame.
+
+    Args:
+        df: DataFrame to fingerprint.
+        columns: Columns needed (default: all).
+
+    Returns:
+        Column name -> fingerprint for the requested columns.
+    """
+    known = _column_fingerprints.get(df)
+    if known is None:
+        known = _column_fingerprints.set(df, {})
+    wanted = list(columns if columns is not None else df.columns)
+    for col in wanted:
+        if col not in known:
+            known[col] = compute_column_fingerprint(df[col])
+    return {col: known[col] for col in wanted}
+
+
+def register_dataset_version(df: Any, version: Optional[str] = None) -> str:
+    """Record the version of a DataFrame so later lookups are O(1).
+
+    Call this once at ingest, after the frame has reached its final form.
+
+    Args:
+        df: DataFrame to register.
+        version: Precomputed version. Computed from the frame if omitted.
+
+    Returns:
+        The registered version string.
+    """
+    if version is None:
+        version = compute_dataset_version(df)
+    return _dataset_versions.set(df, version)
+
+
+def get_dataset_version(df: Any) -> str:
+    """Return the version of a DataFrame, fingerprinting it only if unknown.
+
+    Args:
+        df: DataFrame whose version is needed.
+
+    Returns:
+        Version string from the registry, or a freshly computed one.
+    """
+    version = _dataset_versions.get(df)
+    if version is None:
+        version = register_dataset_version(df)
+    return version
@@ -1,12 +1,21 @@
 # --- parallel_processing.py ---
 """Enhanced parallel processing utilities for batch operations."""
-from typing import Any, Callable, Dict, List, Optional, Iterator
+from typing import Any, Callable, Dict, List, Optional, Iterator, Tuple
 from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import multiprocessing
+import pickle
+from multiprocessing import shared_memory
 from functools import partial
 import pandas as pd
 from core.exceptions import ProcessingError
 
+# pyarrow is optional here: without it chunks are pickled to workers
+try:
+    import pyarrow as pa  # type: ignore[import-not-found]
+    HAS_PYARROW: bool = True
+except ImportError:
+    HAS_PYARROW = False  # type: ignore[assignment]
+
 
 class ParallelProcessor:
     """Enhanced parallel processor for batch operations."""
@@ -45,36 +54,35 @@ class ParallelProcessor:
             progress_callback: Optional callback(completed, total)
         
         Returns:
-            List of processed results
+            List of processed results, in the same order as `items`
         """
         if not items:
             return []
         
-        results = []
         total = len(items)
+        results: List[Any] = [None] * total
         
         with self.executor_class(max_workers=self.max_workers) as executor:
             # Submit all tasks
-            future_to_item = {
-                executor.submit(process_func, item): item
-                for item in items
+            future_to_index = {
+                executor.submit(process_func, item): index
+                for index, item in enumerate(items)
             }
             
-            # Collect results as they complete
+            # Collect results as they complete, placing each at its item's position
             completed = 0
-            for future in as_completed(future_to_item):
+            for future in as_completed(future_to_index):
                 completed += 1
+                index = future_to_index[future]
                 try:
-                    result = future.result()
-                    results.append(result)
+                    results[index] = future.result()
                 except Exception as e:
                     # Store error result
-                    item = future_to_item[future]
-                    results.append({
+                    results[index] = {
                         "error": str(e),
-                        "item": item,
+                        "item": items[index],
                         "success": False
-                    })
+                    }
                 
                 if progress_callback:
                     progress_callback(completed, total)
@@ -138,6 +146,186 @@ class ParallelProcessor:
         return chunks
 
 
+# --- Shared-memory chunk execution ---
+
+def _write_shared_frame(df: pd.DataFrame) -> Tuple[str, int]:
+    """Write a DataFrame as an Arrow IPC stream into a new shared memory block.
+
+    Returns:
+        (shared memory name, stream size in bytes). The caller owns the
+        block and must unlink it.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    sizer = pa.MockOutputStream()
+    with pa.ipc.new_stream(sizer, table.schema) as writer:
+        writer.write_table(table)
+    size = sizer.size()
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        _write_ipc_stream(table, shm.buf)
+    except Exception:
+        shm.close()
+        shm.unlink()
+        raise
+    name = shm.name
+    shm.close()
+    return name, size
+
+
+def _write_ipc_stream(table: Any, view: memoryview) -> None:
+    """Write `table` into `view`; Arrow's exports of `view` end with this call."""
+    stream = pa.FixedSizeBufferWriter(pa.py_buffer(view))
+    with pa.ipc.new_stream(stream, table.schema) as writer:
+        writer.write_table(table)
+    stream.close()
+
+
+def _read_shared_frame(name: str, size: int, unlink: bool = False) -> pd.DataFrame:
+    """Read a DataFrame written by `_write_shared_frame`.
+
+    Arrow reads the IPC stream in place from the shared block; the only copy
+    is the conversion into pandas. The block is then closed (and unlinked
+    when `unlink` is set).
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        view = shm.buf[:size]
+        table = pa.ipc.open_stream(pa.py_buffer(view)).read_all()
+        df = table.to_pandas()
+        del table
+        try:
+            view.release()
+        except BufferError:
+            # pandas kept zero-copy views of the block (numeric columns or
+            # the index); copy them out so the block can be closed
+            df = df.copy(deep=True)
+            df.index = df.index.copy(deep=True)
+            view.release()
+    finally:
+        shm.close()
+        if unlink:
+            shm.unlink()
+    return df
+
+
+def _run_shared_chunk(chunk_func: Callable[[pd.DataFrame], pd.DataFrame], name: str, size: int) -> Tuple[str, int]:
+    """Worker entry point: run `chunk_func` on a shared-memory chunk.
+
+    Module-level so it can be sent to process pools; `chunk_func` must be
+    module-level too.
+    """
+    result = chunk_func(_read_shared_frame(name, size))
+    return _write_shared_frame(result)
+
+
+class SharedMemoryChunkExecutor:
+    """Process DataFrame chunks in worker processes without pickling them.
+
+    Each chunk is written once into a shared memory block as an Arrow IPC
+    stream; workers read it from there and write their result the same way,
+    so only block names cross the process boundary. Results are combined in
+    chunk order regardless of completion order. Falls back to the pickling
+    `ParallelProcessor` path when pyarrow is unavailable.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: Optional[int] = None):
+        """
+        Initialize shared-memory executor.
+        
+        Args:
+            max_workers: Maximum number of worker processes (default: CPU count)
+            chunk_size: Rows per chunk (default: rows / workers)
+        """
+        self.max_workers = max_workers or multiprocessing.cpu_count()
+        self.chunk_size = chunk_size
+
+    def map_chunks(
+        self,
+        df: pd.DataFrame,
+        chunk_func: Callable[[pd.DataFrame], pd.DataFrame],
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> pd.DataFrame:
+        """
+        Apply `chunk_func` to row chunks of `df` in parallel, preserving order.
+        
+        Args:
+            df: DataFrame to process
+            chunk_func: Module-level function mapping a chunk to a DataFrame
+            progress_callback: Optional callback(completed, total)
+        
+        Returns:
+            Chunk results concatenated in the original chunk order
+        
+        Raises:
+            ProcessingError: If a chunk fails
+        """
+        if df.empty:
+            return chunk_func(df)
+        chunk_size = self.chunk_size or max(1, -(-len(df) // self.max_workers))
+        chunks = [df.iloc[i:i + chunk_size] for i in range(0, len(df), chunk_size)]
+
+        if not HAS_PYARROW:
+            processor = ParallelProcessor(max_workers=self.max_workers, chunk_size=chunk_size)
+            results = processor.process_batch(chunks, chunk_func, progress_callback)
+            return self._combine(results)
+
+        inputs: List[Tuple[str, int]] = []
+        outputs: List[Optional[Tuple[str, int]]] = [None] * len(chunks)
+        try:
+            for chunk in chunks:
+                inputs.append(_write_shared_frame(chunk))
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                future_to_index = {
+                    executor.submit(_run_shared_chunk, chunk_func, name, size): index
+                    for index, (name, size) in enumerate(inputs)
+                }
+                completed = 0
+                for future in as_completed(future_to_index):
+                    index = future_to_index[future]
+                    try:
+                        outputs[index] = future.result()
+                    except Exception as e:
+                        raise ProcessingError(
+                            f"Chunk {index} failed: {e}",
+                            error_code="CHUNK_FAILED",
+                            context={"chunk": index, "rows": len(chunks[index])}
+                        ) from e
+                    completed += 1
+                    if progress_callback:
+                        progress_callback(completed, len(chunks))
+            return self._combine([_read_shared_frame(name, size, unlink=True) for name, size in outputs])  # type: ignore[misc]
+        finally:
+            for block in inputs + [out for out in outputs if out is not None]:
+                self._unlink(block[0])
+
+    @staticmethod
+    def _combine(results: List[Any]) -> pd.DataFrame:
+        """Concatenate chunk results, raising on any stored error result."""
+        for index, result in enumerate(results):
+            if isinstance(result, dict) and result.get("success") is False:
+                raise ProcessingError(f"Chunk {index} failed: {result.get('error')}", error_code="CHUNK_FAILED", context={"chunk": index})
+        return pd.concat(results)
+
+    @staticmethod
+    def _unlink(name: str) -> None:
+        """Remove a shared memory block if it still exists."""
+        try:
+            shm = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            return
+        shm.close()
+        shm.unlink()
+
+
+def _is_picklable(func: Callable[..., Any]) -> bool:
+    """Whether `func` can be sent to a worker process."""
+    try:
+        pickle.dumps(func)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    return True
+
+
 def process_files_parallel_enhanced(
     files: List[Any],
     process_func: Callable[[Any], Any],
@@ -184,16 +372,27 @@ def process_dataframe_parallel(
     
     Returns:
         Processed DataFrame
+    
+    Note:
+        Chunks run in worker processes when `process_func` can be pickled
+        (a module-level function). Lambdas, closures and bound methods of
+        unpicklable objects run on threads instead.
     """
+    use_threads = not _is_picklable(process_func)
+    if combine_func is None and not use_threads:
+        # Ordered, shared-memory path; keep the previous fresh RangeIndex
+        executor = SharedMemoryChunkExecutor(max_workers=max_workers, chunk_size=chunk_size)
+        return executor.map_chunks(df, process_func).reset_index(drop=True)
+    
     processor = ParallelProcessor(
         max_workers=max_workers,
+        use_threads=use_threads,
         chunk_size=chunk_size
     )
-    
     if combine_func is None:
-        def default_combine(chunks: List[pd.DataFrame]) -> pd.DataFrame:
-            return pd.concat(chunks, ignore_index=True)
-        combine_func = default_combine
+        if df.empty:
+            return process_func(df).reset_index(drop=True)
+        return SharedMemoryChunkExecutor._combine(processor.process_chunks(df, process_func)).reset_index(drop=True)
     
     return processor.process_chunks(df, process_func, combine_func)
 
@@ -0,0 +1,260 @@
+# --- pipeline_tasks.py ---
+"""Picklable pipeline tasks for multi-process batch work.
+
+Process pools can only run module-level functions on picklable arguments, so
+batch work is described by task names, spooled file paths and a mapping ID
+instead of closures, Streamlit ``UploadedFile`` objects and live frames.
+Each worker resolves the mapping from the spool directory once and runs the
+requested tasks for one file.
+"""
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from core.exceptions import ProcessingError
+
+pd: Any = pd
+
+TASK_LOAD = "load"
+TASK_TRANSFORM = "transform"
+TASK_VALIDATE = "validate"
+TASK_ANONYMIZE = "anonymize"
+TASK_EXPORT = "export"
+
+DEFAULT_TASKS: Tuple[str, ...] = (TASK_LOAD, TASK_TRANSFORM)
+
+# Task name -> module-level function(state, context) -> None. Tasks read and
+# update the per-file `state` dict ("path", "frame", "transformed", ...).
+PIPELINE_TASKS: Dict[str, Callable[[Dict[str, Any], "TaskContext"], None]] = {}
+
+
+def register_task(name: str) -> Callable[[Callable[..., None]], Callable[..., None]]:
+    """Register a module-level function as a pipeline task.
+
+    Args:
+        name: Task name used in task lists.
+
+    Raises:
+        ProcessingError: If the function is nested (and so not picklable).
+    """
+    def decorator(func: Callable[..., None]) -> Callable[..., None]:
+        if func.__qualname__ != func.__name__:
+            raise ProcessingError(
+                f"Pipeline task '{name}' must be a module-level function",
+                error_code="TASK_NOT_PICKLABLE",
+                context={"task": name, "function": func.__qualname__}
+            )
+        PIPELINE_TASKS[name] = func
+        return func
+    return decorator
+
+
+class TaskContext:
+    """Mapping, layout and options a worker needs, resolved from a spool dir."""
+
+    def __init__(self, spool_dir: str, mapping_id: str, options: Optional[Dict[str, Any]] = None):
+        self.spool_dir = spool_dir
+        self.mapping_id = mapping_id
+        self.options = options or {}
+        self.final_mapping, self.layout_df = load_spooled_mapping(spool_dir, mapping_id)
+
+
+class BatchSpool:
+    """Temporary directory holding spooled uploads and mappings for a batch.
+
+    Use as a context manager; the directory is removed on exit, which is why
+    the export task writes only to an explicit `output_dir` task option.
+    """
+
+    def __init__(self, base_dir: Optional[str] = None):
+        self.spool_dir = tempfile.mkdtemp(prefix="mapper_batch_", dir=base_dir)
+
+    def spool_file(self, file_obj: Any) -> str:
+        """Copy an uploaded file to disk and return its path.
+
+        The original file name is kept so format detection by extension works.
+        """
+        name = os.path.basename(getattr(file_obj, "name", "upload"))
+        file_dir = tempfile.mkdtemp(dir=self.spool_dir)
+        path = os.path.join(file_dir, name)
+        file_obj.seek(0)
+        with open(path, "wb") as handle:
+            shutil.copyfileobj(file_obj, handle)
+        file_obj.seek(0)
+        return path
+
+    def store_mapping(self, final_mapping: Dict[str, Dict[str, Any]], layout_df: Any = None) -> str:
+        """Persist a mapping (and optional layout) and return its ID."""
+        from utils.cache_manager import get_dataset_version
+
+        payload = json.dumps(final_mapping, sort_keys=True, default=str)
+        layout_version = get_dataset_version(layout_df) if layout_df is not None else ""
+        mapping_id = hashlib.sha256((payload + layout_version).encode()).hexdigest()[:16]
+        with open(os.path.join(self.spool_dir, f"{mapping_id}.json"), "w", encoding="utf-8") as handle:
+            handle.write(payload)
+        if layout_df is not None:
+            with open(os.path.join(self.spool_dir, f"{mapping_id}.layout.pkl"), "wb") as handle:
+                pickle.dump(layout_df, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        return mapping_id
+
+    def cleanup(self) -> None:
+        """Remove the spool directory."""
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
+
+    def __enter__(self) -> "BatchSpool":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.cleanup()
+
+
+@lru_cache(maxsize=8)
+def load_spooled_mapping(spool_dir: str, mapping_id: str) -> Tuple[Dict[str, Dict[str, Any]], Any]:
+    """Load a mapping stored by `BatchSpool.store_mapping` (once per process)."""
+    with open(os.path.join(spool_dir, f"{mapping_id}.json"), encoding="utf-8") as handle:
+        final_mapping = json.load(handle)
+    layout_path = os.path.join(spool_dir, f"{mapping_id}.layout.pkl")
+    layout_df = None
+    if os.path.exists(layout_path):
+        with open(layout_path, "rb") as handle:
+            layout_df = pickle.load(handle)
+    return final_mapping, layout_df
+
+
+# --- Tasks ---
+
+@register_task(TASK_LOAD)
+def load_task(state: Dict[str, Any], context: TaskContext) -> None:
+    """Parse the spooled source file."""
+    from data.file_handler import load_source_file
+
+    with open(state["path"], "rb") as handle:
+        state["frame"], _ = load_source_file(handle)
+
+
+@register_task(TASK_TRANSFORM)
+def transform_task(state: Dict[str, Any], context: TaskContext) -> None:
+    """Apply the mapping's compiled transformation plan."""
+    from data.transformer import execute_transform_plan, get_transform_plan
+
+    plan = get_transform_plan(context.final_mapping, context.layout_df)
+    state["transformed"] = execute_transform_plan(plan, state["frame"])
+
+
+@register_task(TASK_VALIDATE)
+def validate_task(state: Dict[str, Any], context: TaskContext) -> None:
+    """Run field- and file-level validations on the transformed data."""
+    from validation.validation_engine import run_validations, dynamic_run_validations
+
+    df = state["transformed"]
+    mapped = [field for field, info in context.final_mapping.items() if info.get("value")]
+    if context.layout_df is not None:
+        from data.layout_loader import get_layout_index
+        required = list(get_layout_index(context.layout_df).required_fields)
+    else:
+        required = list(context.final_mapping.keys())
+    state["validation"] = run_validations(df, required, mapped) + dynamic_run_validations(df, context.final_mapping)
+
+
+@register_task(TASK_ANONYMIZE)
+def anonymize_task(state: Dict[str, Any], context: TaskContext) -> None:
+    """Anonymize the source data, then re-run the transform if it already ran."""
+    from data.anonymizer import anonymize_claims_data
+
+    state["frame"] = anonymize_claims_data(state["frame"], context.final_mapping)
+    if "transformed" in state:
+        transform_task(state, context)
+
+
+@register_task(TASK_EXPORT)
+def export_task(state: Dict[str, Any], context: TaskContext) -> None:
+    """Write the transformed data to the `output_dir` task option.
+
+    Raises:
+        ProcessingError: If no `output_dir` is given; the spool directory is
+            removed when the batch ends, so it cannot hold outputs.
+    """
+    from data.output_sinks import SINK_FORMATS, create_sink
+
+    fmt = context.options.get("export_format", "csv")
+    output_dir = context.options.get("output_dir")
+    if not output_dir:
+        raise ProcessingError(
+            "The export task needs an 'output_dir' task option",
+            error_code="EXPORT_DIR_REQUIRED",
+            context={"task": TASK_EXPORT}
+        )
+    os.makedirs(output_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(state["path"]))[0]
+    output_path = os.path.join(output_dir, f"{stem}_transformed{SINK_FORMATS.get(fmt, '.csv')}")
+    with create_sink(fmt, output_path) as sink:
+        sink.write(state.get("transformed", state.get("frame")))
+    state["output_path"] = output_path
+
+
+def run_file_tasks(
+    path: str,
+    task_names: Sequence[str],
+    spool_dir: str,
+    mapping_id: str,
+    options: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Run registered tasks for one spooled file (process-pool entry point).
+
+    Args:
+        path: Spooled source file path.
+        task_names: Names from `PIPELINE_TASKS`, run in order.
+        spool_dir: Spool directory holding the mapping.
+        mapping_id: ID returned by `BatchSpool.store_mapping`.
+        options: Task options (`export_format`, `output_dir`).
+
+    Returns:
+        Per-file result dict with status, row count, per-task seconds and,
+        when requested, validation results and the output path.
+    """
+    file_name = os.path.basename(path)
+    state: Dict[str, Any] = {"path": path}
+    timings: Dict[str, float] = {}
+    try:
+        context = TaskContext(spool_dir, mapping_id, options)
+        for name in task_names:
+            task = PIPELINE_TASKS.get(name)
+            if task is None:
+                raise ProcessingError(f"Unknown pipeline task: {name}", error_code="UNKNOWN_TASK", context={"task": name})
+            start = time.perf_counter()
+            task(state, context)
+            timings[name] = round(time.perf_counter() - start, 4)
+    except Exception as e:
+        return {"status": "error", "error": str(e), "file_name": file_name, "task_seconds": timings}
+
+    frame = state.get("transformed", state.get("frame"))
+    result: Dict[str, Any] = {
+        "status": "processed",
+        "rows": len(frame) if frame is not None else 0,
+        "errors": [],
+        "file_name": file_name,
+        "task_seconds": timings,
+    }
+    if "validation" in state:
+        result["validation"] = state["validation"]
+    if "output_path" in state:
+        result["output_path"] = state["output_path"]
+    return result
+
+
+def run_file_tasks_item(item: Tuple[str, Sequence[str], str, str, Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    """`run_file_tasks` taking a single tuple, for `ParallelProcessor.process_batch`."""
+    return run_file_tasks(*item)
+
+
+def list_tasks() -> List[str]:
+    """Return registered task names."""
+    return list(PIPELINE_TASKS)
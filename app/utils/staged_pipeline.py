@@ -0,0 +1,206 @@
+# --- staged_pipeline.py ---
+"""Staged pipeline runner with bounded queues between stages.
+
+Each stage runs in its own pool of worker threads and hands items to the
+next stage through a bounded queue, so I/O, decompression, parsing and
+writing of different files overlap while a slow stage applies backpressure
+to the ones before it instead of letting work pile up in memory.
+"""
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.exceptions import ProcessingError
+
+DEFAULT_QUEUE_SIZE = 2
+
+# Marks the end of input on a stage queue (one per downstream worker)
+_END = object()
+
+
+@dataclass
+class PipelineStage:
+    """One pipeline stage.
+
+    Attributes:
+        name: Stage name used in stats.
+        func: Function applied to each item; its return value is passed on.
+        workers: Number of worker threads for the stage.
+    """
+
+    name: str
+    func: Callable[[Any], Any]
+    workers: int = 1
+
+
+@dataclass
+class StageFailure:
+    """Placeholder passed downstream for an item that failed in a stage."""
+
+    stage: str
+    error: Exception
+
+
+class _StageStats:
+    """Thread-safe counters for one stage."""
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self.items = 0
+        self.failures = 0
+        self.busy_seconds = 0.0
+        self.depth_samples = 0
+        self.depth_total = 0
+        self.max_depth = 0
+        self.lock = threading.Lock()
+
+    def record(self, depth: int, busy: float, failed: bool) -> None:
+        with self.lock:
+            self.items += 1
+            self.failures += int(failed)
+            self.busy_seconds += busy
+            self.depth_samples += 1
+            self.depth_total += depth
+            self.max_depth = max(self.max_depth, depth)
+
+    def to_dict(self, wall_seconds: float, queue_size: int) -> Dict[str, Any]:
+        capacity = wall_seconds * self.workers
+        return {
+            "workers": self.workers,
+            "items": self.items,
+            "failures": self.failures,
+            "busy_seconds": round(self.busy_seconds, 4),
+            "utilization": round(self.busy_seconds / capacity, 3) if capacity > 0 else 0.0,
+            "avg_queue_depth": round(self.depth_total / self.depth_samples, 2) if self.depth_samples else 0.0,
+            "max_queue_depth": self.max_depth,
+            "queue_size": queue_size,
+        }
+
+
+class StagedPipeline:
+    """Run items through stages connected by bounded queues.
+
+    Items keep their input position: `run` returns results in input order.
+    An exception in a stage turns the item into a `StageFailure`, which later
+    stages pass through untouched.
+    """
+
+    def __init__(self, stages: List[PipelineStage], queue_size: int = DEFAULT_QUEUE_SIZE):
+        """
+        Initialize the pipeline.
+
+        Args:
+            stages: Stages in execution order
+            queue_size: Capacity of each inter-stage queue
+        """
+        if not stages:
+            raise ProcessingError("A pipeline needs at least one stage", error_code="EMPTY_PIPELINE")
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+
+    def run(
+        self,
+        items: Iterable[Any],
+        progress_callback: Optional[Callable[[int], None]] = None
+    ) -> Tuple[List[Any], Dict[str, Any]]:
+        """
+        Run all items through the pipeline.
+
+        Args:
+            items: Inputs to the first stage
+            progress_callback: Optional callback(completed) per finished item
+
+        Returns:
+            (results in input order, stats). Stats hold per-stage workers,
+            items, failures, busy seconds, utilization and queue depth, plus
+            `wall_seconds` and `items`.
+
+        Raises:
+            Exception: Whatever iterating `items` raised, once the items fed
+                before the error have drained through the stages.
+        """
+        queues: List["queue.Queue[Any]"] = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results_queue: "queue.Queue[Any]" = queue.Queue()
+        stats = [_StageStats(stage.workers) for stage in self.stages]
+        remaining = [stage.workers for stage in self.stages]
+        remaining_lock = threading.Lock()
+
+        def downstream(position: int) -> Tuple["queue.Queue[Any]", int]:
+            if position + 1 < len(self.stages):
+                return queues[position + 1], self.stages[position + 1].workers
+            return results_queue, 1
+
+        def worker(position: int) -> None:
+            stage = self.stages[position]
+            inbox = queues[position]
+            outbox, _ = downstream(position)
+            while True:
+                depth = inbox.qsize()
+                entry = inbox.get()
+                if entry is _END:
+                    break
+                index, payload = entry
+                if not isinstance(payload, StageFailure):
+                    start = time.perf_counter()
+                    failed = False
+                    try:
+                        payload = stage.func(payload)
+                    except Exception as e:
+                        payload = StageFailure(stage.name, e)
+                        failed = True
+                    stats[position].record(depth, time.perf_counter() - start, failed)
+                outbox.put((index, payload))
+            # The last worker of a stage closes the next stage's queue
+            with remaining_lock:
+                remaining[position] -= 1
+                last = remaining[position] == 0
+            if last:
+                next_queue, next_workers = downstream(position)
+                for _ in range(next_workers):
+                    next_queue.put(_END)
+
+        feed_errors: List[BaseException] = []
+
+        def feed() -> None:
+            # Always close the first queue, or the workers (and `run`) would
+            # wait forever after an error in the items iterable
+            try:
+                for index, item in enumerate(items):
+                    queues[0].put((index, item))
+            except BaseException as e:
+                feed_errors.append(e)
+            finally:
+                for _ in range(self.stages[0].workers):
+                    queues[0].put(_END)
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=feed, name="pipeline-feed", daemon=True)]
+        for position, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                threads.append(threading.Thread(target=worker, args=(position,), name=f"pipeline-{stage.name}-{n}", daemon=True))
+        for thread in threads:
+            thread.start()
+
+        collected: Dict[int, Any] = {}
+        while True:
+            entry = results_queue.get()
+            if entry is _END:
+                break
+            index, payload = entry
+            collected[index] = payload
+            if progress_callback:
+                progress_callback(len(collected))
+        for thread in threads:
+            thread.join()
+        if feed_errors:
+            raise feed_errors[0]
+
+        wall = time.perf_counter() - start
+        stage_stats = {stage.name: stats[i].to_dict(wall, self.queue_size) for i, stage in enumerate(self.stages)}
+        return [collected[i] for i in sorted(collected)], {
+            "wall_seconds": round(wall, 4),
+            "items": len(collected),
+            "stages": stage_stats,
+        }
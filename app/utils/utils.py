@@ -96,22 +96,13 @@ def detect_date_formats_from_dataframe(df: Any) -> str:
     if df is None or df.empty:
         return "yyyyMMdd"  # Default
     
-    date_formats = set()
+    from data.date_parsing import detect_column_date_formats, NON_PYSPARK_FORMATS
     
-    # Look for columns that might contain dates
-    date_keywords = ['date', 'dob', 'birth', 'service', 'claim', 'admit', 'discharge', 'effective']
-    
-    for col in df.columns:
-        col_lower = str(col).lower()
-        if any(keyword in col_lower for keyword in date_keywords):
-            # Sample non-null values from this column
-            col_data = df[col].dropna().astype(str).head(20)  # Sample up to 20 values
-            
-            for sample in col_data:
-                if sample and str(sample).strip() and str(sample).strip().lower() not in ['nan', 'none', '']:
-                    detected_format = infer_date_format(str(sample))
-                    if detected_format and detected_format != "Unknown":
-                        date_formats.add(detected_format)
+    # Formats are inferred from each date-like column's distinct values
+    date_formats = {
+        fmt for fmt in detect_column_date_formats(df).values()
+        if fmt not in NON_PYSPARK_FORMATS
+    }
     
     # If no dates detected, return default
     if not date_formats:
@@ -127,6 +118,7 @@ def render_claims_file_summary() -> None:
     Shows file metadata, row/column counts, date fields, and data types
     in a compact card format matching other summaries.
     """
+    from data.date_parsing import detect_date_format
     claims_df = st.session_state.get("claims_df")
     metadata = st.session_state.get("claims_file_metadata", {})
     claims_file = st.session_state.get("claims_file_obj")
@@ -203,7 +195,7 @@ def render_claims_file_summary() -> None:
                 date_format_rows: List[Dict[str, Any]] = []
                 for col in date_cols:
                     sample_value = claims_df[col].dropna().astype(str).iloc[0] if not claims_df[col].dropna().empty else ""  # type: ignore[no-untyped-call]
-                    detected_format = infer_date_format(sample_value) if sample_value else "Unknown"
+                    detected_format = detect_date_format(claims_df[col]) or "Unknown"
                     date_format_rows.append({
                         "Column Name": col,
                         "Example Value": sample_value,
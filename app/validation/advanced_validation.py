@@ -11,68 +11,80 @@ pd: Any = pd
 
 
 def validate_cross_field_relationship(df: pd.DataFrame, field1: str, field2: str,
-                                     relationship: str, expected_value: Any = None) -> Dict[str, Any]:
+                                     relationship: str, expected_value: Any = None,
+                                     value_type: Optional[str] = None) -> Dict[str, Any]:
     """Validate relationship between two fields.
     
+    Evaluated on whole columns; see `validation.cross_field` for checking
+    many relationships in one call.
+    
     Args:
         df: DataFrame
         field1: First field name
         field2: Second field name
         relationship: Relationship type ('equals', 'greater_than', 'less_than', 'sum_equals', 'conditional')
         expected_value: Expected value for the relationship
+        value_type: Optional coercion before comparing ('date', 'money', 'integer', 'number')
+        
+    Returns:
+        Validation result dictionary
+    """
+    from validation.cross_field import CrossFieldRule, validate_cross_field_rules
+    
+    rule = CrossFieldRule(field1, field2, relationship, expected_value, value_type)
+    return validate_cross_field_rules(df, [rule])[0]
+
+
+def validate_referential_integrity(df: pd.DataFrame, field: str, reference_path: str,
+                                   reference_column: str) -> Dict[str, Any]:
+    """Check that every key in a field exists in a reference table.
+    
+    The reference column is indexed once (Bloom filter plus sorted key
+    hashes, saved between runs); see `validation.reference_index`.
+    
+    Args:
+        df: DataFrame
+        field: Key field (member ID, provider ID, plan code, ...)
+        reference_path: Reference CSV (eligibility roster, provider file, ...)
+        reference_column: Key column in the reference file
         
     Returns:
         Validation result dictionary
     """
-    if field1 not in df.columns or field2 not in df.columns:
+    from validation.reference_index import check_references, get_reference_index
+    
+    rule_label = f"{field} in {reference_column}"
+    if field not in df.columns:
         return {
+            "rule": rule_label,
             "status": "Fail",
-            "message": f"Fields {field1} or {field2} not found",
+            "message": f"Field {field} not found",
+            "fail_count": 0,
+            "fail_pct": 0.0
+        }
+    try:
+        index = get_reference_index(reference_path, reference_column)
+        missing = check_references(df, field, index).missing
+    except Exception as e:
+        return {
+            "rule": rule_label,
+            "status": "Fail",
+            "message": f"Error checking referential integrity: {str(e)}",
             "fail_count": 0,
             "fail_pct": 0.0
         }
     
-    valid_count = 0
     total_count = len(df)
-    failures = []
-    
-    for idx, row in df.iterrows():
-        val1 = row[field1]
-        val2 = row[field2]
-        
-        is_valid = False
-        
-        if relationship == "equals":
-            is_valid = val1 == val2
-        elif relationship == "greater_than":
-            is_valid = pd.notna(val1) and pd.notna(val2) and val1 > val2
-        elif relationship == "less_than":
-            is_valid = pd.notna(val1) and pd.notna(val2) and val1 < val2
-        elif relationship == "sum_equals":
-            if expected_value is not None:
-                is_valid = pd.notna(val1) and pd.notna(val2) and (val1 + val2) == expected_value
-        elif relationship == "conditional":
-            # If field1 has value, field2 must also have value
-            is_valid = pd.isna(val1) or pd.notna(val2)
-        
-        if is_valid:
-            valid_count += 1
-        else:
-            failures.append(idx)
-    
-    fail_count = total_count - valid_count
+    fail_count = int(missing.sum())
     fail_pct = (fail_count / total_count * 100) if total_count > 0 else 0
-    
-    status = "Pass" if fail_count == 0 else ("Warning" if fail_pct < 5 else "Fail")
-    
     return {
-        "status": status,
-        "message": f"Cross-field validation: {field1} {relationship} {field2}",
+        "rule": rule_label,
+        "status": "Pass" if fail_count == 0 else ("Warning" if fail_pct < 5 else "Fail"),
+        "message": f"{fail_count} of {total_count} {field} values not found in {reference_column}",
         "fail_count": fail_count,
         "fail_pct": round(fail_pct, 2),
         "total_count": total_count,
-        "valid_count": valid_count,
-        "failures": failures[:10]  # Limit to first 10
+        "valid_count": total_count - fail_count
     }
 
 
@@ -98,6 +110,39 @@ def create_business_rule(rule_name: str, condition: str, action: str,
     }
 
 
+def _business_rule_result(df: pd.DataFrame, rule: Dict[str, Any], matches: Any) -> Dict[str, Any]:
+    """Build a business rule result from its match mask (or evaluation error)."""
+    action = rule.get("action", "WARN")
+    if isinstance(matches, Exception):
+        return {
+            "status": "Fail",
+            "message": f"Error evaluating rule: {str(matches)}",
+            "match_count": 0,
+            "match_pct": 0.0,
+            "total_count": len(df),
+            "action": action
+        }
+    
+    match_count = int(matches.sum())
+    total_count = len(df)
+    match_pct = (match_count / total_count * 100) if total_count > 0 else 0
+    
+    status = "Pass"
+    if action == "REJECT" and match_count > 0:
+        status = "Fail"
+    elif action == "WARN" and match_pct > 10:
+        status = "Warning"
+    
+    return {
+        "status": status,
+        "message": f"Business rule '{rule['name']}': {match_count} rows match condition",
+        "match_count": match_count,
+        "match_pct": round(match_pct, 2),
+        "total_count": total_count,
+        "action": action
+    }
+
+
 def evaluate_business_rule(df: pd.DataFrame, rule: Dict[str, Any]) -> Dict[str, Any]:
     """Evaluate a business rule on a DataFrame.
     
@@ -108,40 +153,27 @@ def evaluate_business_rule(df: pd.DataFrame, rule: Dict[str, Any]) -> Dict[str,
     Returns:
         Evaluation result dictionary
     """
-    condition = rule.get("condition", "")
-    action = rule.get("action", "WARN")
+    return evaluate_business_rules(df, [rule])[0]
+
+
+def evaluate_business_rules(df: pd.DataFrame, rules: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Evaluate a set of business rules in one pass over their columns.
     
-    try:
-        # Simple condition evaluation (would need more sophisticated parser in production)
-        # For now, support basic comparisons
-        matches = df.eval(condition, engine='python')
-        match_count = matches.sum()
-        total_count = len(df)
-        match_pct = (match_count / total_count * 100) if total_count > 0 else 0
-        
-        status = "Pass"
-        if action == "REJECT" and match_count > 0:
-            status = "Fail"
-        elif action == "WARN" and match_pct > 10:
-            status = "Warning"
+    Conditions are compiled once per rule text and column dtypes (see
+    `validation.rule_compiler`), and subexpressions shared by several rules
+    are computed once.
+    
+    Args:
+        df: DataFrame
+        rules: Rule dictionaries
         
-        return {
-            "status": status,
-            "message": f"Business rule '{rule['name']}': {match_count} rows match condition",
-            "match_count": int(match_count),
-            "match_pct": round(match_pct, 2),
-            "total_count": total_count,
-            "action": action
-        }
-    except Exception as e:
-        return {
-            "status": "Fail",
-            "message": f"Error evaluating rule: {str(e)}",
-            "match_count": 0,
-            "match_pct": 0.0,
-            "total_count": len(df),
-            "action": action
-        }
+    Returns:
+        Evaluation result dictionaries, in `rules` order
+    """
+    from validation.rule_compiler import evaluate_conditions
+    
+    outcomes = evaluate_conditions(df, [rule.get("condition", "") for rule in rules])
+    return [_business_rule_result(df, rule, matches) for rule, matches in zip(rules, outcomes)]
 
 
 def get_validation_rule_templates() -> Dict[str, Dict[str, Any]]:
@@ -174,13 +206,15 @@ def get_validation_rule_templates() -> Dict[str, Dict[str, Any]]:
         "referential_integrity": {
             "name": "Referential Integrity",
             "description": "Check that foreign key relationships are valid",
-            "type": "relationship_validation"
+            "type": "relationship_validation",
+            "function": "validate_referential_integrity"
         }
     }
 
 
 def track_validation_performance(validation_name: str, execution_time: float,
-                                record_count: int, result_count: int) -> None:
+                                record_count: int, result_count: int,
+                                rule_timings: Optional[List[Dict[str, Any]]] = None) -> None:
     """Track validation execution performance.
     
     Args:
@@ -188,6 +222,9 @@ def track_validation_performance(validation_name: str, execution_time: float,
         execution_time: Execution time in seconds
         record_count: Number of records validated
         result_count: Number of validation results
+        rule_timings: Optional per-rule breakdowns (rule, field, seconds,
+            rows_per_second, peak_memory_bytes) as collected by the
+            validation engine's `timings` argument
     """
     if "validation_performance" not in st.session_state:
         st.session_state.validation_performance = []
@@ -198,6 +235,7 @@ def track_validation_performance(validation_name: str, execution_time: float,
         "record_count": record_count,
         "result_count": result_count,
         "records_per_second": record_count / execution_time if execution_time > 0 else 0,
+        "rules": list(rule_timings or []),
         "timestamp": datetime.now().isoformat()
     }
     
@@ -226,11 +264,16 @@ def get_validation_performance_stats() -> Dict[str, Any]:
     avg_execution_time = sum(r["execution_time"] for r in perf_records) / len(perf_records)
     avg_records_per_second = sum(r["records_per_second"] for r in perf_records) / len(perf_records)
     
+    # Slowest rules of the latest run that has a per-rule breakdown
+    latest_rules = next((r["rules"] for r in reversed(perf_records) if r.get("rules")), [])
+    slowest_rules = sorted(latest_rules, key=lambda t: t.get("seconds", 0), reverse=True)[:10]
+    
     return {
         "total_validations": len(perf_records),
         "avg_execution_time": round(avg_execution_time, 3),
         "avg_records_per_second": round(avg_records_per_second, 2),
-        "total_records_validated": sum(r["record_count"] for r in perf_records)
+        "total_records_validated": sum(r["record_count"] for r in perf_records),
+        "slowest_rules": slowest_rules
     }
 
 
@@ -238,6 +281,9 @@ def incremental_validation(df: pd.DataFrame, previous_hash: str,
                           validation_func: Callable) -> Tuple[Dict[str, Any], str]:
     """Perform incremental validation on changed data only.
     
+    Results are reused only when the frame's content is unchanged; use the
+    validation engine's `result_cache` to re-run just the affected rules.
+    
     Args:
         df: DataFrame
         previous_hash: Hash of previous data state
@@ -247,9 +293,13 @@ def incremental_validation(df: pd.DataFrame, previous_hash: str,
         Tuple of (validation_results, new_hash)
     """
     import hashlib
+    from utils.cache_manager import get_column_fingerprints
     
-    # Calculate current hash
-    current_hash = hashlib.md5(str(df.shape).encode() + str(df.columns.tolist()).encode()).hexdigest()
+    # Content hash from per-column fingerprints (each column hashed once per frame)
+    fingerprints = get_column_fingerprints(df)
+    current_hash = hashlib.md5(
+        "|".join(f"{col}={fp}" for col, fp in fingerprints.items()).encode()
+    ).hexdigest()
     
     # If hash matches, return cached results
     if current_hash == previous_hash and "cached_validation_results" in st.session_state:
@@ -0,0 +1,315 @@
+# pyright: reportUnknownMemberType=false, reportMissingTypeStubs=false, reportUnknownVariableType=false, reportUnknownArgumentType=false
+"""Claim-level (grouped) validation rules.
+
+Lines are grouped by the claim key once: the key is factorized and the rows
+sorted by claim, after which every predicate is a segment reduction
+(``ufunc.reduceat`` / ``bincount``) over the claim segments, never a Python
+``groupby.apply``. Failures are reported per claim, and the lines of failing
+claims come back as a `FailureBitmap`.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, cast
+
+import numpy as np  # type: ignore[import-not-found]
+import pandas as pd  # type: ignore[import-not-found]
+
+from validation.cross_field import DEFAULT_SAMPLE_SIZE, _CoercedColumns
+from validation.failure_bitmap import FailureBitmap
+
+pd = cast(Any, pd)
+np = cast(Any, np)
+
+CLAIM_RULE_KINDS = ("consistent", "within_span", "sum_equals")
+
+# Internal claim number fields, in order of preference
+CLAIM_ID_FIELDS = ("Claim_ID", "claim_id", "Claim ID", "ClaimID")
+
+# Header-level fields every line of a claim must agree on (checked when present)
+CLAIM_HEADER_FIELDS = ("Insured_ID", "Patient_DOB", "Claim_Type", "Billing_Provider_NPI")
+
+
+@dataclass(frozen=True)
+class ClaimRule:
+    """One predicate over the lines of each claim.
+
+    Kinds:
+        consistent: `field` has at most one distinct value per claim.
+        within_span: each line's `field` date lies within the claim's span
+            (earliest `start` to latest `end`).
+        sum_equals: line `field` amounts sum to the claim's `total` within
+            `tolerance`.
+
+    Attributes:
+        kind: One of `CLAIM_RULE_KINDS`.
+        field: Line field the predicate reads.
+        start: Span start field ("within_span").
+        end: Span end field ("within_span").
+        total: Header total field ("sum_equals").
+        value_type: Coercion for amounts ("money" by default for
+            "sum_equals"; see `cross_field.VALUE_TYPES`).
+        tolerance: Allowed difference for "sum_equals", in the field's units.
+        name: Optional display name.
+    """
+
+    kind: str
+    field: str
+    start: Optional[str] = None
+    end: Optional[str] = None
+    total: Optional[str] = None
+    value_type: Optional[str] = None
+    tolerance: float = 0.01
+    name: Optional[str] = None
+
+    @property
+    def columns(self) -> List[str]:
+        """Fields the rule reads."""
+        return [col for col in (self.field, self.start, self.end, self.total) if col]
+
+    @property
+    def label(self) -> str:
+        """Display name."""
+        if self.name:
+            return self.name
+        if self.kind == "within_span":
+            return f"{self.field} within {self.start}..{self.end} per claim"
+        if self.kind == "sum_equals":
+            return f"{self.field} sums to {self.total} per claim"
+        return f"{self.field} consistent per claim"
+
+
+class ClaimGroups:
+    """Rows grouped by claim: one stable sort, then segment reductions.
+
+    Claims are numbered 0..count-1 by first appearance; rows with a missing
+    key belong to no claim.
+
+    Attributes:
+        codes: Claim number of each row (-1 for a missing key).
+        uniques: Claim key value(s) per claim.
+        count: Number of claims.
+        order: Row positions sorted by claim (keyed rows only).
+        starts: Offset of each claim's segment in `order`.
+    """
+
+    def __init__(self, codes: Any, uniques: Any):
+        self.codes = np.asarray(codes, dtype=np.int64)
+        self.uniques = uniques
+        self.count = len(uniques)
+        order = np.argsort(self.codes, kind="stable")
+        self.order = order[self.codes[order] >= 0]
+        sorted_codes = self.codes[self.order]
+        self.starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]) if len(sorted_codes) \
+            else np.empty(0, dtype=np.int64)
+
+    @classmethod
+    def from_frame(cls, df: Any, key: Sequence[str], context: Optional[Any] = None) -> "ClaimGroups":
+        """Group `df` by the claim key column(s)."""
+        key = list(key)
+        if len(key) == 1:
+            if context is None:
+                from validation.validation_engine import get_validation_context
+                context = get_validation_context(df)
+            codes, uniques = context.factorized(key[0])
+            return cls(codes, uniques)
+        # Composite key: groups numbered by first appearance, like factorize
+        grouped = df.groupby(key, sort=False, dropna=True)
+        codes = grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+        return cls(codes, grouped.size().index)
+
+    def _segments(self, values: Any) -> Any:
+        return np.asarray(values)[self.order]
+
+    def sum(self, values: Any) -> Any:
+        """Per-claim sum of float values (NaN counts as 0)."""
+        if not self.count:
+            return np.zeros(0)
+        segments = self._segments(values)
+        return np.add.reduceat(np.where(np.isnan(segments), 0.0, segments), self.starts)
+
+    def min(self, values: Any) -> Any:
+        """Per-claim minimum of float values, ignoring NaN (NaN if none)."""
+        return np.fmin.reduceat(self._segments(values), self.starts) if self.count else np.zeros(0)
+
+    def max(self, values: Any) -> Any:
+        """Per-claim maximum of float values, ignoring NaN (NaN if none)."""
+        return np.fmax.reduceat(self._segments(values), self.starts) if self.count else np.zeros(0)
+
+    def any(self, mask: Any) -> Any:
+        """Per-claim: any row of the claim is True."""
+        keyed = np.asarray(mask, dtype=bool) & (self.codes >= 0)
+        return np.bincount(self.codes[keyed], minlength=self.count) > 0
+
+    def nunique(self, value_codes: Any) -> Any:
+        """Per-claim distinct non-missing values, from factor codes of a column."""
+        value_codes = np.asarray(value_codes, dtype=np.int64)
+        keyed = (self.codes >= 0) & (value_codes >= 0)
+        width = int(value_codes.max()) + 1 if len(value_codes) else 1
+        pairs = np.unique(self.codes[keyed] * width + value_codes[keyed])
+        return np.bincount(pairs // width, minlength=self.count)
+
+    def broadcast(self, per_claim: Any, missing: Any = np.nan) -> Any:
+        """Per-row values from per-claim values (`missing` for unkeyed rows)."""
+        return np.append(np.asarray(per_claim), missing)[self.codes]
+
+
+def _as_float(values: Any) -> Any:
+    """Numeric or datetime values as float64 (NaN for missing)."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        stamps = np.asarray(values, dtype="datetime64[ns]")
+        result = stamps.astype(np.int64).astype(float)
+        result[np.isnat(stamps)] = np.nan
+        return result
+    return pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)  # type: ignore[no-untyped-call]
+
+
+def _failing_claims(
+    rule: ClaimRule,
+    df: Any,
+    groups: ClaimGroups,
+    columns: _CoercedColumns,
+    context: Any
+) -> Tuple[Any, Any]:
+    """(per-claim failure flags, per-row failure mask of the offending lines)."""
+    if rule.kind == "consistent":
+        codes, _ = context.factorized(rule.field)
+        failing = groups.nunique(codes) > 1
+        return failing, None
+    if rule.kind == "within_span":
+        dates = _as_float(columns.get(rule.field, "date"))
+        start = groups.broadcast(groups.min(_as_float(columns.get(rule.start or rule.field, "date"))))
+        end = groups.broadcast(groups.max(_as_float(columns.get(rule.end or rule.field, "date"))))
+        # NaN comparisons are False: lines or spans without dates pass
+        outside = (dates < start) | (dates > end)
+        return groups.any(outside), outside
+    if rule.kind == "sum_equals":
+        value_type = rule.value_type or "money"
+        scale = 100.0 if value_type == "money" else 1.0
+        line_sum = groups.sum(_as_float(columns.get(rule.field, value_type)))
+        total = groups.max(_as_float(columns.get(rule.total or rule.field, value_type)))
+        failing = ~np.isnan(total) & (np.abs(line_sum - total) > rule.tolerance * scale + 1e-9)
+        return failing, None
+    raise ValueError(f"Unknown claim rule kind: {rule.kind}. Supported: {', '.join(CLAIM_RULE_KINDS)}")
+
+
+def _evaluate(
+    df: Any,
+    rule: ClaimRule,
+    groups: ClaimGroups,
+    columns: _CoercedColumns,
+    context: Any,
+    sample_size: int
+) -> Dict[str, Any]:
+    total_claims = groups.count
+    missing = [col for col in rule.columns if col not in df.columns]
+    if missing:
+        return {
+            "rule": rule.label,
+            "status": "Fail",
+            "message": f"Fields not found: {', '.join(missing)}",
+            "fail_count": 0,
+            "fail_pct": 0.0
+        }
+    try:
+        failing, line_mask = _failing_claims(rule, df, groups, columns, context)
+    except Exception as e:
+        return {
+            "rule": rule.label,
+            "status": "Fail",
+            "message": f"Error evaluating claim rule '{rule.label}': {str(e)}",
+            "fail_count": 0,
+            "fail_pct": 0.0,
+            "total_count": total_claims
+        }
+
+    if line_mask is None:
+        # Whole claim is at fault: flag all of its lines
+        line_mask = groups.broadcast(failing, False).astype(bool)
+    fail_count = int(failing.sum())
+    fail_pct = (fail_count / total_claims * 100) if total_claims > 0 else 0
+    status = "Pass" if fail_count == 0 else ("Warning" if fail_pct < 5 else "Fail")
+    sample = np.flatnonzero(failing)[:sample_size]
+    return {
+        "rule": rule.label,
+        "status": status,
+        "message": f"{fail_count} of {total_claims} claims fail: {rule.label}",
+        "fail_count": fail_count,
+        "fail_pct": round(fail_pct, 2),
+        "total_count": total_claims,
+        "valid_count": total_claims - fail_count,
+        "failed_claims": [groups.uniques[i] for i in sample],
+        "failure_bitmap": FailureBitmap.from_mask(line_mask)
+    }
+
+
+def validate_claim_rules(
+    df: Any,
+    claim_key: Sequence[str],
+    rules: List[ClaimRule],
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    context: Optional[Any] = None
+) -> List[Dict[str, Any]]:
+    """Evaluate claim-level rules, grouping the lines by claim once.
+
+    Args:
+        df: Claim line DataFrame
+        claim_key: Claim key column(s)
+        rules: Claim-level predicates
+        sample_size: Number of failing claim keys to include per rule
+        context: ValidationContext for `df` (default: the frame's shared one)
+
+    Returns:
+        One result dict per rule (status, message, fail_count / total_count
+        in claims, sample `failed_claims` and a `failure_bitmap` of the
+        offending lines), in `rules` order
+    """
+    if context is None:
+        from validation.validation_engine import get_validation_context
+        context = get_validation_context(df)
+    groups = context.claim_groups(tuple(claim_key))
+    columns = _CoercedColumns(df)
+    return [_evaluate(df, rule, groups, columns, context, sample_size) for rule in rules]
+
+
+def resolve_claim_key(
+    columns: Iterable[str],
+    final_mapping: Optional[Dict[str, Dict[str, Any]]] = None,
+    primary_key: Optional[str] = None,
+    preprocessing_primary_key: Optional[str] = None
+) -> List[str]:
+    """Claim key columns of a transformed frame.
+
+    The onboarding `primary_key` (source columns, comma-separated, e.g.
+    claim and line number) is mapped back to internal fields; columns of the
+    line-level `preprocessing_primary_key` are dropped. Without a usable
+    primary key the first `CLAIM_ID_FIELDS` field present is used.
+
+    Args:
+        columns: Columns of the transformed frame
+        final_mapping: Mapping `{internal_field: {"value": source_column}}`
+        primary_key: Onboarding primary key (source columns)
+        preprocessing_primary_key: Onboarding preprocessing (line) key
+
+    Returns:
+        Internal claim key columns (empty if none found)
+    """
+    columns = list(columns)
+
+    def split(key: Optional[str]) -> List[str]:
+        return [part.strip() for part in (key or "").split(",") if part.strip()]
+
+    if primary_key and final_mapping:
+        internal = {
+            (mapping or {}).get("value"): field for field, mapping in final_mapping.items() if (mapping or {}).get("value")
+        }
+        line_key = set(split(preprocessing_primary_key))
+        key = [internal[source] for source in split(primary_key) if source in internal and source not in line_key]
+        key = [field for field in key if field in columns]
+        if key:
+            return key
+    return [field for field in CLAIM_ID_FIELDS if field in columns][:1]
+
+
+def default_claim_rules(columns: Iterable[str]) -> List[ClaimRule]:
+    """Consistency rules for the `CLAIM_HEADER_FIELDS` present in `columns`."""
+    present = set(columns)
+    return [ClaimRule("consistent", field) for field in CLAIM_HEADER_FIELDS if field in present]
@@ -0,0 +1,498 @@
+# pyright: reportUnknownMemberType=false, reportMissingTypeStubs=false, reportUnknownVariableType=false, reportUnknownArgumentType=false
+"""Code-set membership for diagnosis and other claim codes.
+
+Codes are normalized (dots and whitespace removed, upper-cased) and held in
+sorted NumPy arrays. Claim columns are factorized so normalization and
+lookups run once per distinct code, never per row. Category-level entries
+(e.g. ICD-10 ``M54``) match every code they prefix (``M545``, ``M5450``).
+
+Code validity (ICD-10-CM, CPT, HCPCS, revenue codes) uses `VersionedCodeSet`:
+one exact-match index per effective date, loaded once from local code tables
+and shared by every session (see `get_code_set_catalog`). Each claim line is
+checked against the version in force on its service date.
+"""
+import hashlib
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple, cast
+
+import numpy as np  # type: ignore[import-not-found]
+import pandas as pd  # type: ignore[import-not-found]
+
+pd = cast(Any, pd)
+np = cast(Any, np)
+
+DX_FIELD_PREFIX = "dx_code"
+
+
+def normalize_codes(values: Any) -> Any:
+    """Normalize codes: strip dots and whitespace, upper-case.
+
+    Args:
+        values: Iterable of raw codes (missing values become "").
+
+    Returns:
+        NumPy unicode array of normalized codes.
+    """
+    series = pd.Series(values, dtype=object)
+    text = series.where(series.notna(), "").astype(str)
+    return text.str.replace(r"[.\s]", "", regex=True).str.upper().to_numpy(dtype=str)
+
+
+class CodeIndex:
+    """Sorted-array index over a code set with exact and prefix matching.
+
+    Attributes:
+        codes: Sorted unique normalized codes.
+        prefix_match: Whether entries also match longer codes they prefix.
+    """
+
+    def __init__(self, codes: Iterable[Any], prefix_match: bool = True):
+        normalized = normalize_codes(list(codes))
+        self.codes = np.unique(normalized[normalized != ""])
+        self.prefix_match = prefix_match
+        self._fingerprint: Optional[str] = None
+        lengths = np.char.str_len(self.codes) if len(self.codes) else np.empty(0, dtype=int)
+        # Entries grouped by length, so each prefix length is one sorted probe
+        self._by_length = {int(n): self.codes[lengths == n] for n in np.unique(lengths)}
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def fingerprint(self) -> str:
+        """Digest of the entries and matching mode (stable across processes)."""
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(f"{self.prefix_match}|{self.codes.dtype}".encode())
+            digest.update(self.codes.tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    @staticmethod
+    def _contains(sorted_codes: Any, values: Any) -> Any:
+        if not len(sorted_codes) or not len(values):
+            return np.zeros(len(values), dtype=bool)
+        positions = np.searchsorted(sorted_codes, values)
+        positions[positions == len(sorted_codes)] = 0
+        return sorted_codes[positions] == values
+
+    def match(self, normalized: Any) -> Any:
+        """Boolean array: which normalized codes are in the set.
+
+        Args:
+            normalized: Normalized codes, typically the distinct codes of a
+                column (see `normalize_codes`).
+        """
+        normalized = np.asarray(normalized, dtype=str)
+        if not self.prefix_match:
+            return self._contains(self.codes, normalized)
+        hits = np.zeros(len(normalized), dtype=bool)
+        lengths = np.char.str_len(normalized) if len(normalized) else np.empty(0, dtype=int)
+        for length, entries in self._by_length.items():
+            candidates = np.flatnonzero(~hits & (lengths >= length))
+            if len(candidates):
+                prefixes = normalized[candidates].astype(f"<U{length}")
+                hits[candidates] = self._contains(entries, prefixes)
+        return hits
+
+
+@lru_cache(maxsize=8)
+def _code_index_cached(codes: FrozenSet[str], prefix_match: bool) -> CodeIndex:
+    return CodeIndex(codes, prefix_match)
+
+
+def get_code_index(codes: Iterable[Any], prefix_match: bool = True) -> CodeIndex:
+    """Return a shared CodeIndex for a code set (built once per distinct set)."""
+    if isinstance(codes, CodeIndex):
+        return codes
+    return _code_index_cached(frozenset(str(code) for code in codes), prefix_match)
+
+
+@dataclass
+class DiagnosisCoverage:
+    """MSK/BAR membership of the diagnosis codes in a frame.
+
+    Attributes:
+        total_codes: Non-null diagnosis values across all dx columns.
+        msk_count: Values found in the MSK set.
+        bar_count: Values found in the BAR set.
+        code_counts: Per normalized code: rows, msk and bar flags (sorted by
+            rows, descending, then by code).
+        claim_flags: Per row, or per claim when a claim key is given:
+            has_msk and has_bar.
+    """
+
+    total_codes: int
+    msk_count: int
+    bar_count: int
+    code_counts: Any
+    claim_flags: Any
+
+    def flag_counts(self) -> Tuple[int, int, int]:
+        """(rows or claims, those with an MSK code, those with a BAR code)."""
+        flags = self.claim_flags
+        return int(len(flags)), int(flags["has_msk"].sum()), int(flags["has_bar"].sum())
+
+
+def _combine_code_counts(frames: Sequence[Any]) -> Any:
+    """Sum per-code rows (OR the flags) over frames of `code_counts` rows."""
+    return (
+        pd.concat(frames, ignore_index=True)
+        .groupby("code", sort=False, as_index=False)
+        .agg(rows=("rows", "sum"), msk=("msk", "any"), bar=("bar", "any"))
+    )
+
+
+def _sort_code_counts(code_counts: Any) -> Any:
+    return code_counts.sort_values(["rows", "code"], ascending=[False, True], kind="stable").reset_index(drop=True)
+
+
+class CoverageAccumulator:
+    """`DiagnosisCoverage` of row chunks, merged into the whole-frame totals.
+
+    Per-code row counts are summed and per-claim flags OR-ed by claim key
+    value, so a claim split across chunks counts once. Without a claim key
+    only the per-row flag totals are kept. Added chunks are combined lazily,
+    once they outgrow the combined state, so each row is regrouped a bounded
+    number of times.
+
+    Attributes:
+        claim_key: Claim key columns (empty for per-row flags).
+    """
+
+    def __init__(self, claim_key: Sequence[str] = ()):
+        self.claim_key = list(claim_key)
+        self.total_codes = 0
+        self.msk_count = 0
+        self.bar_count = 0
+        self._rows = [0, 0, 0]
+        self._codes: List[Any] = []
+        self._claims: List[Any] = []
+        self._pending = 0
+        self._combined = 0
+
+    def add(self, coverage: DiagnosisCoverage) -> "CoverageAccumulator":
+        """Fold in one chunk's coverage."""
+        self.total_codes += coverage.total_codes
+        self.msk_count += coverage.msk_count
+        self.bar_count += coverage.bar_count
+        self._codes.append(coverage.code_counts)
+        if self.claim_key:
+            self._claims.append(coverage.claim_flags)
+        else:
+            self._rows = [a + b for a, b in zip(self._rows, coverage.flag_counts())]
+        self._pending += len(coverage.code_counts) + (len(coverage.claim_flags) if self.claim_key else 0)
+        if self._pending > max(self._combined, 4096):
+            self._compact()
+        return self
+
+    def merge(self, other: "CoverageAccumulator") -> "CoverageAccumulator":
+        """Fold in another accumulator over the same claim key."""
+        self.total_codes += other.total_codes
+        self.msk_count += other.msk_count
+        self.bar_count += other.bar_count
+        self._rows = [a + b for a, b in zip(self._rows, other._rows)]
+        self._codes.extend(other._codes)
+        self._claims.extend(other._claims)
+        self._compact()
+        return self
+
+    def _compact(self) -> None:
+        if len(self._codes) > 1:
+            self._codes = [_combine_code_counts(self._codes)]
+        if len(self._claims) > 1:
+            self._claims = [
+                pd.concat(self._claims, ignore_index=True)
+                .groupby(self.claim_key, sort=False, dropna=True, as_index=False)
+                .agg(has_msk=("has_msk", "any"), has_bar=("has_bar", "any"))
+            ]
+        self._combined = sum(len(frame) for frame in self._codes + self._claims)
+        self._pending = 0
+
+    def code_counts(self) -> Any:
+        """Per-code rows and flags over all chunks, ordered like `DiagnosisCoverage.code_counts`."""
+        self._compact()
+        if not self._codes:
+            return pd.DataFrame({"code": [], "rows": [], "msk": [], "bar": []})
+        return _sort_code_counts(self._codes[0])
+
+    def flag_counts(self) -> Tuple[int, int, int]:
+        """(rows or claims, those with an MSK code, those with a BAR code)."""
+        if not self.claim_key:
+            return cast(Tuple[int, int, int], tuple(self._rows))
+        self._compact()
+        if not self._claims:
+            return 0, 0, 0
+        flags = self._claims[0]
+        return int(len(flags)), int(flags["has_msk"].sum()), int(flags["has_bar"].sum())
+
+
+def dx_fields_in(columns: Iterable[str]) -> List[str]:
+    """Diagnosis columns (``dx_code*``) among `columns`."""
+    return [col for col in columns if str(col).lower().startswith(DX_FIELD_PREFIX)]
+
+
+def diagnosis_code_coverage(
+    df: Any,
+    msk_codes: Iterable[Any],
+    bar_codes: Iterable[Any],
+    dx_fields: Optional[List[str]] = None,
+    claim_key: Optional[Any] = None,
+    context: Optional[Any] = None
+) -> DiagnosisCoverage:
+    """Match every diagnosis column against the MSK and BAR code sets.
+
+    Each column is factorized (through the frame's shared validation
+    context), the distinct codes of all columns are normalized and probed
+    once, and hits are broadcast back to rows through the factor codes.
+
+    Args:
+        df: Claims DataFrame
+        msk_codes: MSK codes (or a CodeIndex)
+        bar_codes: BAR codes (or a CodeIndex)
+        dx_fields: Diagnosis columns (default: all ``dx_code*`` columns)
+        claim_key: Optional claim key column (or list of columns) for
+            per-claim flags
+        context: ValidationContext for `df` (default: the frame's shared one)
+
+    Returns:
+        DiagnosisCoverage with totals, per-code counts and coverage flags
+    """
+    if context is None:
+        from validation.validation_engine import get_validation_context
+        context = get_validation_context(df)
+    fields = [f for f in (dx_fields if dx_fields is not None else dx_fields_in(df.columns)) if f in df.columns]
+    msk_index = get_code_index(msk_codes)
+    bar_index = get_code_index(bar_codes)
+
+    factorized = [context.factorized(field) for field in fields]
+    distinct = pd.Index(
+        np.concatenate([np.asarray(uniques, dtype=object) for _, uniques in factorized]) if factorized else np.empty(0, dtype=object)
+    ).unique()
+    normalized = normalize_codes(distinct)
+    msk_hit = msk_index.match(normalized) & (normalized != "")
+    bar_hit = bar_index.match(normalized) & (normalized != "")
+    rows_per_distinct = np.zeros(len(distinct), dtype=np.int64)
+
+    row_msk = np.zeros(len(df), dtype=bool)
+    row_bar = np.zeros(len(df), dtype=bool)
+    for codes, uniques in factorized:
+        position = distinct.get_indexer(uniques)
+        rows_per_distinct[position] += np.bincount(codes[codes >= 0], minlength=len(uniques))
+        # Trailing False for missing values (code -1)
+        row_msk |= np.append(msk_hit[position], False)[codes]
+        row_bar |= np.append(bar_hit[position], False)[codes]
+
+    code_counts = _sort_code_counts(_combine_code_counts([
+        pd.DataFrame({"code": normalized, "rows": rows_per_distinct, "msk": msk_hit, "bar": bar_hit})
+    ]))
+
+    key = [claim_key] if isinstance(claim_key, str) else list(claim_key or [])
+    if key and all(col in df.columns for col in key):
+        groups = context.claim_groups(tuple(key))
+        claim_codes = groups.codes
+        valid = claim_codes >= 0
+        claim_flags = pd.DataFrame({key[0]: groups.uniques}) if len(key) == 1 else groups.uniques.to_frame(index=False)
+        claim_flags["has_msk"] = np.bincount(claim_codes[valid], weights=row_msk[valid], minlength=groups.count) > 0
+        claim_flags["has_bar"] = np.bincount(claim_codes[valid], weights=row_bar[valid], minlength=groups.count) > 0
+    else:
+        claim_flags = pd.DataFrame({"has_msk": row_msk, "has_bar": row_bar}, index=df.index)
+
+    return DiagnosisCoverage(
+        total_codes=int(rows_per_distinct.sum()),
+        msk_count=int((rows_per_distinct * msk_hit).sum()),
+        bar_count=int((rows_per_distinct * bar_hit).sum()),
+        code_counts=code_counts,
+        claim_flags=claim_flags,
+    )
+
+
+# --- Versioned code sets ---
+
+CODE_SYSTEM_ICD10CM = "icd10cm"
+CODE_SYSTEM_CPT = "cpt"
+CODE_SYSTEM_HCPCS = "hcpcs"
+CODE_SYSTEM_REVENUE = "revenue"
+CODE_SYSTEMS = (CODE_SYSTEM_ICD10CM, CODE_SYSTEM_CPT, CODE_SYSTEM_HCPCS, CODE_SYSTEM_REVENUE)
+
+# Numeric codes left-padded to a fixed width (revenue code "450" is "0450")
+_ZERO_PAD_WIDTH = {CODE_SYSTEM_REVENUE: 4}
+
+# Code table files: <system>_<YYYY-MM-DD>.<ext>, one code per row ("code" column or the first)
+CODE_TABLE_PATTERN = re.compile(r"^(?P<system>[a-z0-9]+)_(?P<effective>\d{4}-\d{2}-\d{2})\.(?P<ext>csv|txt|parquet)$", re.IGNORECASE)
+DEFAULT_CODE_SET_DIR = Path(__file__).resolve().parents[2] / "data" / "code_sets"
+
+
+def normalize_system_codes(values: Any, system: str) -> Any:
+    """`normalize_codes` plus the system's zero padding."""
+    normalized = normalize_codes(values)
+    width = _ZERO_PAD_WIDTH.get(system)
+    if width and len(normalized):
+        numeric = np.char.isdigit(normalized)
+        normalized = np.where(numeric, np.char.zfill(normalized, width), normalized)
+    return normalized
+
+
+class VersionedCodeSet:
+    """The valid codes of one code system, per effective date.
+
+    Attributes:
+        system: Code system (one of `CODE_SYSTEMS`).
+        effective_dates: Sorted ``datetime64[D]`` start date of each version.
+        indexes: Exact-match `CodeIndex` per version, aligned with
+            `effective_dates`.
+    """
+
+    def __init__(self, system: str, versions: Dict[str, Iterable[Any]]):
+        self.system = system
+        ordered = sorted(versions.items(), key=lambda item: np.datetime64(item[0], "D"))
+        self.effective_dates = np.array([np.datetime64(date, "D") for date, _ in ordered], dtype="datetime64[D]")
+        self.indexes = [
+            CodeIndex(normalize_system_codes(list(codes), system), prefix_match=False) for _, codes in ordered
+        ]
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(system.encode())
+        for date, index in zip(self.effective_dates, self.indexes):
+            digest.update(f"|{date}={index.fingerprint}".encode())
+        self.fingerprint = digest.hexdigest()
+
+    def __len__(self) -> int:
+        return len(self.indexes)
+
+    def version_at(self, dates: Any) -> Any:
+        """Position of the version in force on each date.
+
+        Missing dates use the latest version; dates before the first version
+        use the first.
+        """
+        days = np.asarray(dates, dtype="datetime64[ns]").astype("datetime64[D]")
+        positions = np.searchsorted(self.effective_dates, days, side="right") - 1
+        positions[np.isnat(days)] = len(self.indexes) - 1
+        return np.clip(positions, 0, len(self.indexes) - 1)
+
+    def valid_matrix(self, codes: Any) -> Any:
+        """Boolean (versions x codes) validity of raw codes (typically distinct values)."""
+        normalized = normalize_system_codes(codes, self.system)
+        return np.vstack([index.match(normalized) for index in self.indexes]) if self.indexes \
+            else np.zeros((0, len(normalized)), dtype=bool)
+
+
+def code_systems_for(column: str) -> Tuple[str, ...]:
+    """Code systems a claim column holds, from its name (empty if none)."""
+    name = str(column).lower()
+    if name.startswith(DX_FIELD_PREFIX):
+        return (CODE_SYSTEM_ICD10CM,)
+    if any(key in name for key in ("cpt", "hcpcs", "proc_code", "procedure_code")):
+        return (CODE_SYSTEM_CPT, CODE_SYSTEM_HCPCS)
+    if "revenue" in name or "rev_code" in name or "revcode" in name:
+        return (CODE_SYSTEM_REVENUE,)
+    return ()
+
+
+def _read_code_table(path: Path) -> List[str]:
+    suffix = path.suffix.lower()
+    if suffix == ".parquet":
+        table = pd.read_parquet(path)
+    elif suffix == ".txt":
+        from data.file_handler import detect_delimiter
+        with open(path, "rb") as handle:
+            delimiter = detect_delimiter(handle)
+        table = pd.read_csv(path, dtype=str, sep=delimiter)
+    else:
+        table = pd.read_csv(path, dtype=str)
+    column = "code" if "code" in table.columns else table.columns[0]
+    return table[column].dropna().astype(str).tolist()
+
+
+def load_code_set_tables(directory: Any) -> Dict[str, VersionedCodeSet]:
+    """Load every code table under `directory` (see `CODE_TABLE_PATTERN`).
+
+    Args:
+        directory: Folder of ``<system>_<YYYY-MM-DD>`` code tables
+
+    Returns:
+        VersionedCodeSet per code system found
+    """
+    versions: Dict[str, Dict[str, List[str]]] = {}
+    for path in sorted(Path(directory).iterdir()):
+        match = CODE_TABLE_PATTERN.match(path.name)
+        if match and path.is_file():
+            system = match.group("system").lower()
+            versions.setdefault(system, {}).setdefault(match.group("effective"), []).extend(_read_code_table(path))
+    return {system: VersionedCodeSet(system, tables) for system, tables in versions.items()}
+
+
+def get_code_set_catalog(directory: Optional[Any] = None) -> Dict[str, VersionedCodeSet]:
+    """Return the shared code-set catalog for `directory`, loading it once.
+
+    Catalogs are kept in the process-wide artifact registry, keyed by the
+    names, sizes and modification times of the table files, so every session
+    shares one copy and edited tables are picked up on the next call.
+
+    Args:
+        directory: Code table folder (default: `CODE_SET_DIR`, else
+            ``data/code_sets``)
+
+    Returns:
+        VersionedCodeSet per code system ({} when the folder does not exist)
+    """
+    if directory is None:
+        from core.config_loader import CODE_SET_DIR
+        directory = CODE_SET_DIR or DEFAULT_CODE_SET_DIR
+    folder = Path(directory)
+    if not folder.is_dir():
+        return {}
+    stamp = hashlib.sha256(str(folder.resolve()).encode())
+    for path in sorted(folder.iterdir()):
+        if CODE_TABLE_PATTERN.match(path.name):
+            stat = path.stat()
+            stamp.update(f"|{path.name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    from utils.cache_manager import get_shared_registry
+    return get_shared_registry().get_or_load("code_sets", stamp.hexdigest(), lambda: load_code_set_tables(folder))
+
+
+def invalid_code_mask(
+    df: Any,
+    column: str,
+    code_sets: Sequence[VersionedCodeSet],
+    date_field: Optional[str] = None,
+    context: Optional[Any] = None
+) -> Any:
+    """Rows whose code is in none of `code_sets` as of the row's service date.
+
+    The column is factorized once; each code set is probed with the distinct
+    codes only and rows pick their version's verdict by fancy indexing.
+    Blank codes are not flagged.
+
+    Args:
+        df: Claims DataFrame
+        column: Code column
+        code_sets: Accepted code systems (a code valid in any one passes)
+        date_field: Service date column selecting the version (latest
+            version for every row when None or absent)
+        context: ValidationContext for `df` (default: the frame's shared one)
+
+    Returns:
+        Boolean NumPy array, True where the code is invalid
+    """
+    if context is None:
+        from validation.validation_engine import get_validation_context
+        context = get_validation_context(df)
+    codes, uniques = context.factorized(column)
+    blank = np.append(normalize_codes(uniques) == "", True)
+    dates = context.dates(date_field).to_numpy() if date_field and date_field in df.columns else None
+
+    valid = np.zeros(len(df), dtype=bool)
+    for code_set in code_sets:
+        if not len(code_set):
+            continue
+        # Trailing column for missing values (code -1)
+        matrix = np.hstack([code_set.valid_matrix(uniques), np.zeros((len(code_set), 1), dtype=bool)])
+        if dates is None:
+            valid |= matrix[-1][codes]
+        else:
+            valid |= matrix[code_set.version_at(dates), codes]
+    return ~valid & ~blank[codes]
@@ -0,0 +1,182 @@
+# pyright: reportUnknownMemberType=false, reportMissingTypeStubs=false, reportUnknownVariableType=false, reportUnknownArgumentType=false
+"""Vectorized cross-field relationship checks.
+
+Relationships are evaluated on whole columns. Each column is coerced once per
+call for the value type a rule asks for (dates, money, integers), however many
+rules read it, and every rule's failing rows come back as a `FailureBitmap`
+with a few sample row labels.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, cast
+
+import numpy as np  # type: ignore[import-not-found]
+import pandas as pd  # type: ignore[import-not-found]
+
+from validation.failure_bitmap import FailureBitmap
+
+pd = cast(Any, pd)
+np = cast(Any, np)
+
+CROSS_FIELD_RELATIONSHIPS = ("equals", "greater_than", "less_than", "sum_equals", "conditional")
+
+# Value types a column can be coerced to before comparing (None keeps raw values)
+VALUE_TYPES = ("date", "money", "integer", "number")
+
+DEFAULT_SAMPLE_SIZE = 10
+
+
+@dataclass(frozen=True)
+class CrossFieldRule:
+    """One relationship between two columns.
+
+    Attributes:
+        field1: First field name.
+        field2: Second field name.
+        relationship: One of `CROSS_FIELD_RELATIONSHIPS`.
+        expected_value: Expected sum for "sum_equals".
+        value_type: One of `VALUE_TYPES`, or None to compare raw values.
+        name: Optional display name.
+    """
+
+    field1: str
+    field2: str
+    relationship: str
+    expected_value: Any = None
+    value_type: Optional[str] = None
+    name: Optional[str] = None
+
+
+def _to_money_cents(series: Any) -> Any:
+    """Parse "$1,234.50" / "(12.00)" style values to float cents (NaN if invalid)."""
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)  # type: ignore[no-untyped-call]
+    text = pd.Series(uniques, dtype=object).astype(str).str.strip()
+    negative = text.str.startswith("(") & text.str.endswith(")")
+    cleaned = text.str.replace(r"[$,()\s]", "", regex=True)
+    amounts = pd.to_numeric(cleaned, errors="coerce").to_numpy(dtype=float)
+    amounts = np.where(negative.to_numpy(), -amounts, amounts)
+    lookup = np.append(np.round(amounts * 100), np.nan)
+    return pd.Series(lookup[codes], index=series.index)
+
+
+def _to_integer(series: Any) -> Any:
+    """Whole numbers as float64 (NaN for missing or non-integral values)."""
+    values = pd.to_numeric(series, errors="coerce").astype(float)  # type: ignore[no-untyped-call]
+    return values.where(values == np.floor(values))
+
+
+class _CoercedColumns:
+    """Per-call cache of columns coerced to a value type."""
+
+    def __init__(self, df: Any):
+        self.df = df
+        self._cache: Dict[Tuple[str, Optional[str]], Any] = {}
+
+    def get(self, column: str, value_type: Optional[str]) -> Any:
+        key = (column, value_type)
+        if key not in self._cache:
+            self._cache[key] = self._coerce(column, value_type)
+        return self._cache[key]
+
+    def _coerce(self, column: str, value_type: Optional[str]) -> Any:
+        series = self.df[column]
+        if value_type is None:
+            return series
+        if value_type == "date":
+            from validation.validation_engine import get_validation_context
+            return get_validation_context(self.df).dates(column)
+        if value_type == "money":
+            return _to_money_cents(series)
+        if value_type == "integer":
+            return _to_integer(series)
+        if value_type == "number":
+            return pd.to_numeric(series, errors="coerce").astype(float)  # type: ignore[no-untyped-call]
+        raise ValueError(f"Unknown value type: {value_type}. Supported: {', '.join(VALUE_TYPES)}")
+
+
+def _expected(rule: CrossFieldRule) -> Any:
+    """The rule's expected sum in the same units as the coerced columns."""
+    if rule.value_type == "money":
+        return _to_money_cents(pd.Series([rule.expected_value], dtype=object)).iloc[0]
+    if rule.value_type in ("integer", "number"):
+        return float(rule.expected_value)
+    return rule.expected_value
+
+
+def _valid_mask(rule: CrossFieldRule, first: Any, second: Any) -> Any:
+    """Boolean array of rows satisfying the relationship."""
+    both = (first.notna() & second.notna()).to_numpy()
+    if rule.relationship == "equals":
+        return (first == second).to_numpy(dtype=bool, na_value=False) & both
+    if rule.relationship == "greater_than":
+        return both & (first > second).to_numpy(dtype=bool, na_value=False)
+    if rule.relationship == "less_than":
+        return both & (first < second).to_numpy(dtype=bool, na_value=False)
+    if rule.relationship == "sum_equals":
+        if rule.expected_value is None:
+            return np.zeros(len(first), dtype=bool)
+        return both & ((first + second) == _expected(rule)).to_numpy(dtype=bool, na_value=False)
+    if rule.relationship == "conditional":
+        # If field1 has value, field2 must also have value
+        return (first.isna() | second.notna()).to_numpy()
+    raise ValueError(f"Unknown relationship: {rule.relationship}. Supported: {', '.join(CROSS_FIELD_RELATIONSHIPS)}")
+
+
+def _evaluate(df: Any, rule: CrossFieldRule, columns: _CoercedColumns, sample_size: int) -> Dict[str, Any]:
+    label = rule.name or f"{rule.field1} {rule.relationship} {rule.field2}"
+    total_count = len(df)
+    if rule.field1 not in df.columns or rule.field2 not in df.columns:
+        return {
+            "rule": label,
+            "status": "Fail",
+            "message": f"Fields {rule.field1} or {rule.field2} not found",
+            "fail_count": 0,
+            "fail_pct": 0.0
+        }
+    try:
+        valid = _valid_mask(rule, columns.get(rule.field1, rule.value_type), columns.get(rule.field2, rule.value_type))
+    except Exception as e:
+        return {
+            "rule": label,
+            "status": "Fail",
+            "message": f"Error evaluating cross-field rule '{label}': {str(e)}",
+            "fail_count": 0,
+            "fail_pct": 0.0,
+            "total_count": total_count
+        }
+
+    failures = FailureBitmap.from_mask(~valid)
+    fail_count = failures.count
+    fail_pct = (fail_count / total_count * 100) if total_count > 0 else 0
+    status = "Pass" if fail_count == 0 else ("Warning" if fail_pct < 5 else "Fail")
+    return {
+        "rule": label,
+        "status": status,
+        "message": f"Cross-field validation: {rule.field1} {rule.relationship} {rule.field2}",
+        "fail_count": fail_count,
+        "fail_pct": round(fail_pct, 2),
+        "total_count": total_count,
+        "valid_count": total_count - fail_count,
+        "failures": df.index[failures.positions(0, sample_size)].tolist(),
+        "failure_bitmap": failures
+    }
+
+
+def validate_cross_field_rules(
+    df: Any,
+    rules: List[CrossFieldRule],
+    sample_size: int = DEFAULT_SAMPLE_SIZE
+) -> List[Dict[str, Any]]:
+    """Evaluate many cross-field relationships in one pass over the columns.
+
+    Args:
+        df: DataFrame
+        rules: Relationships to check
+        sample_size: Number of failing row labels to include per rule
+
+    Returns:
+        One result dict per rule (status, message, fail_count, fail_pct,
+        total_count, valid_count, sample `failures` row labels and the full
+        `failure_bitmap`), in `rules` order
+    """
+    columns = _CoercedColumns(df)
+    return [_evaluate(df, rule, columns, sample_size) for rule in rules]
@@ -0,0 +1,175 @@
+# pyright: reportUnknownMemberType=false, reportMissingTypeStubs=false, reportUnknownVariableType=false, reportUnknownArgumentType=false
+"""Compact row-position bitmaps for validation failures.
+
+A rule's failing rows are kept as one bit per row (NumPy packed bits) rather
+than as a copy of the failing records. Bitmaps combine with ``&``, ``|``,
+``-`` and ``~`` and only turn into rows when a page of them is requested.
+"""
+from typing import Any, Iterable, Iterator, Optional, cast
+
+import numpy as np  # type: ignore[import-not-found]
+
+np = cast(Any, np)
+
+# Set bits per byte value
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+class FailureBitmap:
+    """Set of failing row positions (0..size-1) stored as packed bits.
+
+    Attributes:
+        size: Number of rows the bitmap describes.
+    """
+
+    __slots__ = ("_bits", "size", "_count")
+
+    def __init__(self, bits: Any, size: int, count: Optional[int] = None):
+        self._bits = bits
+        self.size = int(size)
+        self._count = count
+
+    @classmethod
+    def from_mask(cls, mask: Any) -> "FailureBitmap":
+        """Build from a boolean mask (array or Series; NA counts as passing)."""
+        if hasattr(mask, "to_numpy"):
+            mask = mask.to_numpy(dtype=bool, na_value=False)
+        mask = np.asarray(mask, dtype=bool)
+        return cls(np.packbits(mask, bitorder="little"), len(mask), int(mask.sum()))
+
+    @classmethod
+    def from_positions(cls, positions: Iterable[int], size: int) -> "FailureBitmap":
+        """Build from failing row positions."""
+        mask = np.zeros(size, dtype=bool)
+        mask[np.fromiter(positions, dtype=np.int64)] = True
+        return cls.from_mask(mask)
+
+    @classmethod
+    def empty(cls, size: int) -> "FailureBitmap":
+        """Bitmap with no failing rows."""
+        return cls(np.zeros((size + 7) // 8, dtype=np.uint8), size, 0)
+
+    @classmethod
+    def union(cls, bitmaps: Iterable["FailureBitmap"], size: int) -> "FailureBitmap":
+        """Rows failing any of `bitmaps`."""
+        result = cls.empty(size)
+        for bitmap in bitmaps:
+            result = result | bitmap
+        return result
+
+    @classmethod
+    def intersection(cls, bitmaps: Iterable["FailureBitmap"], size: int) -> "FailureBitmap":
+        """Rows failing all of `bitmaps`."""
+        result = ~cls.empty(size)
+        for bitmap in bitmaps:
+            result = result & bitmap
+        return result
+
+    @property
+    def count(self) -> int:
+        """Number of failing rows."""
+        if self._count is None:
+            self._count = int(_POPCOUNT[self._bits].sum(dtype=np.int64))
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the bits."""
+        return int(self._bits.nbytes)
+
+    def _check(self, other: "FailureBitmap") -> None:
+        if self.size != other.size:
+            raise ValueError(f"Bitmap sizes differ: {self.size} != {other.size}")
+
+    def __and__(self, other: "FailureBitmap") -> "FailureBitmap":
+        self._check(other)
+        return FailureBitmap(self._bits & other._bits, self.size)
+
+    def __or__(self, other: "FailureBitmap") -> "FailureBitmap":
+        self._check(other)
+        return FailureBitmap(self._bits | other._bits, self.size)
+
+    def __sub__(self, other: "FailureBitmap") -> "FailureBitmap":
+        self._check(other)
+        return FailureBitmap(self._bits & ~other._bits, self.size)
+
+    def __invert__(self) -> "FailureBitmap":
+        bits = ~self._bits
+        tail = self.size % 8
+        if tail:
+            # Keep padding bits of the last byte clear
+            bits[-1] &= (1 << tail) - 1
+        return FailureBitmap(bits, self.size, None if self._count is None else self.size - self._count)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, FailureBitmap) and self.size == other.size and bool(np.array_equal(self._bits, other._bits))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __bool__(self) -> bool:
+        return self.count > 0
+
+    def __repr__(self) -> str:
+        return f"FailureBitmap(count={self.count}, size={self.size})"
+
+    def __getstate__(self) -> Any:
+        return (self._bits, self.size, self._count)
+
+    def __setstate__(self, state: Any) -> None:
+        self._bits, self.size, self._count = state
+
+    def to_bytes(self) -> bytes:
+        """Packed bits as bytes (see `from_bytes`)."""
+        return self._bits.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes, size: int, count: Optional[int] = None) -> "FailureBitmap":
+        """Rebuild from `to_bytes` output and the row count it describes."""
+        return cls(np.frombuffer(data, dtype=np.uint8).copy(), size, count)
+
+    def to_mask(self) -> Any:
+        """Boolean NumPy mask of length `size`."""
+        return np.unpackbits(self._bits, count=self.size, bitorder="little").astype(bool)
+
+    def positions(self, offset: int = 0, limit: Optional[int] = None) -> Any:
+        """Failing row positions, optionally one page of them.
+
+        Only the bytes that hold the requested page are unpacked.
+
+        Args:
+            offset: Number of failing rows to skip.
+            limit: Maximum number of positions to return (all when None).
+
+        Returns:
+            Sorted int64 array of row positions.
+        """
+        if limit is None:
+            limit = self.count
+        if offset >= self.count or limit <= 0:
+            return np.empty(0, dtype=np.int64)
+        cumulative = np.cumsum(_POPCOUNT[self._bits], dtype=np.int64)
+        first = int(np.searchsorted(cumulative, offset, side="right"))
+        last = int(np.searchsorted(cumulative, offset + limit, side="left")) + 1
+        skipped = int(cumulative[first - 1]) if first else 0
+        bits = np.unpackbits(self._bits[first:last], bitorder="little")
+        found = np.flatnonzero(bits) + first * 8
+        found = found[found < self.size]
+        return found[offset - skipped:offset - skipped + limit]
+
+    def iter_positions(self, chunk_size: int = 100_000) -> Iterator[Any]:
+        """Yield failing row positions in ascending blocks of at most `chunk_size`.
+
+        The bitmap is unpacked one window at a time, so memory stays bounded
+        by `chunk_size` however many rows fail.
+        """
+        window = max(1, chunk_size // 8)
+        for start in range(0, len(self._bits), window):
+            found = np.flatnonzero(np.unpackbits(self._bits[start:start + window], bitorder="little"))
+            found = found[found < self.size - start * 8]
+            if len(found):
+                yield found + start * 8
+
+    def rows(self, df: Any, offset: int = 0, limit: Optional[int] = None) -> Any:
+        """Materialize failing rows of `df` (one page when `limit` is set)."""
+        return df.iloc[self.positions(offset, limit)]
@@ -0,0 +1,229 @@
+# pyright: reportUnknownMemberType=false, reportMissingTypeStubs=false, reportUnknownVariableType=false, reportUnknownArgumentType=false
+"""Streaming export of the rows failing selected validation checks.
+
+Failing rows are read from each check's `FailureBitmap` one block of
+positions at a time and written through a `data.output_sinks` sink, so the
+export runs in memory bounded by the chunk size whatever the number of
+failures. Each exported row carries the check, field, failure reason and its
+line number in the original file (derived from the row's index; see
+`export_failing_rows`).
+"""
+import os
+import shutil
+import tempfile
+import time
+import weakref
+import zipfile
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, cast
+
+import pandas as pd  # type: ignore[import-not-found]
+
+from data.output_sinks import SINK_FORMATS, create_sink
+from validation.failure_bitmap import FailureBitmap
+
+pd = cast(Any, pd)
+
+DEFAULT_EXPORT_CHUNK_ROWS = 100_000
+
+# Columns added in front of the exported records
+EXPORT_COLUMNS = ("Failed_Check", "Failed_Field", "Failure_Reason", "Line_Number")
+
+# Per-row failure reason for each field-level check
+FAILURE_REASONS: Dict[str, str] = {
+    "Required Field Check": "Required value is missing",
+    "Optional Field Check": "Value is missing",
+    "Date Validity Check": "Invalid or unparseable date",
+    "Age ≥ 18 Check": "Member is under 18",
+    "Fill Rate Check": "Value is missing (field fill rate below threshold)",
+    "NPI Validity Check": "Malformed, bad check digit or unregistered NPI",
+    "Code Validity Check": "Code not valid on the service date",
+    "Claim Consistency Check": "Inconsistent across the lines of the claim",
+    "Referential Integrity Check": "Key not found in the reference table",
+}
+
+
+@dataclass
+class FailureSelection:
+    """Failing rows of one check on one field.
+
+    Attributes:
+        rule_name: Check name (e.g. "Date Validity Check").
+        field: Checked field.
+        failures: Failing row positions.
+        reason: Failure reason written on each row (default: from
+            `FAILURE_REASONS`).
+    """
+
+    rule_name: str
+    field: str
+    failures: FailureBitmap
+    reason: str = ""
+
+    def __post_init__(self) -> None:
+        if not self.reason:
+            self.reason = FAILURE_REASONS.get(self.rule_name, self.rule_name)
+
+
+class ExportSpool:
+    """Private temporary directory holding one finished export.
+
+    Exports contain claim rows, so each session keeps at most one file:
+    `new_path` deletes the previous export first. The directory is removed
+    by `cleanup`, when the spool is garbage collected (e.g. with the
+    Streamlit session state that holds it) or at interpreter exit.
+
+    Attributes:
+        directory: The spool directory (created by the first `new_path`).
+        path: Current export file, if any.
+    """
+
+    def __init__(self, prefix: str = "mapper_export_"):
+        self.prefix = prefix
+        self.directory: Optional[str] = None
+        self.path: Optional[str] = None
+        self._finalizer: Optional[Any] = None
+
+    def new_path(self, name: str) -> str:
+        """Delete the current export and return the path for the next one."""
+        self.discard()
+        if self.directory is None:
+            self.directory = tempfile.mkdtemp(prefix=self.prefix)
+            self._finalizer = weakref.finalize(self, shutil.rmtree, self.directory, ignore_errors=True)
+        self.path = os.path.join(self.directory, os.path.basename(name))
+        return self.path
+
+    def discard(self) -> None:
+        """Delete the current export, if any."""
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+
+    def cleanup(self) -> None:
+        """Remove the directory and everything in it."""
+        self.path = None
+        if self._finalizer is not None:
+            self._finalizer()
+        self.directory = None
+        self._finalizer = None
+
+
+def failure_selections(
+    transformed_df: Any,
+    required_fields: List[str],
+    all_mapped_fields: List[str],
+    checks: Iterable[Any],
+    inputs: Optional[Any] = None
+) -> List[FailureSelection]:
+    """Failure bitmaps of (check name, field) pairs, ready for export.
+
+    Bitmaps recorded by `run_validations` are reused (see `failing_rows`).
+
+    Args:
+        transformed_df: Transformed claims data
+        required_fields: Required internal fields
+        all_mapped_fields: All mapped internal fields
+        checks: (check name, field) pairs
+        inputs: `ValidationInputs` passed to `run_validations`
+
+    Returns:
+        One FailureSelection per pair with at least one failing row
+    """
+    from validation.validation_engine import failing_rows
+
+    selections: List[FailureSelection] = []
+    for rule_name, field in checks:
+        fields: Set[str] = {field}
+        bitmap = failing_rows(transformed_df, required_fields, all_mapped_fields, checks=[rule_name], fields=fields, inputs=inputs)
+        if bitmap.count:
+            selections.append(FailureSelection(rule_name, field, bitmap))
+    return selections
+
+
+def _line_numbers(df: Any, positions: Any, first_line: int) -> Any:
+    """Source line numbers of the rows at `positions` (see `export_failing_rows`)."""
+    if pd.api.types.is_integer_dtype(df.index.dtype):
+        return df.index.to_numpy()[positions] + first_line
+    return positions + first_line
+
+
+def export_failing_rows(
+    df: Any,
+    selections: Iterable[FailureSelection],
+    target: Any,
+    fmt: str = "csv",
+    chunk_size: int = DEFAULT_EXPORT_CHUNK_ROWS,
+    first_line: int = 2,
+    archive_name: Optional[str] = None,
+    progress_callback: Optional[Callable[[int], None]] = None
+) -> Dict[str, Any]:
+    """Write the failing rows of each selection to one CSV/Parquet output.
+
+    Rows are written check by check, in row order within a check; a row
+    failing several checks appears once per check.
+
+    Line numbers are derived, not read from the file: ``first_line`` plus the
+    row's integer index label, which the loader assigns in file order and
+    filtering preserves (the row position when the index is not integer).
+    Blank or multi-line records in the source are not accounted for.
+
+    Args:
+        df: Validated DataFrame (the frame the bitmaps describe)
+        selections: Checks to export (see `failure_selections`)
+        target: File path, binary file-like object, or an open
+            `zipfile.ZipFile` to stream a member into
+        fmt: Output format (see `data.output_sinks.SINK_FORMATS`)
+        chunk_size: Maximum rows materialized at once
+        first_line: Line number of the first record in the original file:
+            1 plus skipped rows plus the header line, if any (2 for a file
+            with one header line and no skipped rows)
+        archive_name: Member name when `target` is a ZipFile (default:
+            ``failing_rows`` plus the format's extension)
+        progress_callback: Optional callback(rows_written)
+
+    Returns:
+        Dict with `rows`, `checks`, `seconds` and `rows_per_second`.
+
+    Raises:
+        FileError: If the format is not supported.
+    """
+    start = time.perf_counter()
+    member = None
+    if isinstance(target, zipfile.ZipFile):
+        name = archive_name or f"failing_rows{SINK_FORMATS.get(fmt.lower().replace('-', '_'), '.csv')}"
+        member = target.open(name, "w", force_zip64=True)
+        target = member
+    rows = 0
+    checks = 0
+    try:
+        with create_sink(fmt, target) as sink:
+            for selection in selections:
+                checks += 1
+                for positions in selection.failures.iter_positions(chunk_size):
+                    chunk = df.iloc[positions].reset_index(drop=True)
+                    labels = pd.DataFrame({
+                        EXPORT_COLUMNS[0]: selection.rule_name,
+                        EXPORT_COLUMNS[1]: selection.field,
+                        EXPORT_COLUMNS[2]: selection.reason,
+                        EXPORT_COLUMNS[3]: _line_numbers(df, positions, first_line),
+                    })
+                    sink.write(pd.concat([labels, chunk], axis=1))
+                    rows += len(positions)
+                    if progress_callback:
+                        progress_callback(rows)
+            if not sink.chunks_written:
+                # Header (and Parquet schema) even when nothing failed
+                sink.write(pd.concat([pd.DataFrame(columns=list(EXPORT_COLUMNS)), df.iloc[:0]], axis=1))
+    finally:
+        if member is not None:
+            member.close()
+    seconds = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "checks": checks,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows / seconds, 1) if seconds > 0 else float(rows),
+    }
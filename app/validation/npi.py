@@ -0,0 +1,253 @@
+# pyright: reportUnknownMemberType=false, reportMissingTypeStubs=false, reportUnknownVariableType=false, reportUnknownArgumentType=false
+"""National Provider Identifier (NPI) checks.
+
+An NPI is ten digits whose last digit is a Luhn check digit computed over the
+first nine, prefixed with the card issuer code ``80840``. Checks run once per
+distinct value of a column (through the frame's factorization), never per row.
+
+Registry membership uses an `NPIRegistry`: the NPIs of an NPPES extract held
+as a sorted int64 ``.npy`` file that is memory-mapped, so lookups are binary
+searches over the file and no extract DataFrame is ever loaded.
+"""
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Iterable, Optional, cast
+
+import numpy as np  # type: ignore[import-not-found]
+import pandas as pd  # type: ignore[import-not-found]
+
+pd = cast(Any, pd)
+np = cast(Any, np)
+
+NPI_LENGTH = 10
+
+# Luhn sum contributed by the "80840" prefix
+_PREFIX_SUM = 24
+
+# NPPES dissemination file column holding the NPI
+NPPES_NPI_COLUMN = "NPI"
+
+
+def normalize_npis(values: Any) -> Any:
+    """Strip whitespace and a trailing ``.0`` (NPIs read as floats).
+
+    Args:
+        values: Iterable of raw NPI values (missing values become "").
+
+    Returns:
+        NumPy unicode array.
+    """
+    series = pd.Series(values, dtype=object)
+    text = series.where(series.notna(), "").astype(str).str.strip()
+    return text.str.replace(r"\.0+$", "", regex=True).to_numpy(dtype=str)
+
+
+def npi_format_valid(normalized: Any) -> Any:
+    """Boolean array: exactly ten ASCII digits."""
+    return pd.Series(normalized, dtype=object).str.fullmatch(f"[0-9]{{{NPI_LENGTH}}}").to_numpy(dtype=bool)
+
+
+def npi_check_digit_valid(npis: Any) -> Any:
+    """Boolean array: Luhn check digit (with the 80840 prefix) matches.
+
+    Args:
+        npis: Ten-digit NPI strings (see `npi_format_valid`).
+    """
+    npis = np.asarray(npis, dtype=f"S{NPI_LENGTH}")
+    if not len(npis):
+        return np.zeros(0, dtype=bool)
+    digits = np.frombuffer(npis.tobytes(), dtype=np.uint8).reshape(-1, NPI_LENGTH).astype(np.int64) - ord("0")
+    # Every other digit, starting from the one left of the check digit, is doubled
+    doubled = digits[:, 0:9:2] * 2
+    doubled -= 9 * (doubled > 9)
+    total = _PREFIX_SUM + doubled.sum(axis=1) + digits[:, 1:9:2].sum(axis=1)
+    return (10 - total % 10) % 10 == digits[:, 9]
+
+
+class NPIRegistry:
+    """Sorted int64 NPIs, typically memory-mapped from a ``.npy`` file.
+
+    Attributes:
+        npis: Sorted unique NPIs (``np.memmap`` when loaded from disk).
+        path: Backing file, or None for an in-memory registry.
+    """
+
+    def __init__(self, npis: Any, path: Optional[str] = None):
+        self.npis = npis
+        self.path = path
+        self._fingerprint: Optional[str] = None
+
+    @classmethod
+    def load(cls, path: str) -> "NPIRegistry":
+        """Memory-map a registry written by `build`."""
+        npis = np.load(path, mmap_mode="r")
+        if npis.ndim != 1 or npis.dtype != np.int64:
+            raise ValueError(f"Not an NPI registry file: {path}")
+        return cls(npis, path)
+
+    @classmethod
+    def from_npis(cls, npis: Iterable[Any]) -> "NPIRegistry":
+        """In-memory registry from NPI values (invalid values are dropped)."""
+        return cls(_unique_npis(pd.Series(list(npis), dtype=object)))
+
+    @classmethod
+    def build(
+        cls,
+        source: str,
+        path: str,
+        column: str = NPPES_NPI_COLUMN,
+        chunksize: int = 1_000_000
+    ) -> "NPIRegistry":
+        """Extract the NPIs of an NPPES CSV into a registry file and load it.
+
+        Only `column` is parsed, in chunks. The file is written to a temporary
+        name and renamed into place, so concurrent readers never see a
+        partial registry.
+
+        Args:
+            source: NPPES dissemination (or extract) CSV
+            path: Registry ``.npy`` file to write
+            column: Column holding the NPI
+            chunksize: Rows parsed per chunk
+
+        Returns:
+            The memory-mapped registry
+        """
+        parts = [
+            _unique_npis(chunk[column])
+            for chunk in pd.read_csv(source, usecols=[column], dtype=str, chunksize=chunksize)
+        ]
+        npis = np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, staging = tempfile.mkstemp(suffix=".npy", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                np.save(handle, npis)
+            os.replace(staging, path)
+        except BaseException:
+            if os.path.exists(staging):
+                os.remove(staging)
+            raise
+        return cls.load(path)
+
+    def __len__(self) -> int:
+        return len(self.npis)
+
+    @property
+    def fingerprint(self) -> str:
+        """Identity of the registry contents (file stamp, or a content digest)."""
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            if self.path is not None:
+                stat = os.stat(self.path)
+                digest.update(f"{os.path.abspath(self.path)}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+            else:
+                digest.update(np.ascontiguousarray(self.npis).tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def __getstate__(self) -> Any:
+        # File-backed registries are re-mapped rather than copied into workers
+        return (None if self.path is not None else self.npis, self.path, self._fingerprint)
+
+    def __setstate__(self, state: Any) -> None:
+        npis, self.path, self._fingerprint = state
+        self.npis = np.load(self.path, mmap_mode="r") if self.path is not None else npis
+
+    def contains(self, npis: Any) -> Any:
+        """Boolean array: which int64 NPIs are in the registry."""
+        npis = np.asarray(npis, dtype=np.int64)
+        if not len(self.npis) or not len(npis):
+            return np.zeros(len(npis), dtype=bool)
+        positions = np.searchsorted(self.npis, npis)
+        positions[positions == len(self.npis)] = 0
+        return np.asarray(self.npis[positions]) == npis
+
+
+def _unique_npis(values: Any) -> Any:
+    """Sorted unique int64 NPIs among well-formed values."""
+    normalized = normalize_npis(pd.unique(values))
+    valid = normalized[npi_format_valid(normalized)]
+    return np.unique(valid.astype(np.int64))
+
+
+@lru_cache(maxsize=4)
+def _registry_cached(path: str, size: int, mtime_ns: int) -> NPIRegistry:
+    return NPIRegistry.load(path)
+
+
+def get_npi_registry(path: str) -> NPIRegistry:
+    """Return a shared memory-mapped registry for `path` (reloaded if the file changes)."""
+    stat = os.stat(path)
+    return _registry_cached(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+@dataclass
+class NPICheck:
+    """Per-row outcome of NPI checks on one column.
+
+    Attributes:
+        blank: Missing or empty values (not checked).
+        malformed: Not exactly ten digits.
+        bad_check_digit: Ten digits with a wrong Luhn check digit.
+        unregistered: Well-formed NPIs absent from the registry (all False
+            without one).
+    """
+
+    blank: Any
+    malformed: Any
+    bad_check_digit: Any
+    unregistered: Any
+
+    @property
+    def invalid(self) -> Any:
+        """Rows failing any check."""
+        return self.malformed | self.bad_check_digit | self.unregistered
+
+
+def check_npis(
+    df: Any,
+    column: str,
+    registry: Optional[NPIRegistry] = None,
+    context: Optional[Any] = None
+) -> NPICheck:
+    """Check format, check digit and (optionally) registry membership of an NPI column.
+
+    Args:
+        df: DataFrame
+        column: NPI column
+        registry: Optional NPPES registry for membership checks
+        context: ValidationContext for `df` (default: the frame's shared one)
+
+    Returns:
+        NPICheck with boolean row masks
+    """
+    if context is None:
+        from validation.validation_engine import get_validation_context
+        context = get_validation_context(df)
+    codes, uniques = context.factorized(column)
+    normalized = normalize_npis(uniques)
+
+    blank = normalized == ""
+    well_formed = npi_format_valid(normalized)
+    check_ok = np.zeros(len(normalized), dtype=bool)
+    check_ok[well_formed] = npi_check_digit_valid(normalized[well_formed])
+    registered = np.ones(len(normalized), dtype=bool)
+    if registry is not None:
+        candidates = np.flatnonzero(check_ok)
+        registered[candidates] = registry.contains(normalized[candidates].astype(np.int64))
+
+    def per_row(per_unique: Any, missing: bool) -> Any:
+        # Trailing entry for missing values (code -1)
+        return np.append(per_unique, missing)[codes]
+
+    return NPICheck(
+        blank=per_row(blank, True),
+        malformed=per_row(~blank & ~well_formed, False),
+        bad_check_digit=per_row(well_formed & ~check_ok, False),
+        unregistered=per_row(check_ok & ~registered, False),
+    )
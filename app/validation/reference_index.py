@@ -0,0 +1,347 @@
+# pyright: reportUnknownMemberType=false, reportMissingTypeStubs=false, reportUnknownVariableType=false, reportUnknownArgumentType=false
+"""Reference-key indexes for referential-integrity checks.
+
+Keys of a reference table (eligibility roster, provider file, plan list) are
+normalized and hashed to 64 bits. A `ReferenceIndex` keeps:
+
+* a Bloom filter in memory (about 10 bits per key at the default 1% false
+  positive rate), which rejects almost every unknown key without touching
+  the key array; and
+* the sorted key hashes, memory-mapped from disk, which confirm Bloom hits
+  with `searchsorted`.
+
+Indexes are written once per reference file version and reused across runs
+and sessions. Lookups run on the distinct values of a claims column only.
+With 64-bit hashes a false match needs a hash collision, which is
+negligible (about 1e-5 for 30 million keys).
+"""
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, cast
+
+import numpy as np  # type: ignore[import-not-found]
+import pandas as pd  # type: ignore[import-not-found]
+
+pd = cast(Any, pd)
+np = cast(Any, np)
+
+DEFAULT_FALSE_POSITIVE_RATE = 0.01
+
+# Bump when hashing or the file layout changes; older indexes are rebuilt
+INDEX_FORMAT_VERSION = 1
+
+DEFAULT_REFERENCE_INDEX_DIR = Path(tempfile.gettempdir()) / "mapper_reference_indexes"
+
+_HASH_KEY = "mapper-reference"
+
+
+def normalize_keys(values: Any) -> Any:
+    """Strip whitespace and a trailing ``.0`` (IDs read as floats), upper-case.
+
+    Args:
+        values: Iterable of raw keys (missing values become "").
+
+    Returns:
+        NumPy object array of normalized keys.
+    """
+    series = pd.Series(values, dtype=object)
+    text = series.where(series.notna(), "").astype(str).str.strip()
+    return text.str.replace(r"\.0+$", "", regex=True).str.upper().to_numpy(dtype=object)
+
+
+def hash_keys(normalized: Any) -> Any:
+    """64-bit hashes of normalized keys."""
+    return pd.util.hash_array(np.asarray(normalized, dtype=object), hash_key=_HASH_KEY, categorize=False)
+
+
+def _mix(hashes: Any) -> Any:
+    """Second, independent hash (splitmix64 finalizer) for double hashing."""
+    z = hashes.astype(np.uint64)
+    with np.errstate(over="ignore"):
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return (z ^ (z >> np.uint64(31))) | np.uint64(1)
+
+
+class BloomFilter:
+    """Bloom filter over 64-bit key hashes (NumPy bit array).
+
+    Attributes:
+        bits: Packed bit array (uint8).
+        size: Number of bits.
+        hashes: Probes per key.
+    """
+
+    def __init__(self, bits: Any, hashes: int):
+        self.bits = bits
+        self.size = len(bits) * 8
+        self.hashes = hashes
+
+    @classmethod
+    def for_capacity(cls, capacity: int, false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE) -> "BloomFilter":
+        """Empty filter sized for `capacity` keys at `false_positive_rate`."""
+        capacity = max(int(capacity), 1)
+        size = int(np.ceil(-capacity * np.log(false_positive_rate) / np.log(2) ** 2))
+        hashes = max(1, int(round(size / capacity * np.log(2))))
+        return cls(np.zeros((size + 7) // 8, dtype=np.uint8), hashes)
+
+    def _positions(self, hashes: Any, probe: int, step: Any) -> Any:
+        with np.errstate(over="ignore"):
+            return (hashes + np.uint64(probe) * step) % np.uint64(self.size)
+
+    def add(self, hashes: Any) -> None:
+        """Insert key hashes."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        step = _mix(hashes)
+        for probe in range(self.hashes):
+            positions = self._positions(hashes, probe, step)
+            np.bitwise_or.at(
+                self.bits, (positions >> np.uint64(3)).astype(np.int64),
+                np.left_shift(np.uint8(1), (positions & np.uint64(7)).astype(np.uint8))
+            )
+
+    def might_contain(self, hashes: Any) -> Any:
+        """Boolean array: False means the key is certainly absent."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        step = _mix(hashes)
+        result = np.ones(len(hashes), dtype=bool)
+        for probe in range(self.hashes):
+            positions = self._positions(hashes, probe, step)
+            byte = self.bits[(positions >> np.uint64(3)).astype(np.int64)]
+            result &= ((byte >> (positions & np.uint64(7)).astype(np.uint8)) & 1).astype(bool)
+        return result
+
+
+class ReferenceIndex:
+    """Bloom filter plus sorted key hashes of one reference key column.
+
+    Attributes:
+        name: Index name (reference file and column).
+        keys: Sorted unique uint64 key hashes (memory-mapped when loaded).
+        bloom: Bloom filter over `keys`.
+        fingerprint: Identity of the indexed reference data.
+    """
+
+    def __init__(self, name: str, keys: Any, bloom: BloomFilter, fingerprint: str, directory: Optional[str] = None):
+        self.name = name
+        self.keys = keys
+        self.bloom = bloom
+        self.fingerprint = fingerprint
+        # Folder the keys are memory-mapped from (None when in memory)
+        self.directory = directory
+
+    def __getstate__(self) -> Any:
+        # Saved indexes are re-mapped rather than copied into worker processes
+        state = self.__dict__.copy()
+        if self.directory is not None:
+            state["keys"] = None
+        return state
+
+    def __setstate__(self, state: Any) -> None:
+        self.__dict__.update(state)
+        if self.keys is None:
+            self.keys = np.load(Path(self.directory) / f"{self.name}.keys.npy", mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def from_keys(cls, keys: Iterable[Any], name: str = "reference",
+                  false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE) -> "ReferenceIndex":
+        """In-memory index from raw keys."""
+        normalized = normalize_keys(pd.unique(pd.Series(list(keys), dtype=object)))
+        hashes = np.unique(hash_keys(normalized[normalized != ""]))
+        bloom = BloomFilter.for_capacity(len(hashes), false_positive_rate)
+        bloom.add(hashes)
+        fingerprint = hashlib.blake2b(hashes.tobytes(), digest_size=16).hexdigest()
+        return cls(name, hashes, bloom, fingerprint)
+
+    def contains(self, values: Any) -> Any:
+        """Boolean array: which raw keys are in the reference (blank keys are not)."""
+        return self.contains_normalized(normalize_keys(values))
+
+    def contains_normalized(self, normalized: Any) -> Any:
+        """`contains` for keys already passed through `normalize_keys`."""
+        hashes = hash_keys(normalized)
+        if not len(self.keys):
+            return np.zeros(len(hashes), dtype=bool)
+        found = (normalized != "") & self.bloom.might_contain(hashes)
+        candidates = np.flatnonzero(found)
+        if len(candidates):
+            probes = hashes[candidates]
+            positions = np.searchsorted(self.keys, probes)
+            positions[positions == len(self.keys)] = 0
+            found[candidates] = np.asarray(self.keys[positions]) == probes
+        return found
+
+    def save(self, directory: Any, source_stamp: str = "") -> None:
+        """Write the index to `directory` (files renamed into place atomically)."""
+        folder = Path(directory)
+        folder.mkdir(parents=True, exist_ok=True)
+        _write_atomic(folder / f"{self.name}.keys.npy", lambda handle: np.save(handle, np.asarray(self.keys)))
+        _write_atomic(folder / f"{self.name}.bloom.npy", lambda handle: np.save(handle, self.bloom.bits))
+        meta = {
+            "version": INDEX_FORMAT_VERSION,
+            "hashes": self.bloom.hashes,
+            "fingerprint": self.fingerprint,
+            "source_stamp": source_stamp,
+        }
+        # Metadata last: an index is only valid once its metadata exists
+        _write_atomic(folder / f"{self.name}.meta.json", lambda handle: handle.write(json.dumps(meta).encode()))
+
+    @classmethod
+    def load(cls, directory: Any, name: str, source_stamp: Optional[str] = None) -> Optional["ReferenceIndex"]:
+        """Load a saved index; None if missing, outdated or built from other source data."""
+        folder = Path(directory)
+        meta_path = folder / f"{name}.meta.json"
+        if not meta_path.is_file():
+            return None
+        meta = json.loads(meta_path.read_text())
+        if meta.get("version") != INDEX_FORMAT_VERSION:
+            return None
+        if source_stamp is not None and meta.get("source_stamp") != source_stamp:
+            return None
+        keys = np.load(folder / f"{name}.keys.npy", mmap_mode="r")
+        bits = np.load(folder / f"{name}.bloom.npy")
+        return cls(name, keys, BloomFilter(bits, int(meta["hashes"])), meta["fingerprint"], str(folder))
+
+    @classmethod
+    def build(
+        cls,
+        source: Any,
+        column: str,
+        directory: Any = DEFAULT_REFERENCE_INDEX_DIR,
+        false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE,
+        chunksize: int = 1_000_000
+    ) -> "ReferenceIndex":
+        """Index `column` of a reference CSV and save it under `directory`.
+
+        Only `column` is parsed, in chunks; each chunk contributes the hashes
+        of its distinct keys.
+
+        Args:
+            source: Reference CSV (eligibility roster, provider file, ...)
+            column: Key column
+            directory: Index folder
+            false_positive_rate: Bloom filter false positive rate
+            chunksize: Rows parsed per chunk
+
+        Returns:
+            The saved index (keys memory-mapped)
+        """
+        parts = []
+        for chunk in pd.read_csv(source, usecols=[column], dtype=str, chunksize=chunksize):
+            normalized = normalize_keys(pd.unique(chunk[column]))
+            parts.append(hash_keys(normalized[normalized != ""]))
+        hashes = np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.uint64)
+        bloom = BloomFilter.for_capacity(len(hashes), false_positive_rate)
+        bloom.add(hashes)
+        name = reference_index_name(source, column)
+        stamp = source_stamp(source)
+        fingerprint = hashlib.blake2b(f"{name}|{stamp}".encode(), digest_size=16).hexdigest()
+        cls(name, hashes, bloom, fingerprint).save(directory, stamp)
+        loaded = cls.load(directory, name, stamp)
+        assert loaded is not None
+        return loaded
+
+
+def _write_atomic(path: Path, write: Any) -> None:
+    fd, staging = tempfile.mkstemp(suffix=path.suffix, dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            write(handle)
+        os.replace(staging, path)
+    except BaseException:
+        if os.path.exists(staging):
+            os.remove(staging)
+        raise
+
+
+def reference_index_name(source: Any, column: str) -> str:
+    """File-system safe index name for a reference file and key column."""
+    digest = hashlib.blake2b(f"{os.path.abspath(source)}|{column}".encode(), digest_size=8).hexdigest()
+    return f"{Path(source).stem}_{digest}"
+
+
+def source_stamp(source: Any) -> str:
+    """Size and modification time of a reference file (changes force a rebuild)."""
+    stat = os.stat(source)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+@lru_cache(maxsize=16)
+def _reference_index_cached(source: str, column: str, directory: str, stamp: str) -> ReferenceIndex:
+    name = reference_index_name(source, column)
+    index = ReferenceIndex.load(directory, name, stamp)
+    return index if index is not None else ReferenceIndex.build(source, column, directory)
+
+
+def get_reference_index(source: Any, column: str, directory: Optional[Any] = None) -> ReferenceIndex:
+    """Return the index of a reference file's key column, building it once.
+
+    Saved indexes are reused across runs while the file is unchanged, and
+    each process keeps the loaded index for later sessions.
+
+    Args:
+        source: Reference CSV
+        column: Key column
+        directory: Index folder (default: `REFERENCE_INDEX_DIR`, else a
+            folder in the system temp dir)
+    """
+    if directory is None:
+        from core.config_loader import REFERENCE_INDEX_DIR
+        directory = REFERENCE_INDEX_DIR or DEFAULT_REFERENCE_INDEX_DIR
+    source = os.path.abspath(source)
+    return _reference_index_cached(source, column, str(directory), source_stamp(source))
+
+
+@dataclass
+class IntegrityCheck:
+    """Per-row outcome of a referential-integrity check.
+
+    Attributes:
+        blank: Missing or empty keys (not checked).
+        missing: Keys absent from the reference.
+    """
+
+    blank: Any
+    missing: Any
+
+
+def check_references(df: Any, column: str, index: ReferenceIndex, context: Optional[Any] = None) -> IntegrityCheck:
+    """Look up every key of `column` in `index`, once per distinct value.
+
+    Args:
+        df: Claims DataFrame
+        column: Key column (member ID, provider ID, plan code, ...)
+        index: Reference index
+        context: ValidationContext for `df` (default: the frame's shared one)
+
+    Returns:
+        IntegrityCheck with boolean row masks
+    """
+    if context is None:
+        from validation.validation_engine import get_validation_context
+        context = get_validation_context(df)
+    codes, uniques = context.factorized(column)
+    normalized = normalize_keys(uniques)
+    blank = normalized == ""
+    found = index.contains_normalized(normalized)
+    # Trailing entry for missing values (code -1)
+    return IntegrityCheck(
+        blank=np.append(blank, True)[codes],
+        missing=np.append(~found & ~blank, False)[codes],
+    )
+
+
+def reference_tables(tables: Optional[Dict[str, Dict[str, str]]] = None) -> Dict[str, Dict[str, str]]:
+    """Configured reference tables: `{internal_field: {"path": ..., "column": ...}}`."""
+    if tables is None:
+        from core.config_loader import REFERENCE_TABLES
+        tables = REFERENCE_TABLES
+    return {field: spec for field, spec in tables.items() if spec.get("path") and spec.get("column")}
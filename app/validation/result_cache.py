@@ -0,0 +1,308 @@
+# --- result_cache.py ---
+"""Reuse of validation results across reruns.
+
+A rule's result is keyed by the rule's signature (engine version, type and
+configuration) and the content fingerprints of the columns it reads. After a
+data or mapping edit only rules whose inputs or configuration changed miss
+the cache.
+
+Results live in an in-process LRU, optionally backed by `DiskResultCache`, a
+SQLite file shared by every session and worker process on the host.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from utils.structured_logging import get_logger
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_MAX_MEMORY_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_DISK_BYTES = 256 * 1024 * 1024
+
+# Approximate in-memory size of a result besides its key and failure bitmap
+RESULT_OVERHEAD_BYTES = 1024
+
+# Bump when the table layout or record encoding changes; older files are reset
+DISK_SCHEMA_VERSION = 1
+
+# Seconds a writer waits for another process's lock before giving up
+DISK_LOCK_TIMEOUT = 30.0
+
+
+def result_cache_key(signature: str, fingerprints: Iterable[str], row_count: int) -> str:
+    """Build the cache key for one rule run.
+
+    Args:
+        signature: Rule type and configuration (see `rule_signature`).
+        fingerprints: Content fingerprints of the rule's input columns, in order.
+        row_count: Rows in the validated frame.
+
+    Returns:
+        Hex digest key.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(signature.encode())
+    for fingerprint in fingerprints:
+        digest.update(b"|" + fingerprint.encode())
+    digest.update(f"|{row_count}".encode())
+    return digest.hexdigest()
+
+
+class DiskResultCache:
+    """ValidationResults persisted in SQLite, shared across processes.
+
+    Each entry is a compact JSON record (see `ValidationResult.to_record`) plus
+    the packed failure bitmap. The database runs in WAL mode, so readers never
+    block and concurrent writers from several Streamlit worker processes
+    serialize on SQLite's file lock. Entries are evicted least recently used
+    first once their total size exceeds `max_bytes`.
+
+    Storage errors are logged and treated as misses: the cache never fails a
+    validation run.
+
+    Attributes:
+        path: SQLite database file.
+        max_bytes: Size budget for stored records and bitmaps.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_DISK_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._setup()
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread and process (connections must not cross a fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=DISK_LOCK_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _setup(self) -> None:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != DISK_SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS results")
+                conn.execute(f"PRAGMA user_version={DISK_SCHEMA_VERSION}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, record TEXT NOT NULL, bitmap BLOB, "
+                "bitmap_size INTEGER, bitmap_count INTEGER, "
+                "nbytes INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the stored ValidationResult for `key`, or None."""
+        from validation.failure_bitmap import FailureBitmap
+        from validation.validation_engine import ValidationResult
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT record, bitmap, bitmap_size, bitmap_count FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error as e:
+            get_logger().warning("Result cache read failed", path=self.path, error=str(e))
+            return None
+        record, bitmap, size, count = row
+        failures = FailureBitmap.from_bytes(bitmap, size, count) if bitmap is not None else None
+        return ValidationResult.from_record(json.loads(record), failures)
+
+    def put(self, key: str, result: Any) -> None:
+        """Store a ValidationResult, then evict down to `max_bytes`."""
+        record = json.dumps(result.to_record(), default=_json_value)
+        failures = result.failures
+        bitmap = failures.to_bytes() if failures is not None else None
+        nbytes = len(key) + len(record) + (len(bitmap) if bitmap is not None else 0)
+        if nbytes > self.max_bytes:
+            return
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, record, bitmap, failures.size if failures is not None else None,
+                     failures.count if failures is not None else None, nbytes, time.time())
+                )
+                self._evict(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            get_logger().warning("Result cache write failed", path=self.path, error=str(e))
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        stale = []
+        for key, nbytes in conn.execute("SELECT key, nbytes FROM results ORDER BY accessed"):
+            stale.append((key,))
+            freed += nbytes
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM results WHERE key = ?", stale)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        try:
+            self._connect().execute("DELETE FROM results")
+        except sqlite3.Error as e:
+            get_logger().warning("Result cache clear failed", path=self.path, error=str(e))
+
+    def stats(self) -> Dict[str, int]:
+        """Entry count and stored bytes."""
+        entries, nbytes = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM results"
+        ).fetchone()
+        return {"entries": int(entries), "bytes": int(nbytes)}
+
+    def __len__(self) -> int:
+        return self.stats()["entries"]
+
+
+def _json_value(value: Any) -> Any:
+    # NumPy scalars in metrics
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def _result_nbytes(key: str, result: Any) -> int:
+    """Approximate memory held by one cached result."""
+    failures = getattr(result, "failures", None)
+    return len(key) + RESULT_OVERHEAD_BYTES + (failures.nbytes if failures is not None else 0)
+
+
+class ValidationResultCache:
+    """Thread-safe in-memory LRU of ValidationResults by `result_cache_key`.
+
+    Entries are evicted least recently used first once there are more than
+    `max_entries` of them or their failure bitmaps and records together
+    exceed `max_bytes`. With a `store`, misses fall through to it (hits are
+    promoted into memory) and every put is written through.
+
+    Attributes:
+        max_entries: Entries kept before the least recently used are evicted.
+        max_bytes: Approximate memory budget for the kept results.
+        store: Optional shared backing store (e.g. `DiskResultCache`).
+        hits: Lookups served from the cache (memory or store).
+        misses: Lookups that found nothing.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        store: Optional[DiskResultCache] = None,
+        max_bytes: int = DEFAULT_MAX_MEMORY_BYTES
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._entries: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached result for `key`, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+        result = self.store.get(key) if self.store is not None else None
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, result)
+            return result
+
+    def put(self, key: str, result: Any) -> None:
+        """Store a result, evicting the least recently used beyond the budgets."""
+        with self._lock:
+            self._remember(key, result)
+        if self.store is not None:
+            self.store.put(key, result)
+
+    def _remember(self, key: str, result: Any) -> None:
+        nbytes = _result_nbytes(key, result)
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.nbytes -= previous[1]
+        if nbytes > self.max_bytes:
+            # Larger than the whole budget: keep it on disk only
+            return
+        self._entries[key] = (result, nbytes)
+        self.nbytes += nbytes
+        while len(self._entries) > self.max_entries or self.nbytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.nbytes -= evicted
+
+    def clear(self) -> None:
+        """Drop all in-memory entries (the backing store is left alone)."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Entry count, held bytes and hit/miss counters."""
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.nbytes, "hits": self.hits, "misses": self.misses}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_result_cache: Optional[ValidationResultCache] = None
+
+
+def get_result_cache() -> ValidationResultCache:
+    """Return the process-wide validation result cache.
+
+    Keys depend only on column content and rule configuration, so the cache
+    is safe to share between sessions. When `RESULT_CACHE_DIR` is configured
+    it is backed by a `DiskResultCache` there, shared by every process on the
+    host; if the directory cannot be used the cache stays in memory.
+    """
+    global _result_cache
+    if _result_cache is None:
+        from core.config_loader import RESULT_CACHE_DIR, RESULT_CACHE_MAX_MB, RESULT_CACHE_MEMORY_MB
+        store = None
+        if RESULT_CACHE_DIR:
+            try:
+                store = DiskResultCache(
+                    os.path.join(RESULT_CACHE_DIR, "validation_results.sqlite"),
+                    RESULT_CACHE_MAX_MB * 1024 * 1024
+                )
+            except (OSError, sqlite3.Error) as e:
+                get_logger().warning("Result cache disabled on disk", path=RESULT_CACHE_DIR, error=str(e))
+        _result_cache = ValidationResultCache(store=store, max_bytes=RESULT_CACHE_MEMORY_MB * 1024 * 1024)
+    return _result_cache
@@ -0,0 +1,375 @@
+# pyright: reportUnknownMemberType=false, reportMissingTypeStubs=false, reportUnknownVariableType=false, reportUnknownArgumentType=false
+"""Compiler for business-rule conditions.
+
+Conditions such as ``"Paid_Amount > 100 AND Status == 'Active'"`` are parsed
+once into hashable expression trees. A rule set is evaluated in one pass:
+each referenced column is read once, identical subexpressions shared by
+several rules are computed once, and numeric subtrees run through numexpr
+when it is installed. Conditions the compiler does not understand fall back
+to ``DataFrame.eval(engine="python")``.
+"""
+import ast
+import io
+import re
+import tokenize
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple, cast
+
+import numpy as np  # type: ignore[import-not-found]
+import pandas as pd  # type: ignore[import-not-found]
+
+pd = cast(Any, pd)
+np = cast(Any, np)
+
+# numexpr is optional: without it every node is evaluated with pandas/NumPy
+try:
+    import numexpr as ne  # type: ignore[import-not-found]
+    HAS_NUMEXPR: bool = True
+except ImportError:
+    HAS_NUMEXPR = False  # type: ignore[assignment]
+
+# Expression nodes are nested tuples:
+#   ("col", name) | ("const", value) | ("list", values)
+#   ("cmp", op, left, right) | ("bin", op, left, right) | ("neg", operand)
+#   ("and", *operands) | ("or", *operands) | ("not", operand)
+#   ("in", operand, ("list", values)) | ("not_in", operand, ("list", values))
+Node = Tuple[Any, ...]
+
+_KEYWORDS = {"AND": "and", "&": "and", "OR": "or", "|": "or", "NOT": "not", "~": "not", "=": "=="}
+_COMPARE_OPS = {ast.Eq: "==", ast.NotEq: "!=", ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">="}
+_BINARY_OPS = {ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/", ast.Mod: "%"}
+# Operators numexpr evaluates with the same semantics as pandas
+_NUMEXPR_OPS = {"==", "!=", "<", "<=", ">", ">=", "+", "-", "*"}
+_BACKTICK = re.compile(r"`([^`]*)`")
+
+
+class UnsupportedExpression(ValueError):
+    """Raised for condition syntax the compiler does not handle."""
+
+
+def _normalize(condition: str) -> Tuple[str, Dict[str, str]]:
+    """Rewrite SQL-style keywords and backtick column names into Python syntax."""
+    names: Dict[str, str] = {}
+
+    def placeholder(match: "re.Match[str]") -> str:
+        key = f"__col_{len(names)}"
+        names[key] = match.group(1)
+        return key
+
+    text = _BACKTICK.sub(placeholder, condition)
+    tokens = []
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(text).readline):
+            value = tok.string
+            if tok.type in (tokenize.NAME, tokenize.OP) and value.upper() in _KEYWORDS:
+                value = _KEYWORDS[value.upper()]
+            tokens.append((tok.type, value))
+    except (tokenize.TokenError, IndentationError) as e:
+        raise UnsupportedExpression(str(e))
+    return tokenize.untokenize(tokens).strip(), names
+
+
+def _convert(node: ast.AST, names: Dict[str, str]) -> Node:
+    if isinstance(node, ast.Name):
+        if node.id in ("True", "False", "None"):
+            return ("const", {"True": True, "False": False, "None": None}[node.id])
+        return ("col", names.get(node.id, node.id))
+    if isinstance(node, ast.Constant):
+        return ("const", node.value)
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        values = [_convert(element, names) for element in node.elts]
+        if any(value[0] != "const" for value in values):
+            raise UnsupportedExpression("Only literal values are supported in lists")
+        return ("list", tuple(value[1] for value in values))
+    if isinstance(node, ast.BoolOp):
+        kind = "and" if isinstance(node.op, ast.And) else "or"
+        operands: List[Node] = []
+        for value in node.values:
+            converted = _convert(value, names)
+            # Flatten nested and/or so fused operand lists are canonical
+            operands.extend(converted[1:] if converted[0] == kind else [converted])
+        return (kind, *operands)
+    if isinstance(node, ast.UnaryOp):
+        operand = _convert(node.operand, names)
+        if isinstance(node.op, (ast.Not, ast.Invert)):
+            return ("not", operand)
+        if isinstance(node.op, ast.USub):
+            return ("const", -operand[1]) if operand[0] == "const" else ("neg", operand)
+        if isinstance(node.op, ast.UAdd):
+            return operand
+    if isinstance(node, ast.BinOp):
+        if isinstance(node.op, ast.BitAnd):
+            return _convert(ast.BoolOp(op=ast.And(), values=[node.left, node.right]), names)
+        if isinstance(node.op, ast.BitOr):
+            return _convert(ast.BoolOp(op=ast.Or(), values=[node.left, node.right]), names)
+        op = _BINARY_OPS.get(type(node.op))
+        if op is not None:
+            return ("bin", op, _convert(node.left, names), _convert(node.right, names))
+    if isinstance(node, ast.Compare):
+        parts: List[Node] = []
+        left = _convert(node.left, names)
+        for op_node, comparator in zip(node.ops, node.comparators):
+            right = _convert(comparator, names)
+            if isinstance(op_node, (ast.In, ast.NotIn)):
+                if right[0] != "list":
+                    raise UnsupportedExpression("'in' needs a literal list")
+                parts.append(("in" if isinstance(op_node, ast.In) else "not_in", left, right))
+            else:
+                op = _COMPARE_OPS.get(type(op_node))
+                if op is None:
+                    raise UnsupportedExpression(f"Unsupported comparison: {type(op_node).__name__}")
+                parts.append(("cmp", op, left, right))
+            left = right
+        return parts[0] if len(parts) == 1 else ("and", *parts)
+    raise UnsupportedExpression(f"Unsupported syntax: {type(node).__name__}")
+
+
+@lru_cache(maxsize=1024)
+def parse_condition(condition: str) -> Node:
+    """Parse a rule condition into an expression tree (cached by text).
+
+    Accepts Python/pandas ``eval`` syntax plus ``AND``/``OR``/``NOT``, ``=``
+    for equality and backtick-quoted column names.
+
+    Raises:
+        UnsupportedExpression: If the condition uses unsupported syntax.
+    """
+    text, names = _normalize(condition)
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError as e:
+        raise UnsupportedExpression(str(e))
+    return _convert(tree.body, names)
+
+
+def referenced_columns(node: Node) -> List[str]:
+    """Column names an expression reads, in first-use order."""
+    if node[0] == "col":
+        return [node[1]]
+    if node[0] in ("const", "list"):
+        return []
+    columns: List[str] = []
+    for child in node[1:]:
+        if isinstance(child, tuple) and child and isinstance(child[0], str):
+            columns.extend(c for c in referenced_columns(child) if c not in columns)
+    return columns
+
+
+def _numexpr_source(node: Node, numeric: Dict[str, bool], variables: Dict[str, str]) -> Optional[str]:
+    """numexpr source for a purely numeric subtree, or None."""
+    kind = node[0]
+    if kind == "col":
+        if not numeric.get(node[1]):
+            return None
+        return variables.setdefault(node[1], f"v{len(variables)}")
+    if kind == "const":
+        value = node[1]
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+        return repr(value)
+    if kind in ("cmp", "bin"):
+        if node[1] not in _NUMEXPR_OPS:
+            return None
+        left = _numexpr_source(node[2], numeric, variables)
+        right = _numexpr_source(node[3], numeric, variables)
+        return None if left is None or right is None else f"({left} {node[1]} {right})"
+    if kind in ("and", "or", "not", "neg"):
+        # Logical operators only combine boolean subtrees; truthiness of raw
+        # values is left to pandas
+        if kind != "neg" and any(child[0] not in ("cmp", "and", "or", "not") for child in node[1:]):
+            return None
+        sources = [_numexpr_source(child, numeric, variables) for child in node[1:]]
+        if any(source is None for source in sources):
+            return None
+        if kind == "not":
+            return f"(~{sources[0]})"
+        if kind == "neg":
+            return f"(-{sources[0]})"
+        return "(" + (" & " if kind == "and" else " | ").join(cast(List[str], sources)) + ")"
+    return None
+
+
+class CompiledRuleSet:
+    """Rule conditions compiled for frames with one set of column dtypes.
+
+    Attributes:
+        conditions: Condition texts in rule order.
+        trees: Expression tree per condition (None when it falls back to
+            ``DataFrame.eval``).
+        errors: Parse error per condition that fell back.
+        columns: Columns referenced by the compiled conditions.
+        numexpr_nodes: Subtrees evaluated with numexpr -> (source, variables).
+    """
+
+    def __init__(self, conditions: Sequence[str], dtypes: Dict[str, str]):
+        self.conditions = tuple(conditions)
+        self.trees: List[Optional[Node]] = []
+        self.errors: Dict[int, str] = {}
+        for position, condition in enumerate(self.conditions):
+            try:
+                self.trees.append(parse_condition(condition))
+            except UnsupportedExpression as e:
+                self.trees.append(None)
+                self.errors[position] = str(e)
+        self.columns: List[str] = []
+        for tree in self.trees:
+            if tree is not None:
+                self.columns.extend(c for c in referenced_columns(tree) if c not in self.columns)
+        # Object columns: equality and membership tests run on distinct values
+        self.object_columns = {col for col, dtype in dtypes.items() if dtype == "object"}
+        self.numexpr_nodes: Dict[Node, Tuple[str, Dict[str, str]]] = {}
+        if HAS_NUMEXPR:
+            numeric = {col: np.dtype(dtype).kind in "iuf" for col, dtype in dtypes.items() if _is_numpy_dtype(dtype)}
+            for tree in self.trees:
+                if tree is not None:
+                    self._plan_numexpr(tree, numeric)
+
+    def _plan_numexpr(self, node: Node, numeric: Dict[str, bool]) -> None:
+        """Record the largest numexpr-capable subtrees of `node`."""
+        if node[0] in ("col", "const", "list") or node in self.numexpr_nodes:
+            return
+        variables: Dict[str, str] = {}
+        source = _numexpr_source(node, numeric, variables)
+        if source is not None:
+            self.numexpr_nodes[node] = (source, variables)
+            return
+        for child in node[1:]:
+            if isinstance(child, tuple) and child and isinstance(child[0], str):
+                self._plan_numexpr(child, numeric)
+
+    def evaluate(self, df: Any) -> List[Any]:
+        """Evaluate every condition against `df` in one pass.
+
+        Returns:
+            Per condition, a boolean NumPy mask of matching rows, or the
+            exception raised while evaluating it.
+        """
+        from validation.validation_engine import get_validation_context
+
+        context = get_validation_context(df)
+        columns: Dict[str, Any] = {}
+        memo: Dict[Node, Any] = {}
+
+        def column(name: str) -> Any:
+            if name not in columns:
+                columns[name] = df[name]
+            return columns[name]
+
+        def evaluate(node: Node) -> Any:
+            if node in memo:
+                return memo[node]
+            kind = node[0]
+            planned = self.numexpr_nodes.get(node)
+            membership = self._membership(node)
+            if membership is not None:
+                name, values, negate = membership
+                codes, uniques = context.factorized(name)
+                hits = np.append(pd.Index(uniques, dtype=object).isin(values), any(pd.isna(v) for v in values))
+                value = pd.Series(hits[codes] != negate, index=df.index)
+            elif planned is not None:
+                source, variables = planned
+                local_dict = {var: column(col).to_numpy() for col, var in variables.items()}
+                value = pd.Series(ne.evaluate(source, local_dict=local_dict), index=df.index)
+            elif kind == "col":
+                value = column(node[1])
+            elif kind == "const":
+                value = node[1]
+            elif kind == "cmp":
+                left, right = evaluate(node[2]), evaluate(node[3])
+                op = node[1]
+                value = {
+                    "==": lambda: left == right, "!=": lambda: left != right,
+                    "<": lambda: left < right, "<=": lambda: left <= right,
+                    ">": lambda: left > right, ">=": lambda: left >= right,
+                }[op]()
+            elif kind == "bin":
+                left, right = evaluate(node[2]), evaluate(node[3])
+                value = {
+                    "+": lambda: left + right, "-": lambda: left - right,
+                    "*": lambda: left * right, "/": lambda: left / right,
+                    "%": lambda: left % right,
+                }[node[1]]()
+            elif kind == "neg":
+                value = -evaluate(node[1])
+            elif kind == "not":
+                value = ~_as_bool(evaluate(node[1]), df)
+            elif kind in ("and", "or"):
+                value = _as_bool(evaluate(node[1]), df)
+                for child in node[2:]:
+                    other = _as_bool(evaluate(child), df)
+                    value = (value & other) if kind == "and" else (value | other)
+            elif kind in ("in", "not_in"):
+                value = _as_series(evaluate(node[1]), df).isin(list(node[2][1]))
+                if kind == "not_in":
+                    value = ~value
+            else:
+                raise UnsupportedExpression(f"Unsupported node: {kind}")
+            memo[node] = value
+            return value
+
+        outcomes: List[Any] = []
+        for position, tree in enumerate(self.trees):
+            try:
+                if tree is None:
+                    result = df.eval(self.conditions[position], engine="python")
+                else:
+                    result = evaluate(tree)
+                outcomes.append(_as_bool(result, df).to_numpy(dtype=bool, na_value=False))
+            except Exception as e:
+                outcomes.append(e)
+        return outcomes
+
+
+    def _membership(self, node: Node) -> Optional[Tuple[str, List[Any], bool]]:
+        """(column, values, negate) for equality/membership tests on an object column."""
+        kind = node[0]
+        if kind in ("in", "not_in") and node[1][0] == "col" and node[1][1] in self.object_columns:
+            return node[1][1], list(node[2][1]), kind == "not_in"
+        if kind == "cmp" and node[1] in ("==", "!=") and node[2][0] == "col" and node[3][0] == "const":
+            if node[2][1] in self.object_columns and node[3][1] is not None:
+                return node[2][1], [node[3][1]], node[1] == "!="
+        return None
+
+
+def _is_numpy_dtype(dtype: str) -> bool:
+    try:
+        np.dtype(dtype)
+    except TypeError:
+        return False
+    return True
+
+
+def _as_series(value: Any, df: Any) -> Any:
+    return value if isinstance(value, pd.Series) else pd.Series(value, index=df.index)
+
+
+def _as_bool(value: Any, df: Any) -> Any:
+    """Boolean Series (missing values count as False)."""
+    series = _as_series(value, df)
+    if series.dtype == bool:
+        return series
+    return pd.Series(series.to_numpy(dtype=object, na_value=False).astype(bool), index=df.index)
+
+
+@lru_cache(maxsize=128)
+def _compile_cached(conditions: Tuple[str, ...], dtypes: Tuple[Tuple[str, str], ...]) -> CompiledRuleSet:
+    return CompiledRuleSet(conditions, dict(dtypes))
+
+
+def compile_rule_set(conditions: Sequence[str], df: Any) -> CompiledRuleSet:
+    """Compile conditions for `df`, cached by condition text and column dtypes.
+
+    Args:
+        conditions: Rule condition texts.
+        df: Frame the plan will run against (only its dtypes are used).
+
+    Returns:
+        A CompiledRuleSet reusable for any frame with the same dtypes.
+    """
+    dtypes = tuple((str(col), str(dtype)) for col, dtype in df.dtypes.items())
+    return _compile_cached(tuple(conditions), dtypes)
+
+
+def evaluate_conditions(df: Any, conditions: Sequence[str]) -> List[Any]:
+    """Evaluate many conditions in one pass (see `CompiledRuleSet.evaluate`)."""
+    return compile_rule_set(conditions, df).evaluate(df)
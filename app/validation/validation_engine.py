@@ -6,19 +6,54 @@ This module implements field-level and file-level validations using a rule-based
 similar to the Validation Framework. All rules are implemented using pandas (not Spark).
 
 Rule Categories:
-- Field-Level (Row-by-Row): Null/Required checks, Datatype validation, Age validation, Fill rate checks
+- Field-Level (Row-by-Row): Null/Required checks, Datatype validation, Age validation, Fill rate checks,
+  NPI check digit / registry checks, code validity (ICD-10-CM, CPT/HCPCS, revenue codes),
+  claim-level consistency (lines grouped by claim key), referential integrity
 - File-Level (Summary): Required field completeness, Age distribution, Date range, Diagnosis code coverage
 
 run_validations(): Executes field-level validations (row-by-row checks)
 dynamic_run_validations(): Executes file-level validations (aggregate/summary checks)
 """
+import copy
+import hashlib
+import json
+import os
+import time
+import tracemalloc
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field as dataclass_field
+import numpy as np  # type: ignore[import-not-found]
 import pandas as pd  # type: ignore[import-not-found]
-from typing import List, Dict, Any, cast, Optional, Tuple
-import streamlit as st  # type: ignore[import-not-found]
+from typing import Callable, Iterable, List, Dict, Any, cast, Optional, Set, Tuple
 from abc import ABC, abstractmethod
 
-st = cast(Any, st)
+from data.date_parsing import parse_dates, to_datetime_values
+from utils.cache_manager import FrameRegistry, get_column_fingerprints
+from validation.claim_rules import default_claim_rules, resolve_claim_key, validate_claim_rules
+from validation.code_sets import (
+    CodeIndex, CoverageAccumulator, DiagnosisCoverage, VersionedCodeSet, code_systems_for, diagnosis_code_coverage,
+    dx_fields_in, get_code_index, get_code_set_catalog, invalid_code_mask
+)
+from validation.failure_bitmap import FailureBitmap
+from validation.npi import NPIRegistry, check_npis, get_npi_registry
+from validation.reference_index import ReferenceIndex, check_references, get_reference_index, reference_tables
+from validation.result_cache import ValidationResultCache, result_cache_key
+
 pd = cast(Any, pd)
+np = cast(Any, np)
+
+# Rule execution modes for `run_validations` / `dynamic_run_validations`.
+# Threads suit most rules (pandas and NumPy kernels release the GIL); processes
+# suit heavy rules at the cost of copying each rule group's columns.
+EXECUTION_SERIAL = "serial"
+EXECUTION_THREADS = "threads"
+EXECUTION_PROCESSES = "processes"
+EXECUTION_MODES = (EXECUTION_SERIAL, EXECUTION_THREADS, EXECUTION_PROCESSES)
+
+# Part of every result cache key; bump when rule semantics change so results
+# persisted by older releases are not reused
+ENGINE_VERSION = "2"
 
 # ================================================================
 # Validation Framework Pattern - Base Classes
@@ -43,7 +78,8 @@ class ValidationResult:
         field: Optional[str] = None,
         message: Optional[str] = None,
         severity: Optional[str] = None,
-        metrics: Optional[Dict[str, Any]] = None
+        metrics: Optional[Dict[str, Any]] = None,
+        failures: Optional[FailureBitmap] = None
     ):
         self.rule_name = rule_name
         self.status = status
@@ -53,7 +89,29 @@ class ValidationResult:
         self.message = message or ""
         self.severity = severity or status
         self.metrics = metrics or {}
+        # Failing row positions for row-level rules (None for file-level rules)
+        self.failures = failures
+        # Wall time, rows per second and peak memory, set by `execute_rules`
+        self.timing: Dict[str, Any] = {}
     
+    def to_record(self) -> Dict[str, Any]:
+        """Plain, JSON-serializable fields (without failures or timing)."""
+        return {
+            "rule_name": self.rule_name,
+            "status": self.status,
+            "failed_count": int(self.failed_count),
+            "total_count": int(self.total_count),
+            "field": self.field,
+            "message": self.message,
+            "severity": self.severity,
+            "metrics": self.metrics,
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any], failures: Optional[FailureBitmap] = None) -> "ValidationResult":
+        """Rebuild a result from `to_record` output."""
+        return cls(failures=failures, **record)
+
     def get_failure_rate(self) -> float:
         """Calculate failure rate as percentage."""
         return (self.failed_count / self.total_count * 100) if self.total_count > 0 else 0.0
@@ -77,85 +135,307 @@ class ValidationResult:
         return result
 
 
+class ValidationContext:
+    """Derived column views shared by every rule run against one frame.
+
+    Each view (null mask, blank mask, parsed dates, age in days) is computed
+    at most once per column, however many rules read it. The context holds
+    only a weak reference to the frame so it can be registered alongside it
+    (see `get_validation_context`).
+    """
+
+    def __init__(self, df: Any, date_formats: Optional[Dict[str, Tuple[str, ...]]] = None):
+        self._df_ref = weakref.ref(df)
+        self._views: Dict[Tuple[str, Any], Any] = {}
+        # column -> date format order to pin (shared across chunks of one file)
+        self.date_formats = date_formats
+        # (check, field) -> failing rows of row-level rules run on this frame
+        self.failures: Dict[Tuple[str, str], FailureBitmap] = {}
+
+    @property
+    def df(self) -> Any:
+        """The frame this context describes."""
+        df = self._df_ref()
+        if df is None:
+            raise ReferenceError("ValidationContext frame has been garbage collected")
+        return df
+
+    def _view(self, kind: str, column: Any, build: Callable[[], Any]) -> Any:
+        key = (kind, column)
+        view = self._views.get(key)
+        if view is None:
+            view = self._views[key] = build()
+        return view
+
+    def is_null(self, column: str) -> Any:
+        """``isnull()`` mask of a column."""
+        return self._view("null", column, lambda: self.df[column].isnull())
+
+    def factorized(self, column: str) -> Tuple[Any, Any]:
+        """(codes, uniques) of a column; missing values get code -1."""
+        return self._view("factorized", column, lambda: pd.factorize(self.df[column], use_na_sentinel=True))  # type: ignore[no-untyped-call]
+
+    def blank_mask(self, column: str) -> Any:
+        """Null, empty or "nan" after stripping; strips each distinct value once."""
+        def build() -> Any:
+            codes, uniques = self.factorized(column)
+            stripped = pd.Index(uniques).astype(str).str.strip()
+            blank_uniques = np.append(np.asarray(stripped.isin(["", "nan"])), True)
+            return pd.Series(blank_uniques[codes], index=self.df.index)
+        return self._view("blank", column, build)
+
+    def dates(self, column: str) -> Any:
+        """Column parsed by the shared date engine (NaT = invalid)."""
+        if self.date_formats is None:
+            return self._view("dates", column, lambda: to_datetime_values(self.df[column]))
+
+        def build() -> Any:
+            assert self.date_formats is not None
+            parsed = parse_dates(self.df[column], self.date_formats.get(column, ()))
+            if parsed.format_order:
+                self.date_formats[column] = parsed.format_order
+            return parsed.values
+        return self._view("dates", column, build)
+
+    def age_days(self, column: str, as_of: Optional[Any] = None) -> Any:
+        """Whole days between each date in `column` and `as_of` (default now; NaN if invalid).
+
+        Cached per calendar day, so long-lived contexts never report stale ages.
+        """
+        today = as_of if as_of is not None else pd.Timestamp.today()
+        return self._view("age_days", (column, today.date()), lambda: (today - self.dates(column)).dt.days)
+
+    def claim_groups(self, key: Tuple[str, ...]) -> Any:
+        """Rows grouped by the claim key column(s) (see `claim_rules.ClaimGroups`)."""
+        from validation.claim_rules import ClaimGroups
+        return self._view("claim_groups", key, lambda: ClaimGroups.from_frame(self.df, key, self))
+
+    def release(self, column: str) -> None:
+        """Drop the cached views of one column."""
+        for key in [k for k in self._views if k[1] == column or (isinstance(k[1], tuple) and k[1][0] == column)]:
+            del self._views[key]
+
+
+_validation_contexts = FrameRegistry()
+
+
+def get_validation_context(df: Any) -> ValidationContext:
+    """Return the shared ValidationContext for a frame, creating it once.
+
+    Field-level and file-level validations of the same frame object therefore
+    share parsed views.
+    """
+    context = _validation_contexts.get(df)
+    if context is None:
+        context = _validation_contexts.set(df, ValidationContext(df))
+    return context
+
+
+class PartialAggregate:
+    """Mergeable partial state of one rule over row chunks.
+
+    `update` folds in a chunk, `merge` folds in another partial (e.g. from a
+    parallel partition) and `result` returns the same ValidationResult the
+    rule gives for the whole frame in memory. All chunks are evaluated as of
+    one timestamp so date windows and ages do not drift between chunks.
+    Row-level failure bitmaps are not kept in partial mode.
+
+    Attributes:
+        rule: Rule being aggregated.
+        rows: Rows seen so far.
+        counts: Additive counters defined by the rule.
+        state: Non-additive partial state of rules that keep one (e.g. the
+            per-claim flags of diagnosis coverage), merged by the rule.
+        as_of: Reference timestamp for age and date-window checks.
+    """
+
+    def __init__(self, rule: "BaseValidationRule", as_of: Optional[Any] = None):
+        self.rule = rule
+        self.rows = 0
+        self.counts: Dict[str, float] = {}
+        self.as_of = as_of if as_of is not None else pd.Timestamp.today()
+        self.error: Optional[Exception] = None
+        self.state: Any = None
+        # Date formats chosen for the first chunk, pinned for later ones
+        self.date_formats: Dict[str, Tuple[str, ...]] = {}
+
+    def update(self, chunk: Any) -> "PartialAggregate":
+        """Add one chunk's counts."""
+        if self.error is None:
+            try:
+                counts, self.state = self.rule._partial_update(
+                    self.state, chunk, ValidationContext(chunk, self.date_formats), self.as_of
+                )
+            except NotImplementedError:
+                raise
+            except Exception as e:
+                self.error = e
+            else:
+                self._add(counts)
+        self.rows += len(chunk)
+        return self
+
+    def merge(self, other: "PartialAggregate") -> "PartialAggregate":
+        """Add another partial of the same rule."""
+        self.rows += other.rows
+        self.error = self.error or other.error
+        self._add(other.counts)
+        self.state = self.rule._merge_partial_state(self.state, other.state)
+        return self
+
+    def _add(self, counts: Dict[str, float]) -> None:
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+
+    def result(self) -> ValidationResult:
+        """Final result over all rows seen."""
+        if self.error is not None:
+            return self.rule._error_result(self.error, self.rows)
+        if self.rows == 0:
+            return self.rule._empty_result()
+        try:
+            self.rule._finish_partial_state(self.state)
+            return self.rule._make_result(int(self.rule._failed_from_counts(self.counts, self.rows)), self.rows)
+        except Exception as e:
+            return self.rule._error_result(e, self.rows)
+
+
 class BaseValidationRule(ABC):
-    """Base class for validation rules (pandas-based, VF-style)."""
+    """Base class for validation rules (pandas-based, VF-style).
+
+    Rules read derived column views from `self.context`, which `validate`
+    sets to a shared `ValidationContext` for the frame.
+    """
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.rule_name = config.get("rule_name", self.__class__.__name__)
         self.validation_inputs = config.get("validation_inputs", {})
+        self.context: Optional[ValidationContext] = None
+    
+    # Whether results depend on the current date (ages, date windows)
+    time_dependent = False
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # The context holds a weak reference and is rebuilt where the rule runs
+        state = self.__dict__.copy()
+        state["context"] = None
+        return state
     
     @abstractmethod
-    def _execute_validation(self, df: Any) -> Tuple[Any, int]:
+    def _execute_validation(self, df: Any) -> Tuple[Optional[Any], int]:
         """
-        Execute validation logic and return (failed_records_df, failed_count).
+        Execute validation logic and return (failure_mask, failed_count).
 
     Args:
             df: Input pandas DataFrame
 
     Returns:
-            Tuple of (failed_records_df, failed_count)
+            Tuple of (boolean mask of failing rows, or None for file-level
+            rules, failed_count). Failing rows are never copied here; see
+            `ValidationResult.failures`.
         """
         pass
     
-    def validate(self, df: Any) -> ValidationResult:
+    def validate(self, df: Any, context: Optional[ValidationContext] = None) -> ValidationResult:
         """
         Main validation method that wraps execution with error handling.
 
     Args:
             df: Input pandas DataFrame
+            context: Shared column views for `df` (defaults to the frame's
+                registered context)
 
     Returns:
             ValidationResult object
         """
         try:
+            self.context = context if context is not None else get_validation_context(df)
             total_count = len(df)
             if total_count == 0:
-                return ValidationResult(
-                    rule_name=self.rule_name,
-                    status=ValidationStatus.WARNING,
-                    failed_count=0,
-                    total_count=0,
-                    message="Empty DataFrame - no validation performed"
-                )
-            
-            failed_records_df, failed_count = self._execute_validation(df)
-            _ = failed_records_df  # Mark as used even if not accessed
-            
-            # Determine status based on failed count
-            status = self._determine_status(failed_count, total_count)
+                return self._empty_result()
             
-            # Build message
-            message = self._build_message(failed_count, total_count)
-            
-            # Get field name if available
-            field = self.config.get("column_name") or self.config.get("field")
-            
-            # Build metrics
-            metrics = {
-                "failure_rate": round((failed_count / total_count * 100) if total_count > 0 else 0.0, 2),
-                "success_count": total_count - failed_count
-            }
-            
-            return ValidationResult(
-                rule_name=self.rule_name,
-                status=status,
-                failed_count=failed_count,
-                total_count=total_count,
-                field=field,
-                message=message,
-                severity=status,
-                metrics=metrics
-            )
+            failure_mask, failed_count = self._execute_validation(df)
+            failures = FailureBitmap.from_mask(failure_mask) if failure_mask is not None else None
+            if failures is not None:
+                field = self.config.get("column_name") or self.config.get("field")
+                self.context.failures[(self.rule_name, field or "")] = failures
+            return self._make_result(int(failed_count), total_count, failures)
         except Exception as e:
-            return ValidationResult(
-                rule_name=self.rule_name,
-                status=ValidationStatus.ERROR,
-                failed_count=-1,
-                total_count=len(df) if df is not None else 0,
-                message=f"Validation error: {str(e)}",
-                severity=ValidationStatus.ERROR
-            )
+            return self._error_result(e, len(df) if df is not None else 0)
+    
+    def partial(self) -> "PartialAggregate":
+        """Start a mergeable partial aggregate of this rule over row chunks."""
+        return PartialAggregate(self)
+    
+    def _partial_counts(self, chunk: Any, context: ValidationContext, as_of: Any) -> Dict[str, float]:
+        """Additive counts for one chunk (rules supporting `partial`)."""
+        raise NotImplementedError(f"{self.__class__.__name__} does not support partial aggregation")
+    
+    def _partial_update(self, state: Any, chunk: Any, context: ValidationContext, as_of: Any) -> Tuple[Dict[str, float], Any]:
+        """Counts for one chunk plus the updated non-additive state (none by default)."""
+        return self._partial_counts(chunk, context, as_of), state
+    
+    def _merge_partial_state(self, state: Any, other: Any) -> Any:
+        """Merge the non-additive states of two partials of this rule."""
+        return state if state is not None else other
+    
+    def _finish_partial_state(self, state: Any) -> None:
+        """Apply the merged state before the result is built (e.g. set metrics)."""
+    
+    def _failed_from_counts(self, counts: Dict[str, float], total_count: int) -> int:
+        """Failed count from merged counts; may set message attributes."""
+        raise NotImplementedError(f"{self.__class__.__name__} does not support partial aggregation")
+    
+    def _empty_result(self) -> ValidationResult:
+        """Result for a frame without rows."""
+        return ValidationResult(
+            rule_name=self.rule_name,
+            status=ValidationStatus.WARNING,
+            failed_count=0,
+            total_count=0,
+            message="Empty DataFrame - no validation performed"
+        )
+    
+    def _error_result(self, error: Exception, total_count: int) -> ValidationResult:
+        """Result for a rule that raised."""
+        return ValidationResult(
+            rule_name=self.rule_name,
+            status=ValidationStatus.ERROR,
+            failed_count=-1,
+            total_count=total_count,
+            message=f"Validation error: {str(error)}",
+            severity=ValidationStatus.ERROR
+        )
+    
+    def _make_result(self, failed_count: int, total_count: int, failures: Optional[FailureBitmap] = None) -> ValidationResult:
+        """Build the result from the failed and total counts."""
+        # Get field name if available
+        field = self.config.get("column_name") or self.config.get("field")
+        
+        # Determine status based on failed count
+        status = self._determine_status(failed_count, total_count)
+        
+        # Build message
+        message = self._build_message(failed_count, total_count)
+        
+        # Build metrics
+        metrics = {
+            "failure_rate": round((failed_count / total_count * 100) if total_count > 0 else 0.0, 2),
+            "success_count": total_count - failed_count
+        }
+        
+        return ValidationResult(
+            rule_name=self.rule_name,
+            status=status,
+            failed_count=failed_count,
+            total_count=total_count,
+            field=field,
+            message=message,
+            severity=status,
+            metrics=metrics,
+            failures=failures
+        )
     
     def _determine_status(self, failed_count: int, total_count: int) -> str:
         """Determine validation status based on failure rate."""
@@ -192,20 +472,11 @@ class NullCheckRule(BaseValidationRule):
     def _execute_validation(self, df: Any) -> Tuple[Any, int]:
         column = self.config.get("column_name")
         if not column or column not in df.columns:
-            return df.iloc[0:0], 0  # Empty DataFrame
+            return None, 0
         
         # Check for null, empty string, or NaN
-        null_mask = (
-            df[column].isnull() |
-            (df[column].astype(str).str.strip() == "") |
-            (df[column].astype(str).str.strip() == "nan")
-        )
-        
-        # Only create copy if we need the actual records, otherwise just count
-        failed_count = null_mask.sum()
-        failed_records_df = df[null_mask] if failed_count > 0 else df.iloc[0:0]
-        
-        return failed_records_df, failed_count
+        null_mask = self.context.blank_mask(column)
+        return null_mask, null_mask.sum()
 
 
 class DatatypeCheckRule(BaseValidationRule):
@@ -214,41 +485,32 @@ class DatatypeCheckRule(BaseValidationRule):
     def _execute_validation(self, df: Any) -> Tuple[Any, int]:
         column = self.config.get("column_name")
         if not column or column not in df.columns:
-            return df.iloc[0:0], 0
+            return None, 0
 
         # For date fields, try to parse
         if "date" in column.lower():
-            parsed_dates = pd.to_datetime(df[column], errors='coerce')
-            invalid_mask = df[column].notnull() & parsed_dates.isnull()
+            invalid_mask = ~self.context.is_null(column) & self.context.dates(column).isnull()
         else:
             # For other types, just check if null (basic check)
-            invalid_mask = df[column].isnull()
-        
-        # Only create copy if we need the actual records, otherwise just count
-        failed_count = invalid_mask.sum()
-        failed_records_df = df[invalid_mask] if failed_count > 0 else df.iloc[0:0]
+            invalid_mask = self.context.is_null(column)
         
-        return failed_records_df, failed_count
+        return invalid_mask, invalid_mask.sum()
 
 
 class AgeValidationRule(BaseValidationRule):
     """Validates that patients are at least 18 years old."""
     
+    time_dependent = True
+    
     def _execute_validation(self, df: Any) -> Tuple[Any, int]:
         dob_field = self.config.get("column_name")
         if not dob_field or dob_field not in df.columns:
-            return df.iloc[0:0], 0
+            return None, 0
         
-        today = pd.Timestamp.today()
-        dob = pd.to_datetime(df[dob_field], errors='coerce')
-        age = (today - dob).dt.days // 365
+        age = self.context.age_days(dob_field) // 365
         
         underage_mask = age < 18
-        # Only create copy if we need the actual records, otherwise just count
-        failed_count = underage_mask.sum()
-        failed_records_df = df[underage_mask] if failed_count > 0 else df.iloc[0:0]
-        
-        return failed_records_df, failed_count
+        return underage_mask, underage_mask.sum()
 
 
 class FillRateCheckRule(BaseValidationRule):
@@ -257,21 +519,144 @@ class FillRateCheckRule(BaseValidationRule):
     def _execute_validation(self, df: Any) -> Tuple[Any, int]:
         column = self.config.get("column_name")
         if not column or column not in df.columns:
-            return df.iloc[0:0], 0
+            return None, 0
         
-        fill_rate = 100 * df[column].notnull().sum() / len(df) if len(df) > 0 else 0.0
+        null_mask = self.context.is_null(column)
+        failed_count = self._failed_from_counts(self._partial_counts(df, self.context, None), len(df))
+        # If fill rate is below threshold, consider all nulls as "failed" for reporting
+        return (null_mask if failed_count else np.zeros(len(df), dtype=bool)), failed_count
+    
+    def _partial_counts(self, chunk: Any, context: ValidationContext, as_of: Any) -> Dict[str, float]:
+        column = self.config.get("column_name")
+        if not column or column not in chunk.columns:
+            return {}
+        return {"nulls": int(context.is_null(column).sum())}
+    
+    def _failed_from_counts(self, counts: Dict[str, float], total_count: int) -> int:
+        nulls = int(counts.get("nulls", 0))
+        fill_rate = 100 * (total_count - nulls) / total_count if total_count > 0 else 0.0
         threshold = self.validation_inputs.get("min_fill_rate", 50.0)
+        return nulls if fill_rate < threshold else 0
+
+
+class NPIValidationRule(BaseValidationRule):
+    """Validates NPI format, Luhn check digit and optional NPPES registry membership.
+
+    Blank values are left to the null checks. Set `registry` (an
+    `NPIRegistry`) in the validation inputs to also flag unregistered NPIs.
+    """
+    
+    def _execute_validation(self, df: Any) -> Tuple[Any, int]:
+        column = self.config.get("column_name")
+        if not column or column not in df.columns:
+            return None, 0
         
-        # If fill rate is below threshold, consider all nulls as "failed" for reporting
-        if fill_rate < threshold:
-            null_mask = df[column].isnull()
-            failed_count = null_mask.sum()
-            failed_records_df = df[null_mask] if failed_count > 0 else df.iloc[0:0]
-        else:
-            failed_records_df = df.iloc[0:0]
-            failed_count = 0
+        check = check_npis(df, column, self.validation_inputs.get("registry"), self.context)
+        self._breakdown = {
+            "malformed": int(check.malformed.sum()),
+            "bad check digit": int(check.bad_check_digit.sum()),
+            "not in NPPES": int(check.unregistered.sum()),
+        }
+        invalid_mask = check.invalid
+        return invalid_mask, invalid_mask.sum()
+    
+    def _build_message(self, failed_count: int, total_count: int) -> str:
+        """Override to break invalid NPIs down by reason."""
+        if failed_count and hasattr(self, '_breakdown'):
+            reasons = ", ".join(f"{count} {reason}" for reason, count in self._breakdown.items() if count)
+            return f"{failed_count} of {total_count} records have an invalid NPI ({reasons})"
+        return super()._build_message(failed_count, total_count)
+
+
+class CodeValidityRule(BaseValidationRule):
+    """Validates codes against the code set in force on each claim's service date.
+
+    Validation inputs: `code_sets` (VersionedCodeSets; a code valid in any
+    passes) and optional `date_field` selecting each row's version.
+    """
+    
+    def _execute_validation(self, df: Any) -> Tuple[Any, int]:
+        column = self.config.get("column_name")
+        if not column or column not in df.columns:
+            return None, 0
+        
+        invalid_mask = invalid_code_mask(
+            df, column, self.validation_inputs.get("code_sets", ()),
+            self.validation_inputs.get("date_field"), self.context
+        )
+        return invalid_mask, invalid_mask.sum()
+    
+    def _build_message(self, failed_count: int, total_count: int) -> str:
+        """Override to name the code systems checked."""
+        if failed_count:
+            systems = "/".join(code_set.system.upper() for code_set in self.validation_inputs.get("code_sets", ()))
+            return f"{failed_count} of {total_count} records have codes not valid in {systems} on the service date"
+        return super()._build_message(failed_count, total_count)
+
+
+class ReferentialIntegrityRule(BaseValidationRule):
+    """Validates that keys (member, provider, plan) exist in a reference table.
+
+    Validation inputs: `reference` (a `ReferenceIndex`). Blank keys are
+    left to the null checks.
+    """
+    
+    def _execute_validation(self, df: Any) -> Tuple[Any, int]:
+        column = self.config.get("column_name")
+        index = self.validation_inputs.get("reference")
+        if not column or column not in df.columns or index is None:
+            return None, 0
         
-        return failed_records_df, failed_count
+        missing_mask = check_references(df, column, index, self.context).missing
+        return missing_mask, missing_mask.sum()
+    
+    def _build_message(self, failed_count: int, total_count: int) -> str:
+        """Override to name the reference table."""
+        if failed_count:
+            source = self.validation_inputs.get("source", "the reference table")
+            return f"{failed_count} of {total_count} records have keys not found in {source}"
+        return super()._build_message(failed_count, total_count)
+
+
+class ClaimLevelRule(BaseValidationRule):
+    """Validates one claim-level predicate (header vs. line consistency).
+
+    Validation inputs: `claim_key` (claim key columns) and `claim_rule` (a
+    `ClaimRule`). Failing rows are the lines of failing claims; the message
+    and metrics count claims.
+    """
+    
+    def _execute_validation(self, df: Any) -> Tuple[Any, int]:
+        claim_key = self.validation_inputs.get("claim_key", [])
+        claim_rule = self.validation_inputs.get("claim_rule")
+        if not claim_key or claim_rule is None or any(col not in df.columns for col in claim_key):
+            return None, 0
+        
+        outcome = validate_claim_rules(df, claim_key, [claim_rule], context=self.context)[0]
+        if "failure_bitmap" not in outcome:
+            raise ValueError(outcome["message"])
+        self._claims = outcome
+        failures = outcome["failure_bitmap"]
+        return failures.to_mask(), failures.count
+    
+    def _make_result(self, failed_count: int, total_count: int, failures: Optional[FailureBitmap] = None) -> ValidationResult:
+        result = super()._make_result(failed_count, total_count, failures)
+        if hasattr(self, '_claims'):
+            result.metrics.update({
+                "failed_claims": self._claims["fail_count"],
+                "total_claims": self._claims["total_count"],
+            })
+        return result
+    
+    def _build_message(self, failed_count: int, total_count: int) -> str:
+        """Override to report claims rather than lines."""
+        if hasattr(self, '_claims'):
+            claims = self._claims
+            if claims["fail_count"]:
+                sample = ", ".join(str(claim) for claim in claims["failed_claims"][:3])
+                return f"{claims['message']} (e.g. {sample})"
+            return f"All {claims['total_count']} claims passed"
+        return super()._build_message(failed_count, total_count)
 
 
 # ================================================================
@@ -282,31 +667,39 @@ class RequiredFieldsCompletenessRule(BaseValidationRule):
     """Summarizes required field completeness across the entire file."""
     
     def _execute_validation(self, df: Any) -> Tuple[Any, int]:
+        return None, self._failed_from_counts(self._partial_counts(df, self.context, None), len(df))
+    
+    def _partial_counts(self, chunk: Any, context: ValidationContext, as_of: Any) -> Dict[str, float]:
+        required_fields = self.validation_inputs.get("required_fields", [])
+        existing_fields = [f for f in required_fields if f in chunk.columns]
+        return {
+            "cells": len(chunk) * len(existing_fields),
+            "missing": sum(int(context.is_null(field).sum()) for field in existing_fields),
+        }
+    
+    def _failed_from_counts(self, counts: Dict[str, float], total_count: int) -> int:
         required_fields = self.validation_inputs.get("required_fields", [])
         if not required_fields:
             self._completeness = 100.0
-            return df.iloc[0:0], 0
+            return 0
         
-        # Filter to only fields that exist in DataFrame
-        existing_fields = [f for f in required_fields if f in df.columns]
-        if not existing_fields:
+        # Only fields that exist in the DataFrame count
+        if not counts.get("cells"):
             self._completeness = 0.0
-            return df.iloc[0:0], 0
+            return 0
         
-        # Calculate missing values
-        missing_values = df[existing_fields].isnull().sum().sum()
-        total_cells = len(df) * len(existing_fields)
+        missing_values = int(counts.get("missing", 0))
+        total_cells = int(counts["cells"])
         completeness = ((total_cells - missing_values) / total_cells * 100) if total_cells > 0 else 0.0
         self._completeness = completeness
         
         # Determine if this is a failure (threshold-based)
         threshold = self.validation_inputs.get("completeness_threshold", 98.0)
         if completeness < threshold:
-            # Return a dummy failed record to indicate file-level failure
-            failed_df = pd.DataFrame([{"file_level_check": "RequiredFieldsCompleteness"}])
-            return failed_df, 1
+            # A single failed record indicates file-level failure
+            return 1
         else:
-            return df.iloc[0:0], 0
+            return 0
     
     def _build_message(self, failed_count: int, total_count: int) -> str:
         """Override to provide completeness percentage."""
@@ -318,24 +711,31 @@ class RequiredFieldsCompletenessRule(BaseValidationRule):
 class AgeDistributionRule(BaseValidationRule):
     """Summarizes age validation (18+) rate across the file."""
     
+    time_dependent = True
+    
     def _execute_validation(self, df: Any) -> Tuple[Any, int]:
+        return None, self._failed_from_counts(self._partial_counts(df, self.context, None), len(df))
+    
+    def _partial_counts(self, chunk: Any, context: ValidationContext, as_of: Any) -> Dict[str, float]:
         dob_field = self.config.get("column_name")
-        if not dob_field or dob_field not in df.columns:
+        if not dob_field or dob_field not in chunk.columns:
+            return {}
+        age = context.age_days(dob_field, as_of) / 365.25
+        return {"present": 1, "over_18": int((age >= 18).sum())}
+    
+    def _failed_from_counts(self, counts: Dict[str, float], total_count: int) -> int:
+        if not counts.get("present"):
             self._over_18_pct = 0.0
-            return df.iloc[0:0], 0
+            return 0
         
-        today = pd.Timestamp.today()
-        dob = pd.to_datetime(df[dob_field], errors="coerce")
-        age = (today - dob).dt.days / 365.25
-        over_18_pct = (age >= 18).sum() / len(df) * 100 if len(df) > 0 else 0.0
+        over_18_pct = counts.get("over_18", 0) / total_count * 100 if total_count > 0 else 0.0
         self._over_18_pct = over_18_pct
         
         threshold = self.validation_inputs.get("min_over_18_pct", 90.0)
         if over_18_pct < threshold:
-            failed_df = pd.DataFrame([{"file_level_check": "AgeDistribution"}])
-            return failed_df, 1
+            return 1
         else:
-            return df.iloc[0:0], 0
+            return 0
     
     def _build_message(self, failed_count: int, total_count: int) -> str:
         """Override to provide percentage."""
@@ -353,27 +753,37 @@ class AgeDistributionRule(BaseValidationRule):
 class DateRangeCheckRule(BaseValidationRule):
     """Summarizes claims within a date range (e.g., last 6 months)."""
     
+    time_dependent = True
+    
     def _execute_validation(self, df: Any) -> Tuple[Any, int]:
+        return None, self._failed_from_counts(self._partial_counts(df, self.context, None), len(df))
+    
+    def _partial_counts(self, chunk: Any, context: ValidationContext, as_of: Any) -> Dict[str, float]:
         date_field = self.config.get("column_name")
-        if not date_field or date_field not in df.columns:
-            self._valid_dates_pct = 0.0
-            return df.iloc[0:0], 0
+        if not date_field or date_field not in chunk.columns:
+            return {}
         
         months_back = self.validation_inputs.get("months_back", 6)
-        self._months_back = months_back
-        today = pd.Timestamp.today()
+        today = as_of if as_of is not None else pd.Timestamp.today()
         cutoff_date = today - pd.DateOffset(months=months_back)
         
-        service_dates = pd.to_datetime(df[date_field], errors="coerce")
-        valid_dates_pct = (service_dates >= cutoff_date).sum() / len(df) * 100 if len(df) > 0 else 0.0
+        service_dates = context.dates(date_field)
+        return {"present": 1, "in_window": int((service_dates >= cutoff_date).sum())}
+    
+    def _failed_from_counts(self, counts: Dict[str, float], total_count: int) -> int:
+        if not counts.get("present"):
+            self._valid_dates_pct = 0.0
+            return 0
+        
+        self._months_back = self.validation_inputs.get("months_back", 6)
+        valid_dates_pct = counts.get("in_window", 0) / total_count * 100 if total_count > 0 else 0.0
         self._valid_dates_pct = valid_dates_pct
         
         threshold = self.validation_inputs.get("min_valid_pct", 80.0)
         if valid_dates_pct < threshold:
-            failed_df = pd.DataFrame([{"file_level_check": "DateRange"}])
-            return failed_df, 1
+            return 1
         else:
-            return df.iloc[0:0], 0
+            return 0
     
     def _build_message(self, failed_count: int, total_count: int) -> str:
         """Override to provide percentage."""
@@ -390,33 +800,101 @@ class DateRangeCheckRule(BaseValidationRule):
 
 
 class DiagnosisCodeCoverageRule(BaseValidationRule):
-    """Summarizes presence of MSK/BAR diagnosis codes across fields."""
+    """Summarizes presence of MSK/BAR diagnosis codes across fields.
+
+    Coverage is membership of each dx value in the `msk_codes` / `bar_codes`
+    lookup sets (validation inputs), with category-level prefix matching;
+    see `validation.code_sets.diagnosis_code_coverage`. The metrics count
+    claims (with a `claim_key` input, else rows) having an MSK or BAR code,
+    and name the most frequent codes. Chunked runs (`partial`) merge per-code
+    counts and per-claim flags across chunks (see `CoverageAccumulator`), so
+    they report the same metrics.
+    """
+    
+    # Most frequent codes named in the metrics
+    top_codes = 5
     
     def _execute_validation(self, df: Any) -> Tuple[Any, int]:
+        claim_key = self._claim_key(df.columns)
+        coverage = self._coverage(df, self.context, claim_key)
+        if coverage is None:
+            return None, self._failed_from_counts({}, len(df))
+        self._coverage_metrics = self._summarize(coverage.code_counts, coverage.flag_counts(), "claims" if claim_key else "rows")
+        return None, self._failed_from_counts(self._counts(coverage), len(df))
+    
+    def _partial_counts(self, chunk: Any, context: ValidationContext, as_of: Any) -> Dict[str, float]:
+        return self._partial_update(None, chunk, context, as_of)[0]
+    
+    def _partial_update(self, state: Any, chunk: Any, context: ValidationContext, as_of: Any) -> Tuple[Dict[str, float], Any]:
+        claim_key = self._claim_key(chunk.columns)
+        coverage = self._coverage(chunk, context, claim_key)
+        if coverage is None:
+            return {}, state
+        if state is None:
+            state = CoverageAccumulator(claim_key)
+        return self._counts(coverage), state.add(coverage)
+    
+    def _merge_partial_state(self, state: Any, other: Any) -> Any:
+        if state is None or other is None:
+            return state if state is not None else other
+        return state.merge(other)
+    
+    def _finish_partial_state(self, state: Any) -> None:
+        if state is not None:
+            self._coverage_metrics = self._summarize(state.code_counts(), state.flag_counts(), "claims" if state.claim_key else "rows")
+    
+    def _claim_key(self, columns: Any) -> List[str]:
+        """The `claim_key` input if all of its columns are present, else []."""
+        claim_key = list(self.validation_inputs.get("claim_key", []))
+        return claim_key if all(col in columns for col in claim_key) else []
+    
+    def _coverage(self, df: Any, context: Optional[ValidationContext], claim_key: Any) -> Optional[DiagnosisCoverage]:
         dx_fields = self.validation_inputs.get("dx_fields", [])
         if not dx_fields:
             # Auto-detect diagnosis fields
-            dx_fields = [col for col in df.columns if col.lower().startswith("dx_code")]
+            dx_fields = dx_fields_in(df.columns)
         
         if not dx_fields:
-            return df.iloc[0:0], 0
-        
-        total_dx = 0
-        msk_count = 0
-        bar_count = 0
+            return None
         
-        msk_keywords = ["M", "S", "K"]
-        bar_keywords = ["B", "A", "R"]
+        return diagnosis_code_coverage(
+            df,
+            self.validation_inputs.get("msk_codes", ()),
+            self.validation_inputs.get("bar_codes", ()),
+            dx_fields=dx_fields,
+            claim_key=claim_key or None,
+            context=context
+        )
+    
+    @staticmethod
+    def _counts(coverage: DiagnosisCoverage) -> Dict[str, float]:
+        return {"dx_fields": 1, "total_dx": coverage.total_codes, "msk": coverage.msk_count, "bar": coverage.bar_count}
+    
+    def _summarize(self, code_counts: Any, flag_counts: Tuple[int, int, int], unit: str) -> Dict[str, Any]:
+        """JSON-safe summary of the per-claim (or per-row) flags and per-code counts."""
+        total, with_msk, with_bar = flag_counts
+        top = code_counts.head(self.top_codes)
+        return {
+            f"total_{unit}": total,
+            f"{unit}_with_msk": with_msk,
+            f"{unit}_with_bar": with_bar,
+            "distinct_dx_codes": int(len(code_counts)),
+            "top_dx_codes": ", ".join(f"{code} ({int(rows)})" for code, rows in zip(top["code"], top["rows"])),
+        }
+    
+    def _make_result(self, failed_count: int, total_count: int, failures: Optional[FailureBitmap] = None) -> ValidationResult:
+        result = super()._make_result(failed_count, total_count, failures)
+        if hasattr(self, '_coverage_metrics'):
+            result.metrics.update(self._coverage_metrics)
+        return result
+    
+    def _failed_from_counts(self, counts: Dict[str, float], total_count: int) -> int:
+        if not counts.get("dx_fields"):
+            return 0
         
-        for field in dx_fields:
-            if field in df.columns:
-                values = df[field].dropna().astype(str)
-                field_count = len(values)
-                total_dx += field_count
-                field_msk = values.str.contains('|'.join(msk_keywords), case=False, na=False).sum()
-                field_bar = values.str.contains('|'.join(bar_keywords), case=False, na=False).sum()
-                msk_count += field_msk
-                bar_count += field_bar
+        total_dx = int(counts.get("total_dx", 0))
+        msk_count = int(counts.get("msk", 0))
+        bar_count = int(counts.get("bar", 0))
         
         # Store for message building
         self._total_dx = total_dx
@@ -424,16 +902,14 @@ class DiagnosisCodeCoverageRule(BaseValidationRule):
         self._bar_count = bar_count
         
         if total_dx == 0:
-            failed_df = pd.DataFrame([{"file_level_check": "DiagnosisCodeCoverage"}])
-            return failed_df, 1
+            return 1
         else:
             msk_pct = (msk_count / total_dx) * 100
             bar_pct = (bar_count / total_dx) * 100
             if msk_pct + bar_pct == 0:
-                failed_df = pd.DataFrame([{"file_level_check": "DiagnosisCodeCoverage"}])
-                return failed_df, 1
+                return 1
         
-        return df.iloc[0:0], 0
+        return 0
     
     def _build_message(self, failed_count: int, total_count: int) -> str:
         """Override to provide MSK/BAR percentages."""
@@ -448,8 +924,18 @@ class DiagnosisCodeCoverageRule(BaseValidationRule):
 # Public API - Unchanged Signatures
 # ================================================================
 
-@st.cache_data(show_spinner=False)
-def run_validations(transformed_df: Any, required_fields: List[str], all_mapped_fields: List[str]) -> List[Dict[str, Any]]:
+
+def run_validations(
+    transformed_df: Any,
+    required_fields: List[str],
+    all_mapped_fields: List[str],
+    execution: str = EXECUTION_SERIAL,
+    max_workers: Optional[int] = None,
+    timings: Optional[List[Dict[str, Any]]] = None,
+    track_memory: bool = False,
+    result_cache: Optional[ValidationResultCache] = None,
+    inputs: Optional["ValidationInputs"] = None
+) -> List[Dict[str, Any]]:
     """
     Run all field-level validations and return consolidated results.
     
@@ -459,163 +945,579 @@ def run_validations(transformed_df: Any, required_fields: List[str], all_mapped_
     - Date validity checks (for all date fields)
     - Age validation (18+) (for DOB fields)
     - Fill rate checks (for all mapped fields)
+    - NPI validity checks (for NPI fields)
+    - Code validity checks (for code fields with local code tables)
+    - Claim consistency checks (header fields across the lines of each claim)
+    - Referential integrity checks (for fields with configured reference tables)
+
+    Results are not memoized per call; pass `result_cache` to reuse the
+    results of rules whose input columns and configuration are unchanged.
+    Every call runs (or serves from that cache) each rule, so `timings` is
+    always filled.
 
     Args:
         transformed_df: Transformed claims data (pandas DataFrame)
         required_fields: Required internal fields to validate
         all_mapped_fields: All mapped internal fields (both required and optional)
+        execution: Rule scheduling, one of `EXECUTION_MODES` (see `execute_rules`)
+        max_workers: Pool size for threaded or process execution
+        timings: Optional list receiving per-rule timing breakdowns
+        track_memory: Also measure each rule's peak memory
+        result_cache: Optional cache of results by rule and input column content
+        inputs: Claim key and reference data (default: resolved from
+            configuration by `resolve_validation_inputs`)
 
     Returns:
         List of validation result dicts compatible with existing UI
     """
-    results: List[Dict[str, Any]] = []
+    return _run_field_validations(
+        transformed_df, required_fields, all_mapped_fields,
+        execution=execution, max_workers=max_workers, timings=timings, track_memory=track_memory,
+        result_cache=result_cache, inputs=inputs
+    )
+
+
+def plan_field_validations(
+    transformed_df: Any,
+    required_fields: List[str],
+    all_mapped_fields: List[str],
+    fields: Optional[Set[str]] = None,
+    inputs: Optional["ValidationInputs"] = None
+) -> List[Tuple[BaseValidationRule, bool]]:
+    """Build the field-level rules `run_validations` executes, in output order.
+
+    Args:
+        transformed_df: Transformed claims data (pandas DataFrame)
+        required_fields: Required internal fields to validate
+        all_mapped_fields: All mapped internal fields (both required and optional)
+        fields: Optional subset of fields to plan for
+        inputs: Claim key and reference data (default: resolved from
+            configuration by `resolve_validation_inputs`)
+
+    Returns:
+        (rule, report_only_failures) pairs; optional null checks are only
+        reported when they find failures.
+    """
+    columns = transformed_df.columns
+    if inputs is None:
+        inputs = resolve_validation_inputs(columns)
+
+    def wanted(field: str) -> bool:
+        return field in columns and (fields is None or field in fields)
+
+    plan: List[Tuple[BaseValidationRule, bool]] = []
     
     # 1. Required Fields Null Check
     for field in required_fields:
-        if field in transformed_df.columns:
-            rule = NullCheckRule({
+        if wanted(field):
+            plan.append((NullCheckRule({
                 "rule_name": "Required Field Check",
                 "column_name": field,
                 "severity": "required",
                 "validation_inputs": {}
-            })
-            result = rule.validate(transformed_df)
-            results.append(result.to_dict())
+            }), False))
     
     # 2. Optional Fields Null Check (for mapped optional fields that aren't required)
-    optional_mapped_fields = [f for f in all_mapped_fields if f not in required_fields]
-    for field in optional_mapped_fields:
-        if field in transformed_df.columns:
-            rule = NullCheckRule({
+    for field in all_mapped_fields:
+        if field not in required_fields and wanted(field):
+            plan.append((NullCheckRule({
                 "rule_name": "Optional Field Check",
                 "column_name": field,
                 "severity": "optional",
                 "validation_inputs": {}
-            })
-            result = rule.validate(transformed_df)
-            # Only add if there are failures (to reduce noise, but show if issues exist)
-            if result.failed_count > 0:
-                results.append(result.to_dict())
+            }), True))
     
     # 3. Date Validity Check (for all date fields)
-    date_fields = [col for col in transformed_df.columns if "date" in col.lower()]
-    for field in date_fields:
-        rule = DatatypeCheckRule({
-            "rule_name": "Date Validity Check",
-            "column_name": field,
-            "severity": "optional",
-            "validation_inputs": {}
-        })
-        result = rule.validate(transformed_df)
-        results.append(result.to_dict())
+    for field in columns:
+        if "date" in field.lower() and wanted(field):
+            plan.append((DatatypeCheckRule({
+                "rule_name": "Date Validity Check",
+                "column_name": field,
+                "severity": "optional",
+                "validation_inputs": {}
+            }), False))
     
     # 4. Age Validation (18+) - Check all DOB fields
-    dob_fields = [col for col in transformed_df.columns if "dob" in col.lower() or col in ["Patient_DOB", "Insured_DOB"]]
-    for dob_field in dob_fields:
-        if dob_field in transformed_df.columns:
-            rule = AgeValidationRule({
+    for field in columns:
+        if ("dob" in field.lower() or field in ["Patient_DOB", "Insured_DOB"]) and wanted(field):
+            plan.append((AgeValidationRule({
                 "rule_name": "Age ≥ 18 Check",
-                "column_name": dob_field,
+                "column_name": field,
                 "severity": "required",
                 "validation_inputs": {}
-            })
-            result = rule.validate(transformed_df)
-            results.append(result.to_dict())
+            }), False))
     
     # 5. Fill Rate Check for ALL Mapped Internal Fields
     for field in all_mapped_fields:
-        if field in transformed_df.columns:
-            rule = FillRateCheckRule({
+        if wanted(field):
+            plan.append((FillRateCheckRule({
                 "rule_name": "Fill Rate Check",
                 "column_name": field,
                 "severity": "optional",
                 "validation_inputs": {"min_fill_rate": 50.0}
-            })
-            result = rule.validate(transformed_df)
-            # Add all results (both warnings and passes for completeness)
-            results.append(result.to_dict())
+            }), False))
+    
+    # 6. NPI Validity Check (check digit, plus NPPES membership when a registry is configured)
+    npi_fields = [field for field in columns if "npi" in field.lower() and wanted(field)]
+    for field in npi_fields:
+        plan.append((NPIValidationRule({
+            "rule_name": "NPI Validity Check",
+            "column_name": field,
+            "severity": "required",
+            "validation_inputs": {"registry": inputs.npi_registry}
+        }), False))
+    
+    # 7. Code Validity Check (ICD-10-CM, CPT/HCPCS, revenue codes with local code tables)
+    code_fields = [(field, code_systems_for(field)) for field in columns if wanted(field) and code_systems_for(field)]
+    for field, systems in code_fields:
+        code_sets = [inputs.code_sets[system] for system in systems if system in inputs.code_sets]
+        if code_sets:
+            plan.append((CodeValidityRule({
+                "rule_name": "Code Validity Check",
+                "column_name": field,
+                "severity": "required",
+                "validation_inputs": {
+                    "code_sets": code_sets,
+                    "date_field": "Begin_Date" if "Begin_Date" in columns else None
+                }
+            }), False))
+    
+    # 8. Claim Consistency Check (lines of one claim agree on header fields)
+    claim_key = inputs.claim_key
+    if claim_key and all(col in columns for col in claim_key):
+        for claim_rule in default_claim_rules(columns):
+            if wanted(claim_rule.field) and claim_rule.field not in claim_key:
+                plan.append((ClaimLevelRule({
+                    "rule_name": "Claim Consistency Check",
+                    "column_name": claim_rule.field,
+                    "severity": "required",
+                    "validation_inputs": {"claim_key": claim_key, "claim_rule": claim_rule}
+                }), False))
+    
+    # 9. Referential Integrity Check (keys against configured reference tables)
+    for field, (index, source) in inputs.references.items():
+        if wanted(field):
+            plan.append((ReferentialIntegrityRule({
+                "rule_name": "Referential Integrity Check",
+                "column_name": field,
+                "severity": "required",
+                "validation_inputs": {"reference": index, "source": source}
+            }), False))
+    
+    return plan
+
+
+@dataclass
+class ValidationInputs:
+    """Inputs of the field-level checks that do not come from the frame.
+
+    Resolved once per run (see `resolve_validation_inputs`) and passed to
+    `run_validations`, `failing_rows` and `dynamic_run_validations` (or
+    `dynamic_run_validations_chunked`), so the engine never reads session
+    state and callers can tell from `fingerprint` when a rerun is needed.
+
+    Attributes:
+        claim_key: Claim key columns (empty skips claim consistency checks).
+        npi_registry: NPPES registry for NPI membership (None checks the
+            check digit only).
+        code_sets: VersionedCodeSet per code system.
+        references: Per field, the ReferenceIndex of its reference table and
+            the table's file name.
+        msk_codes: MSK diagnosis lookup (None when no lookup is loaded).
+        bar_codes: BAR diagnosis lookup (None when no lookup is loaded).
+    """
+
+    claim_key: List[str] = dataclass_field(default_factory=list)
+    npi_registry: Optional[NPIRegistry] = None
+    code_sets: Dict[str, VersionedCodeSet] = dataclass_field(default_factory=dict)
+    references: Dict[str, Tuple[ReferenceIndex, str]] = dataclass_field(default_factory=dict)
+    msk_codes: Optional[CodeIndex] = None
+    bar_codes: Optional[CodeIndex] = None
+
+    @property
+    def fingerprint(self) -> str:
+        """Digest of the claim key and the content of the reference data."""
+        payload = {
+            "claim_key": self.claim_key,
+            "npi_registry": self.npi_registry.fingerprint if self.npi_registry is not None else None,
+            "code_sets": {system: code_set.fingerprint for system, code_set in self.code_sets.items()},
+            "references": {field: [index.fingerprint, source] for field, (index, source) in self.references.items()},
+            "msk_codes": self.msk_codes.fingerprint if self.msk_codes is not None else None,
+            "bar_codes": self.bar_codes.fingerprint if self.bar_codes is not None else None,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def resolve_validation_inputs(
+    columns: Any,
+    final_mapping: Optional[Dict[str, Dict[str, Any]]] = None,
+    primary_key: Optional[str] = None,
+    preprocessing_primary_key: Optional[str] = None,
+    msk_codes: Optional[Iterable[Any]] = None,
+    bar_codes: Optional[Iterable[Any]] = None
+) -> ValidationInputs:
+    """Resolve the claim key and load the reference data configured for `columns`.
 
+    The code-set catalog, NPPES registry and reference indexes come from the
+    shared loaders, which reload them when their files change.
+
+    Args:
+        columns: Columns of the transformed data
+        final_mapping: Mapping used to translate the onboarding primary keys
+        primary_key: Onboarding primary key (source columns, comma-separated)
+        preprocessing_primary_key: Onboarding preprocessing (line) key
+        msk_codes: Uploaded MSK diagnosis codes (None when not loaded)
+        bar_codes: Uploaded BAR diagnosis codes (None when not loaded)
+
+    Returns:
+        ValidationInputs; without a primary key the claim key is the first
+        claim ID field present (see `resolve_claim_key`).
+    """
+    columns = list(columns)
+    references: Dict[str, Tuple[ReferenceIndex, str]] = {}
+    for field, spec in reference_tables().items():
+        if field in columns:
+            try:
+                references[field] = (get_reference_index(spec["path"], spec["column"]), os.path.basename(spec["path"]))
+            except (OSError, ValueError, KeyError):
+                continue
+    return ValidationInputs(
+        claim_key=resolve_claim_key(columns, final_mapping, primary_key, preprocessing_primary_key),
+        npi_registry=_configured_npi_registry() if any("npi" in str(col).lower() for col in columns) else None,
+        code_sets=get_code_set_catalog() if any(code_systems_for(col) for col in columns) else {},
+        references=references,
+        msk_codes=get_code_index(msk_codes) if msk_codes is not None else None,
+        bar_codes=get_code_index(bar_codes) if bar_codes is not None else None,
+    )
+
+
+def _configured_npi_registry() -> Optional[NPIRegistry]:
+    """The NPPES registry at `NPPES_REGISTRY_PATH`, if configured and readable."""
+    from core.config_loader import NPPES_REGISTRY_PATH
+    if not NPPES_REGISTRY_PATH or not os.path.exists(NPPES_REGISTRY_PATH):
+        return None
+    try:
+        return get_npi_registry(NPPES_REGISTRY_PATH)
+    except (OSError, ValueError):
+        return None
+
+
+def _run_field_validations(
+    transformed_df: Any,
+    required_fields: List[str],
+    all_mapped_fields: List[str],
+    fields: Optional[Set[str]] = None,
+    execution: str = EXECUTION_SERIAL,
+    max_workers: Optional[int] = None,
+    timings: Optional[List[Dict[str, Any]]] = None,
+    track_memory: bool = False,
+    result_cache: Optional[ValidationResultCache] = None,
+    inputs: Optional[ValidationInputs] = None
+) -> List[Dict[str, Any]]:
+    """Field-level validations, optionally restricted to `fields`.
+
+    All rules are planned up front and evaluated column by column against
+    the frame's shared `ValidationContext`, so each column's null mask and
+    parsed dates are derived once for all of its checks.
+    """
+    plan = plan_field_validations(transformed_df, required_fields, all_mapped_fields, fields, inputs)
+    outcomes = execute_rules(transformed_df, [rule for rule, _ in plan], execution, max_workers, timings, track_memory, result_cache)
+
+    results: List[Dict[str, Any]] = []
+    for (_, only_failures), result in zip(plan, outcomes):
+        if not only_failures or result.failed_count > 0:
+            results.append(result.to_dict())
     return results
 
 
-def dynamic_run_validations(transformed_df: Any, final_mapping: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+def _signature_value(value: Any) -> Any:
+    if isinstance(value, (CodeIndex, VersionedCodeSet, NPIRegistry, ReferenceIndex)):
+        return value.fingerprint
+    if isinstance(value, (set, frozenset)):
+        return sorted(str(v) for v in value)
+    return str(value)
+
+
+def rule_signature(rule: BaseValidationRule) -> str:
+    """Engine version, rule type and configuration as a stable string.
+
+    Used as the rule part of result cache keys (see `result_cache_key`).
+    Time-dependent rules (ages, date windows) include the current date.
     """
-    Dynamically runs overall file-level validations.
-    
-    This function executes aggregate/summary validation checks using VF-style rules:
-    - Required fields completeness
-    - Age distribution summary
-    - Service date range check
-    - Diagnosis code coverage summary
+    payload = {"engine": ENGINE_VERSION, "rule": type(rule).__name__, "config": rule.config}
+    if rule.time_dependent:
+        payload["as_of"] = str(pd.Timestamp.today().date())
+    return json.dumps(payload, sort_keys=True, default=_signature_value)
+
+
+def _rule_columns(rule: BaseValidationRule, columns: Any) -> List[str]:
+    """Columns of `columns` a rule reads."""
+    inputs = rule.validation_inputs
+    claim_rule = inputs.get("claim_rule")
+    wanted = (
+        [rule.config.get("column_name"), inputs.get("date_field")]
+        + list(inputs.get("required_fields", [])) + list(inputs.get("dx_fields", []))
+        + list(inputs.get("claim_key", [])) + (claim_rule.columns if claim_rule is not None else [])
+    )
+    if not inputs.get("dx_fields") and isinstance(rule, DiagnosisCodeCoverageRule):
+        wanted += dx_fields_in(columns)
+    return [col for col in dict.fromkeys(wanted) if col is not None and col in columns]
+
+
+def _timed_validate(rule: BaseValidationRule, df: Any, context: ValidationContext, track_memory: bool) -> ValidationResult:
+    """Validate and attach wall time, rows per second and peak memory."""
+    if track_memory:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = rule.validate(df, context)
+    seconds = time.perf_counter() - start
+    result.timing = {
+        "seconds": round(seconds, 6),
+        "rows_per_second": round(len(df) / seconds, 1) if seconds > 0 else 0.0,
+        "peak_memory_bytes": tracemalloc.get_traced_memory()[1] - baseline if track_memory else None,
+    }
+    return result
+
+
+def _validate_rule_group(frame: Any, rules: List[BaseValidationRule], track_memory: bool) -> List[ValidationResult]:
+    """Run rules on one frame with a fresh context (process-pool entry point)."""
+    started = track_memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        context = ValidationContext(frame)
+        return [_timed_validate(rule, frame, context, track_memory) for rule in rules]
+    finally:
+        if started:
+            tracemalloc.stop()
+
+
+def execute_rules(
+    df: Any,
+    rules: List[BaseValidationRule],
+    execution: str = EXECUTION_SERIAL,
+    max_workers: Optional[int] = None,
+    timings: Optional[List[Dict[str, Any]]] = None,
+    track_memory: bool = False,
+    result_cache: Optional[ValidationResultCache] = None
+) -> List[ValidationResult]:
+    """Run independent rules against one frame, optionally in parallel.
+
+    Rules reading the same column form one group that runs in order, so the
+    column's shared views are derived once; groups are scheduled across the
+    pool. Every result carries `timing` (seconds, rows_per_second,
+    peak_memory_bytes, and `cached` for reused results).
+
+    Args:
+        df: Frame to validate
+        rules: Rules to run
+        execution: One of `EXECUTION_MODES`
+        max_workers: Pool size (default: executor default)
+        timings: Optional list receiving one breakdown dict per rule
+        track_memory: Measure each rule's peak traced memory. Threads share
+            one allocator trace, so peaks are only reported in serial and
+            process mode.
+        result_cache: Optional cache; rules whose signature and input column
+            fingerprints are unchanged reuse their previous result
+
+    Returns:
+        Results in `rules` order
+
+    Raises:
+        ValueError: If `execution` is not a known mode
+    """
+    if execution not in EXECUTION_MODES:
+        raise ValueError(f"Unknown execution mode: {execution}. Supported: {', '.join(EXECUTION_MODES)}")
+    context = get_validation_context(df)
+    outcomes: List[Optional[ValidationResult]] = [None] * len(rules)
+    cache_keys: Dict[int, str] = {}
+    if result_cache is not None:
+        for position, rule in enumerate(rules):
+            columns = _rule_columns(rule, df.columns)
+            fingerprints = get_column_fingerprints(df, columns)
+            key = result_cache_key(rule_signature(rule), (f"{col}={fingerprints[col]}" for col in columns), len(df))
+            cached = result_cache.get(key)
+            if cached is None:
+                cache_keys[position] = key
+                continue
+            result = copy.copy(cached)
+            result.timing = {"seconds": 0.0, "rows_per_second": 0.0, "peak_memory_bytes": None, "cached": True}
+            if result.failures is not None:
+                context.failures[(result.rule_name, result.field or "")] = result.failures
+            outcomes[position] = result
+
+    groups: Dict[str, List[int]] = {}
+    for position, rule in enumerate(rules):
+        if outcomes[position] is None:
+            groups.setdefault(rule.config.get("column_name") or rule.rule_name, []).append(position)
+    if len(groups) <= 1:
+        execution = EXECUTION_SERIAL
+
+    if execution == EXECUTION_PROCESSES:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for positions in groups.values():
+                group = [rules[p] for p in positions]
+                columns = list(dict.fromkeys(col for rule in group for col in _rule_columns(rule, df.columns)))
+                futures[executor.submit(_validate_rule_group, df[columns], group, track_memory)] = positions
+            for future, positions in futures.items():
+                try:
+                    group_results = future.result()
+                except Exception as e:
+                    group_results = [rules[p]._error_result(e, len(df)) for p in positions]
+                for position, result in zip(positions, group_results):
+                    outcomes[position] = result
+                    if result.failures is not None:
+                        context.failures[(result.rule_name, result.field or "")] = result.failures
+    elif execution == EXECUTION_THREADS:
+        def run_group(positions: List[int]) -> None:
+            for position in positions:
+                outcomes[position] = _timed_validate(rules[position], df, context, False)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for future in [executor.submit(run_group, positions) for positions in groups.values()]:
+                future.result()
+    else:
+        started = track_memory and not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            for positions in groups.values():
+                for position in positions:
+                    outcomes[position] = _timed_validate(rules[position], df, context, track_memory)
+        finally:
+            if started:
+                tracemalloc.stop()
+
+    results = cast(List[ValidationResult], outcomes)
+    if result_cache is not None:
+        for position, key in cache_keys.items():
+            if results[position].status != ValidationStatus.ERROR:
+                result_cache.put(key, results[position])
+    if timings is not None:
+        timings.extend({"rule": r.rule_name, "field": r.field or "", **r.timing} for r in results)
+    return results
+
+
+def failing_rows(
+    transformed_df: Any,
+    required_fields: List[str],
+    all_mapped_fields: List[str],
+    checks: Optional[List[str]] = None,
+    fields: Optional[Set[str]] = None,
+    severity: Optional[str] = None,
+    how: str = "any",
+    inputs: Optional[ValidationInputs] = None
+) -> FailureBitmap:
+    """Combine the failure bitmaps of selected row-level checks.
+
+    Bitmaps recorded on the frame's `ValidationContext` are reused; checks
+    not run yet (e.g. when `run_validations` was served from the result
+    cache) are run against the shared column views.
 
     Args:
         transformed_df: Transformed claims data (pandas DataFrame)
+        required_fields: Required internal fields (as passed to `run_validations`)
+        all_mapped_fields: All mapped internal fields
+        checks: Check names to include (default: all)
+        fields: Fields to include (default: all)
+        severity: Rule severity to include, e.g. "required" (default: all)
+        how: "any" for rows failing at least one check, "all" for rows
+            failing every selected check
+        inputs: Inputs passed to `run_validations` (default: resolved from
+            configuration)
+
+    Returns:
+        FailureBitmap over the rows of `transformed_df`. Use
+        `FailureBitmap.rows` to page through the failing records.
+    """
+    context = get_validation_context(transformed_df)
+    bitmaps: List[FailureBitmap] = []
+    for rule, _ in plan_field_validations(transformed_df, required_fields, all_mapped_fields, fields, inputs):
+        if checks is not None and rule.rule_name not in checks:
+            continue
+        if severity is not None and rule.config.get("severity") != severity:
+            continue
+        key = (rule.rule_name, rule.config["column_name"])
+        if key not in context.failures:
+            rule.validate(transformed_df, context)
+        if key in context.failures:
+            bitmaps.append(context.failures[key])
+    size = len(transformed_df)
+    if how == "all":
+        return FailureBitmap.intersection(bitmaps, size) if bitmaps else FailureBitmap.empty(size)
+    return FailureBitmap.union(bitmaps, size)
+
+
+def _file_level_result(result: ValidationResult) -> Dict[str, Any]:
+    """Convert a rule result to file-level format (no field, just check/status/message)."""
+    file_result = {
+        "check": result.rule_name,
+        "status": result.status,
+        "message": result.message
+    }
+    if result.severity:
+        file_result["severity"] = result.severity
+    # Rule-specific metrics (the generic row-failure metrics mean nothing here)
+    file_result.update({k: v for k, v in result.metrics.items() if k not in ("failure_rate", "success_count")})
+    return file_result
+
+
+def plan_file_validations(
+    columns: Any,
+    final_mapping: Dict[str, Dict[str, Any]],
+    claim_key: Optional[List[str]] = None,
+    msk_codes: Optional[CodeIndex] = None,
+    bar_codes: Optional[CodeIndex] = None
+) -> List[Any]:
+    """
+    Build the file-level rules that apply to a frame with `columns`.
+
+    Args:
+        columns: Columns of the transformed data
         final_mapping: Mapping dict of required fields
+        claim_key: Claim key columns for per-claim diagnosis coverage
+            (default: the first claim ID field present)
+        msk_codes: MSK diagnosis lookup (None when not loaded)
+        bar_codes: BAR diagnosis lookup (None when not loaded)
 
     Returns:
-        List of file-level validation result dicts compatible with existing UI
+        Ordered list of rules, or ready-made result dicts for checks that
+        are skipped by configuration
     """
-    results: List[Dict[str, Any]] = []
+    plan: List[Any] = []
     
     # 1. Required Fields Completeness
     required_fields = list(final_mapping.keys())
-    rule = RequiredFieldsCompletenessRule({
+    plan.append(RequiredFieldsCompletenessRule({
         "rule_name": "Required Fields Completeness",
         "validation_inputs": {
             "required_fields": required_fields,
             "completeness_threshold": 98.0
         }
-    })
-    result = rule.validate(transformed_df)
-    # Convert to file-level format (no field, just check/status/message)
-    file_result = {
-        "check": result.rule_name,
-        "status": result.status,
-        "message": result.message
-    }
-    if result.severity:
-        file_result["severity"] = result.severity
-    results.append(file_result)
+    }))
     
     # 2. Age Check Summary
     dob_field = None
-    if "Patient_DOB" in transformed_df.columns:
+    if "Patient_DOB" in columns:
         dob_field = "Patient_DOB"
-    elif "Insured_DOB" in transformed_df.columns:
+    elif "Insured_DOB" in columns:
         dob_field = "Insured_DOB"
 
     if dob_field:
-        rule = AgeDistributionRule({
+        plan.append(AgeDistributionRule({
             "rule_name": "Age Validation (18+)",
             "column_name": dob_field,
             "validation_inputs": {"min_over_18_pct": 90.0}
-        })
-        result = rule.validate(transformed_df)
-        file_result = {
-            "check": result.rule_name,
-            "status": result.status,
-            "message": result.message
-        }
-        if result.severity:
-            file_result["severity"] = result.severity
-        results.append(file_result)
+        }))
     
     # 3. Date Range Check
-    if "Begin_Date" in transformed_df.columns:
-        rule = DateRangeCheckRule({
+    if "Begin_Date" in columns:
+        plan.append(DateRangeCheckRule({
             "rule_name": "Service Date Range (Last 6 Months)",
             "column_name": "Begin_Date",
             "validation_inputs": {"months_back": 6, "min_valid_pct": 80.0}
-        })
-        result = rule.validate(transformed_df)
-        file_result = {
-            "check": result.rule_name,
-            "status": result.status,
-            "message": result.message
-        }
-        if result.severity:
-            file_result["severity"] = result.severity
-        results.append(file_result)
+        }))
 
     # 4. Diagnosis Code Summary (only if lookups are available or config allows skipping)
     # Get domain config to check validation settings
@@ -623,12 +1525,7 @@ def dynamic_run_validations(transformed_df: Any, final_mapping: Dict[str, Dict[s
     config = get_domain_config()
     
     # Check if lookups are available
-    from core.state_manager import SessionStateManager
-    has_lookups = (
-        SessionStateManager.has("msk_codes") and 
-        SessionStateManager.has("bar_codes") and
-        len(SessionStateManager.get("msk_codes", set())) > 0
-    )
+    has_lookups = msk_codes is not None and bar_codes is not None and len(msk_codes) > 0
     
     # Skip lookup-based validation if lookups unavailable and config allows it
     skip_lookup_validation = (
@@ -636,27 +1533,116 @@ def dynamic_run_validations(transformed_df: Any, final_mapping: Dict[str, Dict[s
         config.validation_config.get("skip_if_no_lookups", True)
     )
     
-    dx_fields = [col for col in transformed_df.columns if col.lower().startswith("dx_code")]
+    dx_fields = dx_fields_in(columns)
     if dx_fields and not skip_lookup_validation:
-        rule = DiagnosisCodeCoverageRule({
+        plan.append(DiagnosisCodeCoverageRule({
             "rule_name": "Diagnosis Code Presence (MSK/BAR)",
-            "validation_inputs": {"dx_fields": dx_fields}
-        })
-        result = rule.validate(transformed_df)
-        file_result = {
-            "check": result.rule_name,
-            "status": result.status,
-            "message": result.message
-        }
-        if result.severity:
-            file_result["severity"] = result.severity
-        results.append(file_result)
+            "validation_inputs": {
+                "dx_fields": dx_fields,
+                "claim_key": claim_key if claim_key is not None else resolve_claim_key(columns),
+                "msk_codes": msk_codes if msk_codes is not None else get_code_index(frozenset()),
+                "bar_codes": bar_codes if bar_codes is not None else get_code_index(frozenset()),
+            }
+        }))
     elif dx_fields and skip_lookup_validation:
         # Lookups unavailable but validation should pass
-        results.append({
+        plan.append({
             "check": "Diagnosis Code Presence (MSK/BAR)",
             "status": "passed",
             "message": "Skipped: Lookup codes not available (validation passes as configured)"
         })
 
-    return results
+    return plan
+
+
+def _plan_file_validations_for(
+    columns: Any,
+    final_mapping: Dict[str, Dict[str, Any]],
+    inputs: Optional[ValidationInputs]
+) -> List[Any]:
+    """`plan_file_validations` with the claim key and lookups of `inputs`."""
+    if inputs is None:
+        return plan_file_validations(columns, final_mapping)
+    return plan_file_validations(columns, final_mapping, inputs.claim_key, inputs.msk_codes, inputs.bar_codes)
+
+
+def dynamic_run_validations(
+    transformed_df: Any,
+    final_mapping: Dict[str, Dict[str, Any]],
+    execution: str = EXECUTION_SERIAL,
+    max_workers: Optional[int] = None,
+    timings: Optional[List[Dict[str, Any]]] = None,
+    track_memory: bool = False,
+    result_cache: Optional[ValidationResultCache] = None,
+    inputs: Optional[ValidationInputs] = None
+) -> List[Dict[str, Any]]:
+    """
+    Dynamically runs overall file-level validations.
+    
+    This function executes aggregate/summary validation checks using VF-style rules:
+    - Required fields completeness
+    - Age distribution summary
+    - Service date range check
+    - Diagnosis code coverage summary
+
+    Args:
+        transformed_df: Transformed claims data (pandas DataFrame)
+        final_mapping: Mapping dict of required fields
+        execution: Rule scheduling, one of `EXECUTION_MODES`
+        max_workers: Pool size for threaded or process execution
+        timings: Optional list receiving per-rule timing breakdowns
+        track_memory: Also measure each rule's peak memory
+        result_cache: Optional cache of results by rule and input column content
+        inputs: Inputs passed to `run_validations`; supplies the claim key
+            and the MSK/BAR lookups (without them the coverage check is
+            skipped or fails, as configured)
+
+    Returns:
+        List of file-level validation result dicts compatible with existing UI
+    """
+    plan = _plan_file_validations_for(transformed_df.columns, final_mapping, inputs)
+    rules = [entry for entry in plan if isinstance(entry, BaseValidationRule)]
+    outcomes = iter(execute_rules(transformed_df, rules, execution, max_workers, timings, track_memory, result_cache))
+    return [
+        _file_level_result(next(outcomes)) if isinstance(entry, BaseValidationRule) else entry
+        for entry in plan
+    ]
+
+
+def dynamic_run_validations_chunked(
+    chunks: Iterable[Any],
+    final_mapping: Dict[str, Dict[str, Any]],
+    inputs: Optional[ValidationInputs] = None
+) -> List[Dict[str, Any]]:
+    """
+    File-level validations over transformed chunks, one chunk in memory at a time.
+
+    Each rule keeps a `PartialAggregate` updated chunk by chunk; the results
+    equal `dynamic_run_validations` on the concatenated frame. Chunks must
+    share the columns of the first one.
+
+    Args:
+        chunks: Iterable of transformed DataFrame chunks
+        final_mapping: Mapping dict of required fields
+        inputs: Supplies the claim key and the MSK/BAR lookups, as for
+            `dynamic_run_validations`
+
+    Returns:
+        List of file-level validation result dicts compatible with existing UI
+    """
+    plan: Optional[List[Any]] = None
+    for chunk in chunks:
+        if plan is None:
+            plan = [
+                entry.partial() if isinstance(entry, BaseValidationRule) else entry
+                for entry in _plan_file_validations_for(chunk.columns, final_mapping, inputs)
+            ]
+        for entry in plan:
+            if isinstance(entry, PartialAggregate):
+                entry.update(chunk)
+    if plan is None:
+        return []
+    return [
+        _file_level_result(entry.result()) if isinstance(entry, PartialAggregate) else entry
+        for entry in plan
+    ]